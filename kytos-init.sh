@@ -33,6 +33,11 @@ test -z "$TESTS" && TESTS=tests/
 test -z "$RERUNS" && RERUNS=2
 
 python3 scripts/wait_for_mongo.py 2>/dev/null
+# WORKER=N runs this container as worker gwN of a parallel run (own ports,
+# database and generated dpids); give each container its own TESTS, see README
+if [ -n "$WORKER" ]; then
+export E2E_WORKER=gw$WORKER
+fi
 python3 -m pytest $TESTS --reruns $RERUNS -r fEr
 
 #tail -f
@@ -57,10 +57,10 @@ def host_seeds_ip_dict(host_seeds_dict: dict, host_entries: dict) -> None:
     return hosts
 
 
-def create_napps_user(client: MongoClient, user: str, pwd=None):
+def create_napps_user(client: MongoClient, user: str, pwd=None, db="napps"):
     """Create user"""
-    return client.napps.command(
-        "createUser", user, pwd=pwd, roles=[{"role": "dbAdmin", "db": "napps"}]
+    return client[db].command(
+        "createUser", user, pwd=pwd, roles=[{"role": "dbAdmin", "db": db}]
     )
 
 
@@ -110,14 +110,17 @@ def main() -> None:
     print(f"Waiting for node {first_node} to become primary")
     wait_until_first_node_is_primary(client)
 
-    try:
-        user, pwd = os.environ["MONGO_USERNAME"], os.environ["MONGO_PASSWORD"]
-        print(f"Creating 'napps' user {user}")
-        response = create_napps_user(client, user, pwd)
-        assert "ok" in response, response
-    except OperationFailure as exc:
-        if "already exists" not in str(exc):
-            raise
+    # parallel workers gw1, gw2, ... use their own napps_gwN database
+    workers = int(os.environ.get("MONGO_E2E_WORKERS", 0))
+    user, pwd = os.environ["MONGO_USERNAME"], os.environ["MONGO_PASSWORD"]
+    for db in ["napps"] + [f"napps_gw{i}" for i in range(1, workers)]:
+        try:
+            print(f"Creating '{db}' user {user}")
+            response = create_napps_user(client, user, pwd, db)
+            assert "ok" in response, response
+        except OperationFailure as exc:
+            if "already exists" not in str(exc):
+                raise
 
 
 if __name__ == "__main__":
@@ -70,5 +70,17 @@ napps.createUser(
     roles: [ { role: "dbAdmin", db: "napps" } ]
   }
 );
+// Parallel workers gw1, gw2, ... use their own napps_gwN database
+var workers = parseInt(process.env["MONGO_E2E_WORKERS"] || "0");
+for (var i = 1; i < workers; i++) {
+  var dbName = "napps_gw" + i;
+  db.getSiblingDB(dbName).createUser(
+    {
+      user: process.env["MONGO_USERNAME"],
+      pwd: process.env["MONGO_PASSWORD"],
+      roles: [ { role: "dbAdmin", db: dbName } ]
+    }
+  );
+}
 print("done all users have been created.");
 EOF
@@ -1,6 +1,167 @@
 import pytest
 from datetime import datetime
 
+import os
+
+from tests.helpers import (NetworkTest, BenchmarkHistory, PhaseRecorder,
+                           ResourceSampler, RUN_ID, WORKER, WORKER_ID,
+                           metrics, syslog)
+
+CONTROLLER = '127.0.0.1'
+
+phase_recorder = PhaseRecorder()
+resource_sampler = None
+metrics_file = None
+gate_results = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('e2e')
+    group.addoption('--phase-report', default='',
+                    help='time controller restarts, sleeps, HTTP requests, dpctl '
+                         'and host commands of each test and write them to '
+                         'PREFIX.json/.csv')
+    group.addoption('--phase-top', type=int, default=10,
+                    help='number of slowest tests in the phase summary')
+    group.addoption('--resource-interval', type=float, default=1.0,
+                    help='seconds between kytosd resource samples (0 to disable)')
+    group.addoption('--resource-report', default='resource_report',
+                    help='write kytosd resource samples to PREFIX.csv and '
+                         'per-test memory growth to PREFIX.json')
+    group.addoption('--leak-threshold', type=float, default=50.0,
+                    help='flag tests growing kytosd RSS by more than this many MB')
+    group.addoption('--leak-warmup', type=float, default=30.0,
+                    help='seconds after a kytosd start left out of the RSS growth')
+    group.addoption('--metrics-file', default='',
+                    help='write OpenMetrics text to this file after every test, '
+                         'e.g. for the node_exporter textfile collector')
+    group.addoption('--metrics-port', type=int, default=0,
+                    help='serve OpenMetrics on http://127.0.0.1:PORT/metrics '
+                         '(PORT + N on worker gwN, 0 to disable)')
+    group.addoption('--benchmark-gate', action='store_true',
+                    default=os.environ.get('E2E_BENCHMARK_GATE', '0') == '1',
+                    help='fail the run when a benchmark metric of this run regresses '
+                         'against the rolling baseline of the benchmark history')
+    group.addoption('--gate-tolerance', type=float, default=0.1,
+                    help='relative change of the median tolerated by the gate')
+    group.addoption('--gate-baseline-runs', type=int, default=10,
+                    help='previous runs of each benchmark in the baseline')
+    group.addoption('--gate-sigma', type=float, default=3.0,
+                    help='robust standard deviations of the baseline a '
+                         'regression must also exceed')
+
+
+@pytest.fixture
+def topology_network(topology):
+    """Network of the parametrized topology, kytosd left to the test."""
+    net = NetworkTest.shared(CONTROLLER, topology)
+    net.start(controller=False)
+    yield net
+    net.stop()
+
+
+@pytest.fixture
+def kytosd_sampler():
+    """The session ResourceSampler of --resource-interval; when that is 0,
+    one that only samples when its sample() is called."""
+    return resource_sampler or ResourceSampler(lambda: NetworkTest.controller_pid)
+
+
+@pytest.fixture
+def converged_topology(topology_network):
+    """topology_network after a clean kytosd start with all NApps enabled,
+    once every switch and link is active."""
+    net = topology_network
+    net.start_controller(clean_config=True, enable_all=True)
+    net.wait_topology_converged(timeout=max(60, 2 * len(net.net.switches)))
+    return net
+
+
+def resource_metrics(exporter):
+    """Gauges from the last kytosd resource sample."""
+    if not resource_sampler or not resource_sampler.samples:
+        return
+    sample = resource_sampler.samples[-1]
+    exporter.set('kytosd_resident_memory_bytes', int(sample['rss_mb'] * 1024 * 1024))
+    exporter.set('kytosd_cpu_percent', sample['cpu_percent'])
+    exporter.set('kytosd_threads', sample['threads'])
+    exporter.set('kytosd_open_fds', sample['fds'])
+    exporter.set('kytosd_mongo_connections', sample['mongo_connections'])
+
+
+def pytest_configure(config):
+    global resource_sampler, metrics_file
+    config.addinivalue_line('markers', 'topology(topo_name): topology of the '
+                            'NetworkTest.shared network of a module (default ring)')
+    if config.getoption('phase_report'):
+        phase_recorder.install()
+    interval = config.getoption('resource_interval')
+    if interval > 0:
+        resource_sampler = ResourceSampler(lambda: NetworkTest.controller_pid, interval,
+                                           warmup=config.getoption('leak_warmup'))
+        resource_sampler.start()
+    if os.path.exists(syslog.path):
+        syslog.start()
+    metrics_file = config.getoption('metrics_file')
+    if metrics_file and WORKER:
+        root, ext = os.path.splitext(metrics_file)
+        metrics_file = f'{root}-{WORKER}{ext}'
+    port = config.getoption('metrics_port')
+    if metrics_file or port:
+        metrics.install()
+        metrics.collectors.append(resource_metrics)
+    if port:
+        metrics.serve(port + WORKER_ID)
+
+
+def module_topology(item):
+    """topo_name of the shared network the module of item runs on: its
+    topology marker, else the NetworkTest.shared default. Modules
+    parametrized over topologies build their own networks and form a group
+    of their own."""
+    if 'topology' in getattr(item, 'fixturenames', ()):
+        return item.module.__name__
+    marker = item.get_closest_marker('topology')
+    return marker.args[0] if marker else 'ring'
+
+
+def pytest_collection_modifyitems(config, items):
+    """Run the modules of each topology one after another, in the order the
+    topologies are first collected, so that NetworkTest.shared, which keeps
+    only one network live, builds each of them once."""
+    if os.environ.get('E2E_SHARED_NETWORK', '1') == '0':
+        return
+    order = {}
+    for item in items:
+        order.setdefault(module_topology(item), len(order))
+    items.sort(key=lambda item: order[module_topology(item)])
+
+
+def pytest_unconfigure(config):
+    metrics.uninstall()
+    metrics.shutdown()
+    phase_recorder.uninstall()
+    if resource_sampler:
+        resource_sampler.stop()
+    syslog.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    phase_recorder.start(item.nodeid)
+    syslog.begin_test(item.nodeid)
+    if resource_sampler:
+        resource_sampler.test = item.nodeid
+        resource_sampler.sample()
+    yield
+    if resource_sampler:
+        resource_sampler.sample()
+        resource_sampler.test = None
+    syslog.end_test()
+    phase_recorder.stop()
+    if metrics_file:
+        metrics.write(metrics_file)
+
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -8,6 +169,39 @@ def pytest_runtest_makereport(item, call):
     report = outcome.get_result()
     report.start = call.start
     report.stop = call.stop
+    if report.failed:
+        errors = syslog.errors(since=syslog.marks.get(item.nodeid, [0])[0])
+        if errors:
+            report.sections.append(('syslog errors', '\n'.join(errors[-50:])))
+
+
+def pytest_runtest_logreport(report):
+    phase_recorder.add_report(report)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    global gate_results
+    NetworkTest.stop_pool()
+    prefix = session.config.getoption('phase_report')
+    if prefix and phase_recorder.records:
+        if WORKER:
+            prefix = f'{prefix}-{WORKER}'
+        phase_recorder.write(prefix)
+    prefix = session.config.getoption('resource_report')
+    if prefix and resource_sampler and resource_sampler.samples:
+        if WORKER:
+            prefix = f'{prefix}-{WORKER}'
+        resource_sampler.write(prefix, session.config.getoption('leak_threshold'))
+    if metrics_file:
+        metrics.write(metrics_file)
+    config = session.config
+    if config.getoption('benchmark_gate'):
+        gate_results = BenchmarkHistory().compare(
+            RUN_ID, tolerance=config.getoption('gate_tolerance'),
+            baseline_runs=config.getoption('gate_baseline_runs'),
+            sigma=config.getoption('gate_sigma'))
+        if any(result['regressed'] for result in gate_results):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
 
 
 def pytest_terminal_summary(terminalreporter):
@@ -29,3 +223,32 @@ def pytest_terminal_summary(terminalreporter):
                 start = datetime.fromtimestamp(report.start)
                 stop = datetime.fromtimestamp(report.stop)
                 terminalreporter.write_line('{id:20}: {start:%Y-%m-%d,%H:%M:%S.%f} - {stop:%Y-%m-%d,%H:%M:%S.%f}'.format(id=report.nodeid, start=start, stop=stop))
+
+    slowest = phase_recorder.slowest(terminalreporter.config.getoption('phase_top'))
+    if slowest:
+        terminalreporter.section('slowest tests by phase (seconds)', sep='-', bold=True)
+        header = ''.join(f'{name:>10}' for name in ('total', *PhaseRecorder.PHASES, 'other'))
+        terminalreporter.write_line(f'{header}  test')
+        for record in slowest:
+            values = ''.join(f"{record[name]:10.2f}" for name in ('total', *PhaseRecorder.PHASES, 'other'))
+            terminalreporter.write_line(f"{values}  {record['nodeid']}")
+
+    if resource_sampler:
+        threshold = terminalreporter.config.getoption('leak_threshold')
+        leaks = resource_sampler.leaks(threshold)
+        if leaks:
+            terminalreporter.section(f'kytosd RSS growth above {threshold:.0f}MB',
+                                     sep='-', bold=True)
+            for test, growth in sorted(leaks.items(), key=lambda item: -item[1]):
+                terminalreporter.write_line(f'{growth:8.1f}MB  {test}')
+
+    if gate_results is not None:
+        regressions = [result for result in gate_results if result['regressed']]
+        terminalreporter.section(f'benchmark gate: {len(regressions)} of {len(gate_results)} '
+                                 f'metrics regressed (run {RUN_ID})', sep='-', bold=True)
+        for result in regressions:
+            change = f"{result['change']:+7.1%}" if result['change'] is not None else f"{'from 0':>7}"
+            terminalreporter.write_line(
+                f"{change}  {result['name']} {result['metric']}: "
+                f"{result['current']:.4g} vs baseline {result['baseline']:.4g} "
+                f"({result['runs']} runs)")
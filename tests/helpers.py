@@ -1,17 +1,91 @@
 from mininet.net import Mininet
 from mininet.topo import Topo, LinearTopo
 from mininet.node import RemoteController, OVSSwitch
+from mininet.util import buildTopo
 import mininet.clean
 from mock import patch
+from collections import defaultdict, deque
+from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import csv
+import fcntl
+import functools
+import glob
+import importlib.metadata
+import json
+import math
+import random
+import re
+from functools import lru_cache
+from typing import NamedTuple
 import time
 import os
+import shlex
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
 
 BASE_ENV = os.environ.get('VIRTUAL_ENV', None) or '/'
 
+# In a parallel run every worker (gw0, gw1, ...) runs in its own container
+# started with E2E_WORKER=gwN and drives its own kytosd, so it gets its own
+# API/OpenFlow ports, switch listen ports, generated dpids, database and pid
+# file. gw0 and serial runs keep the default values.
+WORKER = os.environ.get('E2E_WORKER', '')
+WORKER_ID = int(WORKER[2:]) if WORKER.startswith('gw') else 0
+WORKER_PORT_OFFSET = 1000 * WORKER_ID
+KYTOS_API_PORT = 8181 + WORKER_ID
+OF_PORT = 6653 + WORKER_PORT_OFFSET
+if WORKER_ID and os.environ.get('MONGO_DBNAME'):
+    os.environ['MONGO_DBNAME'] = f"{os.environ['MONGO_DBNAME']}_{WORKER}"
+API_URL = f'http://127.0.0.1:{KYTOS_API_PORT}/api'
+KYTOS_API = f'{API_URL}/kytos'
+
+# NApps enabled in the test image
+EXPECTED_NAPPS = [
+    ("kytos", "pathfinder"),
+    ("kytos", "mef_eline"),
+    ("kytos", "maintenance"),
+    ("kytos", "flow_manager"),
+    ("kytos", "of_core"),
+    ("kytos", "topology"),
+    ("kytos", "of_lldp"),
+    ("kytos", "of_multi_table"),
+    ('amlight', 'sdntrace'),
+    ('amlight', 'coloring'),
+    ('amlight', 'sdntrace_cp'),
+    ('amlight', 'kytos_stats'),
+]
+
+# multi-hop UNI pairs on AmlightTopo (switch name, kytos interface id)
+UNI_PAIRS = [
+    (('Ampath1', '00:00:00:00:00:00:00:11:50'), ('SanJuan', '00:00:00:00:00:00:00:14:53')),
+    (('Ampath2', '00:00:00:00:00:00:00:12:51'), ('AL3', '00:00:00:00:00:00:00:16:55')),
+    (('SoL2', '00:00:00:00:00:00:00:13:52'), ('JAX2', '00:00:00:00:00:00:00:22:61')),
+    (('Ampath3', '00:00:00:00:00:00:00:17:56'), ('Ampath7', '00:00:00:00:00:00:00:20:59')),
+    (('Ampath4', '00:00:00:00:00:00:00:18:57'), ('AL2', '00:00:00:00:00:00:00:15:54')),
+]
+
+# Benchmark modules are skipped unless E2E_BENCHMARK=1; their results are
+# written as JSON to E2E_BENCHMARK_DIR.
+BENCHMARK = os.environ.get('E2E_BENCHMARK', '0') == '1'
+BENCHMARK_DIR = os.environ.get('E2E_BENCHMARK_DIR', 'benchmark_results')
+# Every record_benchmark call is also appended to this JSON lines history,
+# tagged with the run id (export E2E_RUN_ID to share it between the worker
+# containers) and the Kytos/NApp versions, for the regression gate.
+BENCHMARK_HISTORY = (os.environ.get('E2E_BENCHMARK_HISTORY')
+                     or os.path.join(BENCHMARK_DIR, 'history.jsonl'))
+RUN_ID = os.environ.setdefault('E2E_RUN_ID', time.strftime('%Y%m%dT%H%M%S') + f'-{os.getpid()}')
+
 class AmlightTopo(Topo):
     """Amlight Topology."""
     def build(self):
@@ -202,8 +276,174 @@ class MultiConnectedTopo(Topo):
         self.addLink(s4, s6)
 
 
+def waxman_edges(n, alpha=0.1, beta=0.2, seed=1):
+    """Edges of a connected Waxman graph on n nodes in the unit square.
+
+    Each node after the first is attached to an earlier one picked by the
+    Waxman weights, so the graph is connected; every other pair is then
+    linked with probability beta * exp(-d / (alpha * L)).
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    scale = alpha * math.sqrt(2)
+
+    def weight(a, b):
+        return beta * math.exp(-math.dist(points[a], points[b]) / scale)
+
+    edges = set()
+    for node in range(1, n):
+        other = rng.choices(range(node), [weight(node, o) for o in range(node)])[0]
+        edges.add((other, node))
+    for a in range(n):
+        for b in range(a + 1, n):
+            if (a, b) not in edges and rng.random() < weight(a, b):
+                edges.add((a, b))
+    return sorted(edges)
+
+
+def barabasi_albert_edges(n, m=2, seed=1):
+    """Edges of a Barabasi-Albert graph on n nodes: starting from a path of
+    m + 1 nodes, each new node links to m nodes picked by degree."""
+    if n <= m:
+        raise ValueError(f'barabasi: n ({n}) must be greater than m ({m})')
+    rng = random.Random(seed)
+    edges = [(node, node + 1) for node in range(m)]
+    by_degree = [node for edge in edges for node in edge]
+    for node in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(by_degree))
+        for target in sorted(targets):
+            edges.append((target, node))
+            by_degree.extend((target, node))
+    return edges
+
+
+class GeneratedTopo(Topo):
+    """Base of the parameterized topologies below.
+
+    Switches get sequential dpids with the worker id in the two top bytes
+    and listen ports from a range of WORKER_PORTS per worker starting at
+    LISTEN_PORT_BASE, and are created with one batched ovs-vsctl call,
+    which keeps networks of a few hundred switches quick to start. Nothing
+    is generated until the topology is requested.
+    """
+
+    LISTEN_PORT_BASE = 10000
+    WORKER_PORTS = 5000
+
+    def add_switch(self, name, dpid=None):
+        self.switch_count = getattr(self, 'switch_count', 0) + 1
+        if self.switch_count >= self.WORKER_PORTS:
+            raise ValueError(f'{type(self).__name__}: more than {self.WORKER_PORTS - 1} switches')
+        return self.addSwitch(
+            name, dpid=dpid or f'{WORKER_ID:04x}{self.switch_count:012x}',
+            listenPort=self.LISTEN_PORT_BASE + WORKER_ID * self.WORKER_PORTS + self.switch_count,
+            batch=True)
+
+    def add_hosts(self, switch, count):
+        for index in range(count):
+            self.addLink(self.addHost(f'{switch}h{index + 1}'), switch)
+
+    def add_graph(self, prefix, n, edges, hosts=0):
+        switches = [self.add_switch(f'{prefix}{index + 1}') for index in range(n)]
+        for a, b in edges:
+            self.addLink(switches[a], switches[b])
+        for switch in switches:
+            self.add_hosts(switch, hosts)
+
+
+class LinearChainTopo(GeneratedTopo):
+    """k switches in a line (l1 ... lk)."""
+
+    def build(self, k=10, hosts=1):
+        self.add_graph('l', k, [(i, i + 1) for i in range(k - 1)], hosts)
+
+
+class FatTreeTopo(GeneratedTopo):
+    """k-ary fat-tree: (k/2)^2 core switches (cN) and k pods of k/2
+    aggregation (aP_N) and k/2 edge (eP_N) switches."""
+
+    def build(self, k=4, hosts=0):
+        if k % 2:
+            raise ValueError(f'fattree: k ({k}) must be even')
+        half = k // 2
+        cores = [self.add_switch(f'c{i + 1}') for i in range(half * half)]
+        for pod in range(1, k + 1):
+            aggs = [self.add_switch(f'a{pod}_{i + 1}') for i in range(half)]
+            edges = [self.add_switch(f'e{pod}_{i + 1}') for i in range(half)]
+            for i, agg in enumerate(aggs):
+                for core in cores[i * half:(i + 1) * half]:
+                    self.addLink(agg, core)
+                for edge in edges:
+                    self.addLink(agg, edge)
+            for edge in edges:
+                self.add_hosts(edge, hosts)
+
+
+class GridTopo(GeneratedTopo):
+    """m x n grid of switches (gRxC), each linked to its right and lower
+    neighbour."""
+
+    def build(self, m=4, n=4, hosts=0):
+        grid = [[self.add_switch(f'g{r + 1}x{c + 1}') for c in range(n)]
+                for r in range(m)]
+        for r in range(m):
+            for c in range(n):
+                if c + 1 < n:
+                    self.addLink(grid[r][c], grid[r][c + 1])
+                if r + 1 < m:
+                    self.addLink(grid[r][c], grid[r + 1][c])
+                self.add_hosts(grid[r][c], hosts)
+
+
+class WaxmanTopo(GeneratedTopo):
+    """Random Waxman graph of n switches (wN), reproducible by seed."""
+
+    def build(self, n=50, alpha=0.1, beta=0.2, seed=1, hosts=0):
+        self.add_graph('w', n, waxman_edges(n, alpha, beta, seed), hosts)
+
+
+class BarabasiAlbertTopo(GeneratedTopo):
+    """Random scale-free graph of n switches (bN), reproducible by seed."""
+
+    def build(self, n=50, m=2, seed=1, hosts=0):
+        self.add_graph('b', n, barabasi_albert_edges(n, m, seed), hosts)
+
+
+class AmlightReplicaTopo(GeneratedTopo):
+    """copies of AmlightTopo, copy c linked to copy c + 1 by JAX1:100 ->
+    Ampath1:101 and JAX2:102 -> Ampath2:103.
+
+    Copies keep the AmLight port numbers and dpids with the worker id in
+    the top byte and c in the next one, so copy 0 of gw0 has the dpids of
+    AmlightTopo. Switches are named am<c>s<dpid suffix> (Ampath1 of copy 2
+    is am2s11) and hosts am<c>h<n>.
+    """
+
+    def build(self, copies=2):
+        amlight = AmlightTopo()
+        previous = None
+        for copy in range(copies):
+            names = {}
+            for name in amlight.switches():
+                dpid = f"{WORKER_ID:02x}{copy:02x}{amlight.nodeInfo(name)['dpid'][4:]}"
+                names[name] = self.add_switch(f'am{copy}s{dpid[-2:]}', dpid)
+            for name in amlight.hosts():
+                names[name] = self.addHost(f'am{copy}{name}')
+            for _, _, info in amlight.links(withInfo=True):
+                self.addLink(names[info['node1']], names[info['node2']],
+                             port1=info['port1'], port2=info['port2'])
+            if previous:
+                self.addLink(previous['JAX1'], names['Ampath1'], port1=100, port2=101)
+                self.addLink(previous['JAX2'], names['Ampath2'], port1=102, port2=103)
+            previous = names
+
+
 # You can run any of the topologies above by doing:
 # mn --custom tests/helpers.py --topo ring --controller=remote,ip=127.0.0.1
+# The generated ones take arguments the same way, e.g. --topo fattree,8 or
+# --topo grid,10,20, and so does NetworkTest: NetworkTest(ip, 'waxman,200').
 topos = {
     'ring': (lambda: RingTopo()),
     'ring4': (lambda: Ring4Topo()),
@@ -212,9 +452,23 @@ topos = {
     'linear10': (lambda: LinearTopo(10)),
     'multi': (lambda: MultiConnectedTopo()),
     'looped': (lambda: Looped()),
+    'linear': LinearChainTopo,
+    'fattree': FatTreeTopo,
+    'grid': GridTopo,
+    'waxman': WaxmanTopo,
+    'barabasi': BarabasiAlbertTopo,
+    'amlightx': AmlightReplicaTopo,
 }
 
 
+def build_topo(topo_name):
+    """Build topos['name'] from 'name' or 'name,arg,...,key=value';
+    unknown names fall back to RingTopo."""
+    if topo_name.split(',')[0] not in topos:
+        return RingTopo()
+    return buildTopo(topos, topo_name)
+
+
 def mongo_client(
     host_seeds=os.environ.get("MONGO_HOST_SEEDS"),
     username=os.environ.get("MONGO_USERNAME"),
@@ -244,7 +498,1023 @@ def mongo_client(
     )
 
 
+def env_ints(name, default):
+    """Comma separated integers from environment variable name."""
+    value = os.environ.get(name, default)
+    return [int(item) for item in str(value).split(',') if item.strip()]
+
+
+def latency_stats(samples, percentiles=(50, 95, 99)):
+    """{count, mean, pNN..., max} of samples. Percentiles use the lower
+    interpolation: the sample at index int(p / 100 * (count - 1))."""
+    values = sorted(samples)
+    if not values:
+        return {'count': 0}
+    stats = {'count': len(values), 'mean': sum(values) / len(values)}
+    for percentile in percentiles:
+        stats[f'p{percentile}'] = values[int(percentile / 100 * (len(values) - 1))]
+    stats['max'] = values[-1]
+    return stats
+
+
+def linear_trend(points):
+    """Least squares slope of [(x, y)], 0.0 with fewer than two x values."""
+    points = list(points)
+    if len({x for x, _ in points}) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / sum((x - mean_x) ** 2 for x, _ in points)
+
+
+def record_benchmark(name, results):
+    """Write results to BENCHMARK_DIR/name.json, append their metrics to
+    the BENCHMARK_HISTORY and return the path."""
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    suffix = f'-{WORKER}' if WORKER else ''
+    path = os.path.join(BENCHMARK_DIR, f'{name}{suffix}.json')
+    with open(path, 'w') as f:
+        json.dump({'name': name, 'timestamp': time.time(), 'results': results},
+                  f, indent=2)
+    BenchmarkHistory().append(name, results)
+    return path
+
+
+@lru_cache()
+def kytos_versions():
+    """Versions of kytos, of the installed NApps (from their kytos.json)
+    and E2E_KYTOS_IMAGE (e.g. the amlight/kytos image digest)."""
+    try:
+        kytos = importlib.metadata.version('kytos')
+    except importlib.metadata.PackageNotFoundError:
+        kytos = None
+    napps = {}
+    pattern = os.path.join(BASE_ENV, 'var/lib/kytos/napps/*/*/kytos.json')
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        napps[f"{meta.get('username')}/{meta.get('name')}"] = meta.get('version')
+    return {'kytos': kytos, 'napps': napps, 'image': os.environ.get('E2E_KYTOS_IMAGE')}
+
+
+# Lists of results are flattened by the first of these keys found in their items
+_ITEM_KEYS = ('case', 'topology', 'name')
+# Run parameters (sizes, concurrency, durations asked for) go under this key
+# of a result and are never flattened into metrics
+CONFIG_KEY = 'config'
+# Values too coarse to gate (e.g. timings from second-granular log stamps)
+# go under this key: they are recorded in the result but not flattened
+INFO_KEY = 'info'
+
+
+def flatten_metrics(results, prefix=''):
+    """{dotted.path: value} of the numeric leaves of results, leaving out
+    the run parameters under CONFIG_KEY and the values under INFO_KEY."""
+    metrics = {}
+    if isinstance(results, dict):
+        items = results.items()
+    elif isinstance(results, list):
+        items = []
+        for item in results:
+            key = next((item[k] for k in _ITEM_KEYS if isinstance(item, dict) and k in item),
+                       None)
+            if key is None:
+                # plain samples (e.g. per-cycle rows) are not metrics
+                continue
+            items.append((key, item))
+    else:
+        return metrics
+    for key, value in items:
+        path = f'{prefix}.{key}' if prefix else str(key)
+        if isinstance(value, bool) or key in (CONFIG_KEY, INFO_KEY):
+            continue
+        if isinstance(value, (int, float)):
+            if math.isfinite(value):
+                metrics[path] = value
+        else:
+            metrics.update(flatten_metrics(value, path))
+    return metrics
+
+
+def metric_direction(path):
+    """1 if higher is better, -1 if lower is better, 0 if not gated."""
+    name = path.rsplit('.', 1)[-1]
+    if 'per_second' in name or 'gbps' in name:
+        return 1
+    if name in ('p50', 'p95', 'mean') or name.endswith(('seconds', '_ms')) \
+            or 'loss' in name or 'jitter' in name:
+        return -1
+    return 0
+
+
+class BenchmarkHistory:
+    """JSON lines store of benchmark metrics and the regression gate.
+
+    Each line is one record_benchmark call: run id, time, versions, name
+    and its flattened metrics. compare() checks the metrics of a run
+    against the rolling baseline of the previous runs of each benchmark.
+    A metric regresses when its median over the run is worse than the
+    baseline median by more than tolerance (relative) and by more than
+    sigma robust standard deviations (1.4826 * MAD) of the baseline, so
+    neither small drifts nor single noisy baseline runs fail the gate.
+    With a zero baseline median (e.g. no loss) there is no relative
+    change and only the sigma test applies.
+    """
+
+    MIN_RUNS = 3
+
+    def __init__(self, path=BENCHMARK_HISTORY):
+        self.path = path
+
+    def append(self, name, results, run_id=RUN_ID):
+        record = {'run': run_id, 'timestamp': time.time(), 'worker': WORKER,
+                  'versions': kytos_versions(), 'name': name,
+                  'metrics': flatten_metrics(results)}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+        return record
+
+    def records(self):
+        try:
+            with open(self.path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _values(records):
+        values = defaultdict(list)
+        for record in records:
+            for path, value in record['metrics'].items():
+                values[path].append(value)
+        return values
+
+    def compare(self, run_id=RUN_ID, tolerance=0.1, baseline_runs=10, sigma=3.0):
+        """Compare run_id to the last baseline_runs runs of each benchmark.
+
+        Returns one dict per gated metric: name, metric, current and
+        baseline medians, change (relative, positive is worse, None for a
+        zero baseline), runs in the baseline, their versions and whether it
+        regressed.
+        """
+        by_name = defaultdict(list)
+        for record in self.records():
+            by_name[record['name']].append(record)
+        results = []
+        for name, records in sorted(by_name.items()):
+            current = [r for r in records if r['run'] == run_id]
+            if not current:
+                continue
+            runs = []
+            for record in records:
+                if record['run'] != run_id and record['run'] not in runs:
+                    runs.append(record['run'])
+            runs = runs[-baseline_runs:]
+            # one value per baseline run (median over its workers/repeats)
+            baseline = defaultdict(list)
+            for run in runs:
+                for path, values in self._values(
+                        r for r in records if r['run'] == run).items():
+                    baseline[path].append(statistics.median(values))
+            versions = [r['versions'] for r in records if r['run'] == runs[-1]][:1] if runs else []
+            for path, values in sorted(self._values(current).items()):
+                direction = metric_direction(path)
+                history = baseline.get(path, [])
+                if not direction or len(history) < self.MIN_RUNS:
+                    continue
+                value = statistics.median(values)
+                median = statistics.median(history)
+                spread = 1.4826 * statistics.median(abs(v - median) for v in history)
+                worse = (median - value) * direction
+                if median:
+                    change = worse / abs(median)
+                    regressed = change > tolerance and worse > sigma * spread
+                else:
+                    change = None
+                    regressed = worse > 0 and worse > sigma * spread
+                results.append({
+                    'name': name, 'metric': path, 'current': value, 'baseline': median,
+                    'change': change, 'runs': len(history),
+                    'baseline_versions': versions[0] if versions else None,
+                    'regressed': regressed,
+                })
+        return results
+
+
+class KytosClient:
+    """Kytos API client over a pooled requests.Session.
+
+    Connections are kept alive and shared by threads (up to pool_size), and
+    the latency of every call is recorded per endpoint, e.g.
+    ``client.latencies['POST flow_manager/v2/flows/{dpid}']``.
+    """
+
+    def __init__(self, api_url=API_URL, pool_size=100, timeout=30):
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.latencies = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        """Send a request to api_url/path, recording its latency under
+        'METHOD endpoint' (endpoint defaults to path)."""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, f'{self.api_url}/{path}', **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[f'{method} {endpoint or path}'].append(elapsed)
+
+    def latency_summary(self, reset=False):
+        """{endpoint: {count, mean, p50, p95, p99, max}} in seconds; reset
+        starts a new window of samples."""
+        with self._lock:
+            items = [(key, list(values)) for key, values in self.latencies.items()]
+            if reset:
+                self.latencies.clear()
+        return {key: latency_stats(values) for key, values in items}
+
+    def close(self):
+        self.session.close()
+
+    # kytos/mef_eline
+    def list_evcs(self, **params):
+        return self.request('GET', 'kytos/mef_eline/v2/evc/', params=params)
+
+    def get_evc(self, evc_id):
+        return self.request('GET', f'kytos/mef_eline/v2/evc/{evc_id}',
+                            'kytos/mef_eline/v2/evc/{id}')
+
+    def create_evc(self, payload):
+        return self.request('POST', 'kytos/mef_eline/v2/evc/', json=payload)
+
+    def update_evc(self, evc_id, payload):
+        return self.request('PATCH', f'kytos/mef_eline/v2/evc/{evc_id}',
+                            'kytos/mef_eline/v2/evc/{id}', json=payload)
+
+    def delete_evc(self, evc_id):
+        return self.request('DELETE', f'kytos/mef_eline/v2/evc/{evc_id}',
+                            'kytos/mef_eline/v2/evc/{id}')
+
+    def redeploy_evc(self, evc_id, **params):
+        return self.request('PATCH', f'kytos/mef_eline/v2/evc/{evc_id}/redeploy',
+                            'kytos/mef_eline/v2/evc/{id}/redeploy', params=params)
+
+    # kytos/flow_manager
+    def get_flows(self, dpid=None):
+        if dpid is None:
+            return self.request('GET', 'kytos/flow_manager/v2/flows')
+        return self.request('GET', f'kytos/flow_manager/v2/flows/{dpid}',
+                            'kytos/flow_manager/v2/flows/{dpid}')
+
+    def get_stored_flows(self, **params):
+        return self.request('GET', 'kytos/flow_manager/v2/stored_flows', params=params)
+
+    def install_flows(self, payload, dpid=None):
+        if dpid is None:
+            return self.request('POST', 'kytos/flow_manager/v2/flows', json=payload)
+        return self.request('POST', f'kytos/flow_manager/v2/flows/{dpid}',
+                            'kytos/flow_manager/v2/flows/{dpid}', json=payload)
+
+    def delete_flows(self, payload, dpid=None):
+        if dpid is None:
+            return self.request('DELETE', 'kytos/flow_manager/v2/flows', json=payload)
+        return self.request('DELETE', f'kytos/flow_manager/v2/flows/{dpid}',
+                            'kytos/flow_manager/v2/flows/{dpid}', json=payload)
+
+    # kytos/topology
+    def get_topology(self):
+        return self.request('GET', 'kytos/topology/v3/')
+
+    def get_switches(self):
+        return self.request('GET', 'kytos/topology/v3/switches')
+
+    def get_links(self):
+        return self.request('GET', 'kytos/topology/v3/links')
+
+    def get_interfaces(self):
+        return self.request('GET', 'kytos/topology/v3/interfaces')
+
+    def set_enabled(self, kind, entity_id, enabled=True):
+        """Enable/disable a 'switches', 'links' or 'interfaces' entity."""
+        action = 'enable' if enabled else 'disable'
+        return self.request('POST', f'kytos/topology/v3/{kind}/{entity_id}/{action}',
+                            f'kytos/topology/v3/{kind}/{{id}}/{action}')
+
+    def add_metadata(self, kind, entity_id, metadata):
+        """Add metadata to a 'switches', 'links' or 'interfaces' entity."""
+        return self.request('POST', f'kytos/topology/v3/{kind}/{entity_id}/metadata',
+                            f'kytos/topology/v3/{kind}/{{id}}/metadata', json=metadata)
+
+    # kytos/of_lldp
+    def get_lldp_interfaces(self):
+        return self.request('GET', 'kytos/of_lldp/v1/interfaces/')
+
+    def set_lldp(self, interfaces, enabled=True):
+        action = 'enable' if enabled else 'disable'
+        return self.request('POST', f'kytos/of_lldp/v1/interfaces/{action}/',
+                            json={'interfaces': interfaces})
+
+    def get_liveness(self, **params):
+        return self.request('GET', 'kytos/of_lldp/v1/liveness/', params=params)
+
+    def set_liveness(self, interfaces, enabled=True):
+        action = 'enable' if enabled else 'disable'
+        return self.request('POST', f'kytos/of_lldp/v1/liveness/{action}/',
+                            json={'interfaces': interfaces})
+
+    # kytos/maintenance
+    def list_maintenances(self):
+        return self.request('GET', 'kytos/maintenance/v1/')
+
+    def get_maintenance(self, mw_id):
+        return self.request('GET', f'kytos/maintenance/v1/{mw_id}',
+                            'kytos/maintenance/v1/{id}')
+
+    def create_maintenance(self, payload):
+        return self.request('POST', 'kytos/maintenance/v1/', json=payload)
+
+    def update_maintenance(self, mw_id, payload):
+        return self.request('PATCH', f'kytos/maintenance/v1/{mw_id}',
+                            'kytos/maintenance/v1/{id}', json=payload)
+
+    def end_maintenance(self, mw_id):
+        return self.request('PATCH', f'kytos/maintenance/v1/{mw_id}/end',
+                            'kytos/maintenance/v1/{id}/end')
+
+    def delete_maintenance(self, mw_id):
+        return self.request('DELETE', f'kytos/maintenance/v1/{mw_id}',
+                            'kytos/maintenance/v1/{id}')
+
+    # kytos/pathfinder
+    def find_paths(self, payload):
+        return self.request('POST', 'kytos/pathfinder/v3/', json=payload)
+
+    # amlight/sdntrace_cp and amlight/sdntrace
+    def trace_cp(self, payload):
+        return self.request('PUT', 'amlight/sdntrace_cp/v1/trace', json=payload)
+
+    def traces_cp(self, payload):
+        return self.request('PUT', 'amlight/sdntrace_cp/v1/traces', json=payload)
+
+    def trace(self, payload):
+        return self.request('PUT', 'amlight/sdntrace/v1/trace', json=payload)
+
+    def get_trace(self, trace_id):
+        return self.request('GET', f'amlight/sdntrace/v1/trace/{trace_id}',
+                            'amlight/sdntrace/v1/trace/{id}')
+
+    # amlight/kytos_stats
+    def flow_stats(self, dpids=()):
+        return self.request('GET', 'amlight/kytos_stats/v1/flow/stats',
+                            params={'dpid': list(dpids)})
+
+    def table_stats(self, dpids=(), tables=()):
+        return self.request('GET', 'amlight/kytos_stats/v1/table/stats',
+                            params={'dpid': list(dpids), 'table': list(tables)})
+
+
+def kytos_dpid(dpid):
+    """Convert a Mininet dpid ('0000000000000001') to the Kytos format."""
+    dpid = dpid.replace(':', '').zfill(16)
+    return ':'.join(dpid[i:i + 2] for i in range(0, 16, 2))
+
+
+class Flow(NamedTuple):
+    """A flow entry of an ovs-ofctl dump-flows output."""
+    cookie: int
+    table: int
+    priority: int
+    match: str
+    actions: str
+    # ovs-ofctl flags printed before the match, e.g. ('send_flow_rem',)
+    flags: tuple = ()
+
+    def match_fields(self) -> dict:
+        """Match as a dict, e.g. {'in_port': '"s1-eth1"', 'dl_vlan': '101'}."""
+        fields = {}
+        for field in filter(None, self.match.split(',')):
+            key, _, value = field.partition('=')
+            fields[key] = value
+        return fields
+
+
+class FlowTable:
+    """Parsed ovs-ofctl dump-flows output indexed by cookie and table.
+
+    FlowTable.parse(s1.dpctl('dump-flows')).count(cookie=0xaa01)
+    """
+
+    def __init__(self, flows, output=''):
+        self.flows = flows
+        self.output = output
+        self._by_cookie = None
+        self._by_table = None
+
+    @classmethod
+    def parse(cls, output: str) -> "FlowTable":
+        """Parse a dump-flows output."""
+        flows = []
+        append = flows.append
+        for line in output.splitlines():
+            line = line.strip()
+            if not line.startswith('cookie='):
+                continue
+            head, _, actions = line.partition(' actions=')
+            chunks = head.rstrip(',').split(', ')
+            cookie = int(chunks[0][7:], 16)
+            table, priority, match = 0, 32768, ''
+            for chunk in chunks[1:]:
+                if chunk.startswith('table='):
+                    table = int(chunk[6:])
+                    break
+            # flags are bare words separated by spaces from the next field
+            flags = tuple(word for chunk in chunks[1:] for word in chunk.split(' ')
+                          if word in _FLOW_FLAGS)
+            # priority and match come last, after stats and flags
+            last = chunks[-1].rpartition(' ')[2]
+            if last.startswith('priority='):
+                priority, _, match = last.partition(',')
+                priority = int(priority[9:])
+            elif len(chunks) > 1 and last not in _FLOW_FLAGS \
+                    and not last.startswith(_FLOW_STATS):
+                match = last
+            append(Flow(cookie, table, priority, match, actions, flags))
+        return cls(flows, output)
+
+    @classmethod
+    def dump(cls, switch, *args) -> "FlowTable":
+        """Dump and parse the flows of a Mininet switch."""
+        return cls.parse(switch.dpctl('dump-flows', *args))
+
+    @staticmethod
+    def _cookie(cookie):
+        return int(cookie, 16) if isinstance(cookie, str) else cookie
+
+    def _index(self):
+        by_cookie, by_table = defaultdict(list), defaultdict(list)
+        for flow in self.flows:
+            by_cookie[flow.cookie].append(flow)
+            by_table[flow.table].append(flow)
+        self._by_cookie, self._by_table = by_cookie, by_table
+
+    def by_cookie(self, cookie) -> list:
+        if self._by_cookie is None:
+            self._index()
+        return self._by_cookie.get(self._cookie(cookie), [])
+
+    def by_table(self, table) -> list:
+        if self._by_table is None:
+            self._index()
+        return self._by_table.get(table, [])
+
+    def count(self, cookie=None, table=None) -> int:
+        """Number of flows, optionally filtered by cookie and/or table."""
+        if cookie is None and table is None:
+            return len(self.flows)
+        if table is None:
+            return len(self.by_cookie(cookie))
+        if cookie is None:
+            return len(self.by_table(table))
+        cookie = self._cookie(cookie)
+        return sum(1 for flow in self.by_table(table) if flow.cookie == cookie)
+
+    def __len__(self):
+        return len(self.flows)
+
+    def __iter__(self):
+        return iter(self.flows)
+
+    def __str__(self):
+        return self.output
+
+
+_FLOW_STATS = (
+    'duration=', 'table=', 'n_packets=', 'n_bytes=', 'idle_timeout=',
+    'hard_timeout=', 'idle_age=', 'hard_age=', 'importance=',
+)
+_FLOW_FLAGS = frozenset((
+    'send_flow_rem', 'check_overlap', 'reset_counts', 'no_packet_counts',
+    'no_byte_counts',
+))
+
+
+def evc_cookie(evc_id):
+    """Cookie mef_eline uses for the flows of EVC evc_id."""
+    return int(f'aa{evc_id[:14]}', 16)
+
+
+def wait_until(predicate, timeout=30, interval=0.5, msg=None):
+    """Poll predicate until it returns a truthy value.
+
+    The truthy value is returned, so predicates can hand back whatever they
+    were waiting for (an EVC, a flow dump). Raise TimeoutError otherwise.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result:
+            return result
+        if time.monotonic() >= deadline:
+            name = getattr(predicate, '__name__', repr(predicate))
+            raise TimeoutError(msg or f'Timeout: {name} not met after {timeout}s')
+        time.sleep(interval)
+
+
+def flows_with_cookie(switch, cookie, count):
+    """Predicate: switch has exactly count flows with the given cookie."""
+    cookie = FlowTable._cookie(cookie)
+
+    def predicate():
+        flows = FlowTable.dump(switch)
+        return (flows or True) if flows.count(cookie=cookie) == count else None
+
+    predicate.__name__ = f'flows_with_cookie({switch.name}, {cookie:#x}, {count})'
+    return predicate
+
+
+def flows_reinstalled(switch, cookie, since):
+    """Predicate: switch has flows with the given cookie and all of them
+    were (re)installed after the epoch since, going by their duration."""
+    cookie = FlowTable._cookie(cookie)
+
+    def predicate():
+        output = switch.dpctl('dump-flows', f'cookie={cookie:#x}/-1')
+        durations = [float(value) for value in re.findall(r'duration=([\d.]+)s', output)]
+        age = time.time() - since
+        return output if durations and max(durations) < age else None
+
+    predicate.__name__ = f'flows_reinstalled({switch.name}, {cookie:#x})'
+    return predicate
+
+
+def flows_dump_matches(switch, count, present=(), absent=()):
+    """Predicate: switch has count flows and its dump-flows output contains
+    every text in present and none in absent."""
+    def predicate():
+        output = switch.dpctl('dump-flows')
+        if len(FlowTable.parse(output)) != count:
+            return None
+        if all(text in output for text in present) and \
+                not any(text in output for text in absent):
+            return output
+        return None
+
+    predicate.__name__ = f'flows_dump_matches({switch.name}, {count})'
+    return predicate
+
+
+def evc_active(evc_id, api_url=KYTOS_API):
+    """Predicate: EVC evc_id is active. Returns the EVC once it is."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/mef_eline/v2/evc/{evc_id}', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        evc = response.json()
+        return evc if evc.get('active') else None
+
+    predicate.__name__ = f'evc_active({evc_id})'
+    return predicate
+
+
+def evc_state(evc_id, api_url=KYTOS_API, **fields):
+    """Predicate: EVC evc_id has all the given field values, e.g.
+    evc_state(evc_id, enabled=False, active=False). Returns the EVC."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/mef_eline/v2/evc/{evc_id}', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        evc = response.json()
+        return evc if all(evc.get(key) == value for key, value in fields.items()) else None
+
+    predicate.__name__ = f'evc_state({evc_id}, {fields})'
+    return predicate
+
+
+def evc_matches(evc_id, check, api_url=KYTOS_API):
+    """Predicate: check(evc) is true for EVC evc_id, for conditions that
+    evc_state cannot express (e.g. on its paths). Returns the EVC."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/mef_eline/v2/evc/{evc_id}', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        evc = response.json()
+        return evc if check(evc) else None
+
+    predicate.__name__ = f'evc_matches({evc_id}, {getattr(check, "__name__", check)})'
+    return predicate
+
+
+def stored_flows_count(dpid, count, state='installed', api_url=KYTOS_API):
+    """Predicate: flow_manager stores exactly count flows of dpid in state."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/flow_manager/v2/stored_flows',
+                                    params={'dpids': dpid, 'state': state}, timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        flows = response.json().get(dpid, [])
+        return (flows or True) if len(flows) == count else None
+
+    predicate.__name__ = f'stored_flows_count({dpid}, {count}, {state})'
+    return predicate
+
+
+def flows_installed(dpid, flows, api_url=KYTOS_API):
+    """Predicate: every flow of a flow_manager payload is stored as installed
+    on dpid, compared on the fields the payload sets."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/flow_manager/v2/stored_flows',
+                                    params={'dpids': dpid, 'state': 'installed'}, timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        stored = [entry['flow'] for entry in response.json().get(dpid, [])]
+        return all(any(all(stored_flow.get(key) == value for key, value in flow.items())
+                       for stored_flow in stored)
+                   for flow in flows)
+
+    predicate.__name__ = f'flows_installed({dpid}, {len(flows)} flows)'
+    return predicate
+
+
+def links_count(count, active=True, api_url=KYTOS_API):
+    """Predicate: topology reports exactly count (active) links."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/topology/v3/links', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        links = response.json()['links']
+        if active:
+            links = {k: v for k, v in links.items() if v['active']}
+        return (links or True) if len(links) == count else None
+
+    predicate.__name__ = f'links_count({count})'
+    return predicate
+
+
+def interface_matches(interface_id, check, api_url=KYTOS_API):
+    """Predicate: check(interface) is true for the topology interface
+    interface_id. Returns the interface."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/topology/v3/interfaces', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        interface = response.json()['interfaces'].get(interface_id)
+        return interface if interface and check(interface) else None
+
+    predicate.__name__ = f'interface_matches({interface_id}, {getattr(check, "__name__", check)})'
+    return predicate
+
+
+def liveness_status(interface_ids, status, api_url=KYTOS_API):
+    """Predicate: of_lldp liveness reports every interface in interface_ids
+    with status ('up' or 'down'). Returns {interface_id: status}."""
+    def predicate():
+        try:
+            response = requests.get(f'{api_url}/of_lldp/v1/liveness/', timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        statuses = {entry['id']: entry['status'] for entry in response.json()['interfaces']}
+        if all(statuses.get(interface_id) == status for interface_id in interface_ids):
+            return statuses
+        return None
+
+    predicate.__name__ = f'liveness_status({len(interface_ids)} interfaces, {status})'
+    return predicate
+
+
+def switch_connected(switch, api_url=KYTOS_API):
+    """Predicate: Mininet switch is connected and active on the controller."""
+    dpid = kytos_dpid(switch.dpid)
+
+    def predicate():
+        if not switch.connected():
+            return False
+        try:
+            response = requests.get(f'{api_url}/topology/v3/switches', timeout=5)
+        except requests.RequestException:
+            return False
+        if response.status_code != 200:
+            return False
+        switches = response.json()['switches']
+        return dpid in switches and switches[dpid]['active']
+
+    predicate.__name__ = f'switch_connected({switch.name})'
+    return predicate
+
+
+def ping_stats(output):
+    """sent, received, loss (%) and rtt_min/avg/max (ms, None without
+    replies) from the summary of a ping output."""
+    stats = {'sent': 0, 'received': 0, 'loss': 100.0,
+             'rtt_min': None, 'rtt_avg': None, 'rtt_max': None}
+    for line in output.splitlines():
+        if 'packets transmitted' in line:
+            fields = line.split()
+            stats['sent'], stats['received'] = int(fields[0]), int(fields[3])
+            if stats['sent']:
+                stats['loss'] = 100.0 * (stats['sent'] - stats['received']) / stats['sent']
+        elif line.startswith(('rtt ', 'round-trip ')):
+            rtt_min, rtt_avg, rtt_max = line.split('=')[1].split('/')[:3]
+            stats.update(rtt_min=float(rtt_min), rtt_avg=float(rtt_avg),
+                         rtt_max=float(rtt_max))
+    return stats
+
+
+class PingProbe:
+    """High-rate ping between two hosts to measure data-plane outages.
+
+    probe = PingProbe(h1, '101.0.0.4', interval=0.001)
+    probe.start()
+    ...
+    result = probe.stop()   # sent, received, lost, loss_ms, outages
+    """
+
+    def __init__(self, host, dst, interval=0.001, timeout=1):
+        self.host = host
+        self.dst = dst
+        self.interval = interval
+        self.timeout = timeout
+        self.process = None
+
+    def start(self):
+        self.process = self.host.popen(
+            ['ping', '-D', '-n', '-i', str(self.interval), '-W', str(self.timeout),
+             self.dst],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            universal_newlines=True)
+        return self
+
+    def stop(self):
+        self.process.send_signal(signal.SIGINT)
+        output, _ = self.process.communicate(timeout=10)
+        return self.parse(output)
+
+    def parse(self, output):
+        """Replies as [(epoch, seq)] and the gaps between them.
+
+        An outage is a run of missing icmp_seq numbers; its duration is the
+        time between the replies around it, in milliseconds.
+        """
+        replies = []
+        sent = 0
+        for line in output.splitlines():
+            if ' bytes from ' in line and 'icmp_seq=' in line:
+                stamp = float(line[1:line.index(']')])
+                seq = int(line.split('icmp_seq=')[1].split()[0])
+                replies.append((stamp, seq))
+            elif 'packets transmitted' in line:
+                sent = int(line.split()[0])
+        replies.sort(key=lambda reply: reply[1])
+        outages = []
+        for (stamp, seq), (next_stamp, next_seq) in zip(replies, replies[1:]):
+            if next_seq - seq > 1:
+                outages.append({'start': stamp, 'end': next_stamp,
+                                'lost': next_seq - seq - 1,
+                                'ms': (next_stamp - stamp) * 1000})
+        sent = max(sent, replies[-1][1] if replies else 0)
+        lost = sent - len(replies)
+        return {'sent': sent, 'received': len(replies), 'lost': lost,
+                'loss_ms': lost * self.interval * 1000, 'outages': outages}
+
+
+class IperfProbe:
+    """iperf3 run from client to server host, UDP by default.
+
+    The server runs with --one-off and JSON output so the received rate,
+    loss and jitter are taken from the receiving side, per interval too.
+
+    probe = IperfProbe(h4, h1, '101.0.0.4', bandwidth='1G', duration=10)
+    probe.start()
+    ...
+    result = probe.wait()   # gbps, sent_gbps, loss_percent, jitter_ms, intervals
+    """
+
+    def __init__(self, server, client, dst, bandwidth='1G', duration=10,
+                 udp=True, length=1400, interval=0.5, port=5201):
+        self.server = server
+        self.client = client
+        self.dst = dst
+        self.bandwidth = bandwidth
+        self.duration = duration
+        self.udp = udp
+        self.length = length
+        self.interval = interval
+        self.port = port
+        self.server_process = None
+        self.client_process = None
+
+    def start(self):
+        self.server_process = self.server.popen(
+            ['iperf3', '-s', '-1', '-J', '-i', str(self.interval), '-p', str(self.port)],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        wait_until(lambda: str(self.port) in self.server.cmd(f'ss -ltn sport = :{self.port}'),
+                   10, interval=0.05, msg='iperf3 server did not start')
+        args = ['iperf3', '-c', self.dst, '-J', '-t', str(self.duration),
+                '-i', str(self.interval), '-p', str(self.port), '-b', str(self.bandwidth)]
+        if self.udp:
+            args += ['-u', '-l', str(self.length)]
+        self.client_process = self.client.popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        return self
+
+    def wait(self):
+        timeout = self.duration + 30
+        client, _ = self.client_process.communicate(timeout=timeout)
+        server, _ = self.server_process.communicate(timeout=timeout)
+        return self.parse(json.loads(server), json.loads(client))
+
+    @staticmethod
+    def parse(server, client):
+        """Receiver side totals and intervals, plus the sender rate."""
+        if 'error' in client or 'error' in server:
+            raise RuntimeError(f"iperf3 failed: {client.get('error') or server.get('error')}")
+
+        def summary(data):
+            end = data['end']
+            return end.get('sum') or end.get('sum_received') or {}
+
+        received, sent = summary(server), summary(client)
+        return {
+            'gbps': received.get('bits_per_second', 0) / 1e9,
+            'sent_gbps': (client['end'].get('sum_sent') or sent).get('bits_per_second', 0) / 1e9,
+            'loss_percent': received.get('lost_percent', 0.0),
+            'lost_packets': received.get('lost_packets', 0),
+            'packets': received.get('packets', 0),
+            'jitter_ms': received.get('jitter_ms'),
+            'intervals': [{
+                'start': interval['sum']['start'],
+                'end': interval['sum']['end'],
+                'gbps': interval['sum']['bits_per_second'] / 1e9,
+                'loss_percent': interval['sum'].get('lost_percent', 0.0),
+                'jitter_ms': interval['sum'].get('jitter_ms'),
+            } for interval in server.get('intervals', [])],
+        }
+
+
+class KytosProcess:
+    """Stop and start the kytosd daemon, timing each phase.
+
+    kytosd daemonizes itself, so the Popen handle only covers the launcher;
+    the daemon is then tracked through its pid file and its exit is polled
+    instead of sleeping a fixed amount of time.
+    """
+
+    def __init__(self, pid_path=None):
+        if pid_path is None:
+            pid_name = f'kytosd-{WORKER}.pid' if WORKER else 'kytosd.pid'
+            pid_path = os.path.join(BASE_ENV, 'var/run/kytos', pid_name)
+        self.pid_path = pid_path
+        self.conf_path = self.write_worker_conf() if WORKER else None
+        self.pid = None
+        self.popen = None
+        self.stop_duration = None
+        self.start_duration = None
+        # wall clock epoch when kytosd was last launched, to match log stamps
+        self.launched_at = None
+
+    def write_worker_conf(self):
+        """Write a kytos.conf for this worker (api_port, pidfile)."""
+        config = ConfigParser()
+        config.read(os.path.join(BASE_ENV, 'etc/kytos/kytos.conf'))
+        if not config.has_section('daemon'):
+            config.add_section('daemon')
+        config.set('daemon', 'api_port', str(KYTOS_API_PORT))
+        config.set('daemon', 'port', str(OF_PORT))
+        config.set('daemon', 'pidfile', self.pid_path)
+        conf_path = os.path.join(BASE_ENV, 'etc/kytos', f'kytos-{WORKER}.conf')
+        with open(conf_path, 'w') as f:
+            config.write(f)
+        return conf_path
+
+    def read_pid(self):
+        """Return the pid in the kytosd pid file, if any."""
+        try:
+            with open(self.pid_path, "r") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def is_running(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def running_pids(self):
+        """Pids of kytosd, from the pid file or falling back to pgrep."""
+        pids = {pid for pid in (self.pid, self.read_pid()) if pid}
+        pids = {pid for pid in pids if self.is_running(pid)}
+        if not pids:
+            # only look for the kytosd of this worker in a parallel run
+            pattern = ['-f', self.conf_path] if self.conf_path else ['kytosd']
+            result = subprocess.run(['pgrep', *pattern], capture_output=True, text=True)
+            pids = {int(pid) for pid in result.stdout.split()}
+        return pids
+
+    def _wait_exit(self, pids, timeout, interval):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            pids = {pid for pid in pids if self.is_running(pid)}
+            if not pids:
+                return set()
+            time.sleep(interval)
+        return {pid for pid in pids if self.is_running(pid)}
+
+    def stop(self, timeout=5, interval=0.05):
+        """SIGTERM kytosd and wait for it to exit, SIGKILL on timeout."""
+        start = time.monotonic()
+        pids = self.running_pids()
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        pids = self._wait_exit(pids, timeout, interval)
+        if pids:
+            print("FAIL to stop kytos after %s seconds -- %s. Force stop!" % (timeout, pids))
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self._wait_exit(pids, timeout, interval)
+        if os.path.exists(self.pid_path):
+            os.remove(self.pid_path)
+        self.pid = None
+        self.stop_duration = time.monotonic() - start
+        return self.stop_duration
+
+    def start(self, args=(), wait_started=None, timeout=60):
+        """Launch kytosd with args and wait until wait_started() returns.
+
+        The launcher must daemonize within timeout seconds, else it is
+        killed and subprocess.TimeoutExpired raised.
+        """
+        start = time.monotonic()
+        if self.conf_path:
+            args = ['-c', self.conf_path, *args]
+        self.launched_at = time.time()
+        self.popen = subprocess.Popen(['kytosd', *args])
+        try:
+            self.popen.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.popen.kill()
+            self.popen.wait()
+            raise
+        if wait_started:
+            wait_started()
+        self.pid = self.read_pid()
+        self.start_duration = time.monotonic() - start
+        return self.start_duration
+
+
 class NetworkTest:
+    # pid of the last kytosd started by start_controller, for ResourceSampler
+    controller_pid = None
+    # Networks shared by the whole session, keyed by topo_name
+    _pool = {}
+    # Database and flows captured by restore_snapshot, keyed by (topo_name, name)
+    _snapshots = {}
+
     def __init__(
         self,
         controller_ip,
@@ -252,16 +1522,27 @@ class NetworkTest:
         db_client=mongo_client,
         db_client_options=None,
     ):
+        self.controller_ip = controller_ip
+        self.topo_name = topo_name
+        self.started = False
+        self.pooled = False
         # Create an instance of our topology
         mininet.clean.cleanup()
+        topo = build_topo(topo_name)
+        if not isinstance(topo, GeneratedTopo):
+            # generated topologies take their listen ports per worker
+            for name in topo.switches():
+                info = topo.nodeInfo(name)
+                if 'listenPort' in info:
+                    info['listenPort'] += WORKER_PORT_OFFSET
 
         # Create a network based on the topology using
         # OVS and controlled by a remote controller
         patch('mininet.util.fixLimits', side_effect=None)
         self.net = Mininet(
-            topo=topos.get(topo_name, (lambda: RingTopo()))(),
+            topo=topo,
             controller=lambda name: RemoteController(
-                name, ip=controller_ip, port=6653),
+                name, ip=controller_ip, port=OF_PORT),
             switch=OVSSwitch,
             autoSetMacs=True)
         db_client_kwargs = db_client_options or {}
@@ -269,68 +1550,191 @@ class NetworkTest:
         self.db_client = db_client(**db_client_kwargs)
         self.db_name = db_name
         self.db = self.db_client[self.db_name]
+        self.kytos = KytosProcess()
+        # {collection: seconds} of every reset_database by clean_database
+        self.reset_timings = []
 
-    def start(self):
-        self.net.start()
-        self.start_controller(clean_config=True)
+    @classmethod
+    def shared(cls, controller_ip, topo_name="ring", **kwargs):
+        """Return the session network for topo_name, building it only once.
+
+        Topologies reuse switch names and listen ports, so only one of them
+        can be live at a time: asking for another topo_name tears down the
+        current one. Set E2E_SHARED_NETWORK=0 to build a network per class.
+        """
+        if os.environ.get("E2E_SHARED_NETWORK", "1") == "0":
+            return cls(controller_ip, topo_name, **kwargs)
+        net = cls._pool.get(topo_name)
+        if net is not None:
+            return net
+        cls.stop_pool()
+        net = cls(controller_ip, topo_name, **kwargs)
+        net.pooled = True
+        cls._pool[topo_name] = net
+        return net
+
+    @classmethod
+    def stop_pool(cls):
+        """Tear down every shared network."""
+        while cls._pool:
+            _, net = cls._pool.popitem()
+            net.pooled = False
+            net.stop()
+
+    def start(self, controller=True):
+        """Start (or reset) the network and, unless controller is False,
+        restart kytosd with a clean config."""
+        if self.started:
+            self.reset()
+        else:
+            self.net.start()
+            self.started = True
+        if controller:
+            self.start_controller(clean_config=True)
+
+    def reset(self):
+        """Bring a reused network back to its initial state.
+
+        Flows are removed, links brought up, switches pointed back to the
+        controller and hosts left only with their own (re-addressed)
+        interfaces, e.g. vlan subinterfaces created by tests are deleted.
+        """
+        target = f"tcp:{self.controller_ip}:{OF_PORT}"
+        for sw in self.net.switches:
+            sw.dpctl('del-flows')
+            sw.vsctl(f"set-controller {sw.name} {target}")
+            sw.controllerUUIDs(update=True)
+        self.config_all_links_up()
+        for host in self.net.hosts:
+            intfs = host.intfNames()
+            for line in host.cmd('ip -o link show').splitlines():
+                fields = line.split(': ')
+                if len(fields) < 2:
+                    continue
+                name = fields[1].split('@')[0]
+                if name != 'lo' and name not in intfs:
+                    host.cmd(f'ip link del {name}')
+            for intf in intfs:
+                host.cmd(f'ip addr flush dev {intf}')
+            host.configDefault()
 
     def drop_database(self):
         """Drop database."""
         self.db_client.drop_database(self.db_name)
 
+    def reset_database(self):
+        """Empty every collection in place, keeping collections and indexes.
+
+        Unlike dropping the database, this avoids a replicated catalog change
+        and the NApps recreating their indexes on startup. Returns the time
+        spent on each collection.
+        """
+        timings = {}
+        for name in self.db.list_collection_names():
+            if name.startswith('system.'):
+                continue
+            start = time.monotonic()
+            self.db[name].delete_many({})
+            timings[name] = time.monotonic() - start
+        return timings
+
+    def clean_database(self):
+        """Reset the database, MONGO_RESET_MODE=drop drops it instead.
+
+        The per-collection reset times are appended to reset_timings.
+        """
+        if os.environ.get("MONGO_RESET_MODE", "delete") == "drop":
+            self.drop_database()
+            return
+        self.reset_timings.append(self.reset_database())
+
+    def capture_snapshot(self):
+        """Capture the database documents and the flows of every switch."""
+        collections = {}
+        for name in self.db.list_collection_names():
+            if not name.startswith('system.'):
+                collections[name] = list(self.db[name].find({}))
+        flows = {sw.name: sw.dpctl('dump-flows', '--no-stats')
+                 for sw in self.net.switches}
+        return {"collections": collections, "flows": flows}
+
+    def load_snapshot(self, snapshot):
+        """Replace the database and flows with a capture, kytosd must be stopped."""
+        self.reset_database()
+        for name, docs in snapshot["collections"].items():
+            if docs:
+                self.db[name].insert_many(docs, ordered=False)
+        for sw in self.net.switches:
+            with tempfile.NamedTemporaryFile('w', suffix='.flows') as f:
+                f.write(snapshot["flows"].get(sw.name, ''))
+                f.flush()
+                sw.dpctl('replace-flows', f.name)
+
+    def restore_snapshot(self, name, setup, enable_all=True):
+        """Start kytosd on the state that setup() builds, building it once.
+
+        The first call for this topology runs setup() (which starts the
+        controller and creates the state, e.g. EVCs), stops kytosd and
+        captures the database and the switches' flows. Later calls, from
+        any class sharing the topology, bulk insert that capture before
+        kytosd starts and skip setup() and its convergence waits.
+        Returns whatever setup() returned on the first call.
+        """
+        key = (self.topo_name, name)
+        if key not in self._snapshots:
+            result = setup()
+            self.kytos.stop()
+            self._snapshots[key] = (self.capture_snapshot(), result)
+        snapshot, result = self._snapshots[key]
+        self.kytos.stop()
+        self.load_snapshot(snapshot)
+        self.start_controller(enable_all=enable_all)
+        return result
+
     def start_controller(self, clean_config=False, enable_all=False,
                          del_flows=False, port=None, database='mongodb',
                          extra_args=os.environ.get("KYTOSD_EXTRA_ARGS", "")):
         # Restart kytos and check if the napp is still disabled
-        try:
-            os.system('pkill kytosd')
-            # with open('/var/run/kytos/kytosd.pid', "r") as f:
-            #    pid = int(f.read())
-            #    os.kill(pid, signal.SIGTERM)
-            time.sleep(5)
-            pid_path = os.path.join(BASE_ENV, 'var/run/kytos/kytosd.pid')
-            if os.path.exists(pid_path):
-                raise Exception("Kytos pid still exists.")
-        except Exception as e:
-            print("FAIL to stop kytos after 5 seconds -- %s. Force stop!" % e)
-            os.system('pkill -9 kytosd')
-            os.system(f'rm -f {pid_path}')
+        self.kytos.stop()
 
         if clean_config and database:
             try:
-                self.drop_database()
+                self.clean_database()
             except ServerSelectionTimeoutError as exc:
-                print(f"FAIL to drop database. {str(exc)}")
+                print(f"FAIL to clean database. {str(exc)}")
 
         if clean_config or del_flows:
             # Remove any installed flow
             for sw in self.net.switches:
                 sw.dpctl('del-flows')
 
-        daemon = 'kytosd'
+        args = []
         if database:
-            daemon += f' --database {database}'
+            args += ['--database', database]
         if port:
-            daemon += ' --port %s' % port
+            args += ['--port', str(port)]
         if enable_all:
-            daemon += ' -E'
+            args.append('-E')
         if extra_args:
-            daemon += ' ' + extra_args
-        os.system(daemon)
+            args += shlex.split(extra_args)
+        NetworkTest.controller_pid = None
+        self.kytos.start(args, wait_started=self.wait_controller_start)
+        NetworkTest.controller_pid = self.kytos.pid
 
-        self.wait_controller_start()
+    def wait_controller_start(self, timeout=60, interval=0.1):
+        """Wait until controller starts according to core/status API.
 
-    def wait_controller_start(self):
-        """Wait until controller starts according to core/status API."""
-        wait_count = 0
-        while wait_count < 60:
+        Polled every interval seconds, so the measured start time (and the
+        startup profile) is not rounded up to a coarse polling step.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             try:
-                response = requests.get('http://127.0.0.1:8181/api/kytos/core/status/', timeout=1)
+                response = requests.get(f'{KYTOS_API}/core/status/', timeout=1)
                 assert response.json()['response'] == 'running'
                 break
             except:
-                time.sleep(0.5)
-                wait_count += 0.5
+                time.sleep(interval)
         else:
             msg = 'Timeout while starting Kytos controller.'
             raise Exception(msg)
@@ -344,12 +1748,39 @@ class NetworkTest:
                 status = [(sw.name, sw.connected()) for sw in self.net.switches]
                 raise Exception('Timeout: timed out waiting switches reconnect. Status %s' % status)
 
+    def switch_links(self):
+        """Inter-switch links that are up, excluding loops."""
+        links = []
+        for link in self.net.links:
+            node1, node2 = link.intf1.node, link.intf2.node
+            if node1 not in self.net.switches or node2 not in self.net.switches:
+                continue
+            if node1 == node2:
+                continue
+            if link.intf1.isUp() and link.intf2.isUp():
+                links.append(link)
+        return links
+
+    def wait_switches_active(self, timeout=30):
+        """Wait until all switches are connected and active on the controller."""
+        deadline = time.monotonic() + timeout
+        for sw in self.net.switches:
+            wait_until(switch_connected(sw), max(deadline - time.monotonic(), 0))
+
+    def wait_topology_converged(self, timeout=60):
+        """Wait until all switches are active and every link that is up was
+        discovered by the controller (LLDP requires the napps enabled)."""
+        start = time.monotonic()
+        self.wait_switches_active(timeout)
+        remaining = max(timeout - (time.monotonic() - start), 0)
+        wait_until(links_count(len(self.switch_links())), remaining)
+
     def restart_kytos_clean(self):
         self.start_controller(clean_config=True, enable_all=True)
         self.wait_switches_connect()
 
-    def reconnect_switches(self, target="tcp:127.0.0.1:6653",
-                           temp_target="tcp:127.0.0.1:6654"):
+    def reconnect_switches(self, target=f"tcp:127.0.0.1:{OF_PORT}",
+                           temp_target=f"tcp:127.0.0.1:{OF_PORT + 1}"):
         """Restart switches connections.
         This method can also be used to trigger a consistency check initial run.
 
@@ -364,6 +1795,114 @@ class NetworkTest:
             sw.controllerUUIDs(update=True)
         self.wait_switches_connect()
 
+    def snapshot_flows(self, switches=None):
+        """Dump the flows of all switches (or the given names/nodes) at once.
+
+        Each switch has its own shell, so the dumps run concurrently and the
+        returned {name: FlowTable} is a view taken at close to the same time.
+        """
+        if switches is None:
+            switches = self.net.switches
+        switches = [self.net.get(sw) if isinstance(sw, str) else sw
+                    for sw in switches]
+        with ThreadPoolExecutor(max_workers=max(len(switches), 1)) as executor:
+            tables = list(executor.map(FlowTable.dump, switches))
+        return {sw.name: table for sw, table in zip(switches, tables)}
+
+    def wait_flow_counts(self, counts, timeout=30):
+        """Wait until each switch in counts ({name: flows}) has that many
+        flows and return the snapshot_flows of those switches."""
+        def predicate():
+            tables = self.snapshot_flows(counts)
+            if all(len(tables[name]) == count for name, count in counts.items()):
+                return tables
+            return None
+
+        predicate.__name__ = f'flow counts {counts}'
+        return wait_until(predicate, timeout)
+
+    def switch_by_dpid(self, dpid):
+        """Mininet switch of a Kytos dpid ('00:00:00:00:00:00:00:11')."""
+        for switch in self.net.switches:
+            if kytos_dpid(switch.dpid) == dpid:
+                return switch
+        raise KeyError(dpid)
+
+    def link_by_interface(self, interface_id):
+        """Mininet link of a Kytos interface id ('00:00:00:00:00:00:00:11:2')."""
+        dpid, _, port = interface_id.rpartition(':')
+        try:
+            return self.switch_by_dpid(dpid).intfs[int(port)].link
+        except KeyError:
+            raise KeyError(interface_id) from None
+
+    def config_link_status(self, interface_id, status):
+        """Set only the link of interface_id up or down; configLinkStatus
+        would change every parallel link between the same two switches."""
+        link = self.link_by_interface(interface_id)
+        link.intf1.ifconfig(status)
+        link.intf2.ifconfig(status)
+
+    def vlan_ip(self, host, vlan):
+        """Address of host on VLAN vlan: 10.<vlan high>.<vlan low>.<host index>."""
+        return f'10.{vlan >> 8}.{vlan & 255}.{self.net.hosts.index(host) + 1}'
+
+    def config_vlan(self, hosts, vlan, name=None):
+        """Add a VLAN subinterface with a /24 from vlan_ip to every host.
+
+        Each host gets a single shell command, sent to all hosts before
+        waiting for any. Returns {host name: ip}.
+        """
+        name = name or f'vlan{vlan}'
+        addresses = {}
+        for host in hosts:
+            addresses[host.name] = self.vlan_ip(host, vlan)
+            host.sendCmd(
+                f'ip link add link {host.intfNames()[0]} name {name} type vlan id {vlan}'
+                f' 2>/dev/null; ip link set up {name};'
+                f' ip addr replace {addresses[host.name]}/24 dev {name}')
+        for host in hosts:
+            host.waitOutput()
+        return addresses
+
+    def remove_vlan(self, hosts, vlan, name=None):
+        name = name or f'vlan{vlan}'
+        for host in hosts:
+            host.sendCmd(f'ip link del {name} 2>/dev/null')
+        for host in hosts:
+            host.waitOutput()
+
+    def connectivity_matrix(self, pairs, vlan=None, count=1, interval=0.2,
+                            timeout=2, keep_vlan=False):
+        """Ping all (src, dst) host pairs at once.
+
+        Returns {(src name, dst name): ping_stats}. With vlan, the hosts get
+        a VLAN subinterface first (config_vlan), removed afterwards unless
+        keep_vlan; otherwise the hosts' own IPs are used.
+        """
+        pairs = [tuple(self.net.get(h) if isinstance(h, str) else h for h in pair)
+                 for pair in pairs]
+        hosts = list({host.name: host for pair in pairs for host in pair}.values())
+        if vlan is None:
+            addresses = {host.name: host.IP() for host in hosts}
+        else:
+            addresses = self.config_vlan(hosts, vlan)
+        try:
+            pings = {
+                (src.name, dst.name): src.popen(
+                    ['ping', '-n', '-q', '-c', str(count), '-i', str(interval),
+                     '-W', str(timeout), addresses[dst.name]],
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    universal_newlines=True)
+                for src, dst in pairs
+            }
+            matrix = {pair: ping_stats(ping.communicate()[0])
+                      for pair, ping in pings.items()}
+        finally:
+            if vlan is not None and not keep_vlan:
+                self.remove_vlan(hosts, vlan)
+        return matrix
+
     def config_all_links_up(self):
         for link in self.net.links:
             self.net.configLinkStatus(
@@ -373,5 +1912,627 @@ class NetworkTest:
             )
 
     def stop(self):
+        if self.pooled:
+            # Shared networks are torn down by stop_pool at session end
+            return
         self.net.stop()
         mininet.clean.cleanup()
+
+
+class PhaseRecorder:
+    """Break each test's wall-clock time into phases.
+
+    install() wraps NetworkTest.start_controller, time.sleep, HTTP requests,
+    OVSSwitch.dpctl and Host.cmd; nothing is recorded until it is called.
+    Only the outermost phase is accounted (the sleeps of a controller
+    restart count as restart) and only in the thread running the test, so
+    the phases add up to at most its wall time: work done by pools and
+    other threads while the test waits for them falls into other.
+    """
+
+    PHASES = ('restart', 'sleep', 'http', 'dpctl', 'host_cmd')
+
+    def __init__(self):
+        self.records = []
+        self.current = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patched = []
+        self._thread = None
+
+    def _wrap(self, phase, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if (self.current is None or threading.get_ident() != self._thread
+                    or getattr(self._local, 'busy', False)):
+                return func(*args, **kwargs)
+            self._local.busy = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.busy = False
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    if self.current is not None:
+                        self.current[phase] += elapsed
+        return wrapper
+
+    def _patch(self, owner, attr, phase):
+        original = getattr(owner, attr)
+        self._patched.append((owner, attr, original))
+        setattr(owner, attr, self._wrap(phase, original))
+
+    def install(self):
+        from mininet.node import Host
+        self._patch(NetworkTest, 'start_controller', 'restart')
+        self._patch(time, 'sleep', 'sleep')
+        self._patch(requests.Session, 'request', 'http')
+        self._patch(OVSSwitch, 'dpctl', 'dpctl')
+        self._patch(Host, 'cmd', 'host_cmd')
+
+    def uninstall(self):
+        while self._patched:
+            owner, attr, original = self._patched.pop()
+            setattr(owner, attr, original)
+
+    def start(self, nodeid):
+        if not self._patched:
+            return
+        self._thread = threading.get_ident()
+        self.current = dict.fromkeys(self.PHASES, 0.0)
+        self.current.update(nodeid=nodeid, outcome='passed', setup=0.0,
+                            call=0.0, teardown=0.0, started=time.time())
+        self._start = time.perf_counter()
+
+    def add_report(self, report):
+        """Account a setup/call/teardown report of the running test."""
+        if self.current is None:
+            return
+        self.current[report.when] += report.duration
+        if report.failed or (report.when == 'call' and report.outcome != 'passed'):
+            self.current['outcome'] = report.outcome
+
+    def stop(self):
+        record, self.current = self.current, None
+        if record is None:
+            return
+        record['total'] = time.perf_counter() - self._start
+        record['other'] = max(
+            record['total'] - sum(record[phase] for phase in self.PHASES), 0.0)
+        self.records.append(record)
+
+    @property
+    def fields(self):
+        return ('nodeid', 'outcome', 'started', 'total', 'setup', 'call',
+                'teardown', *self.PHASES, 'other')
+
+    def write(self, prefix):
+        """Write prefix.json and prefix.csv, returning their paths."""
+        json_path, csv_path = f'{prefix}.json', f'{prefix}.csv'
+        with open(json_path, 'w') as f:
+            json.dump({'phases': self.PHASES, 'tests': self.records}, f, indent=2)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fields)
+            writer.writeheader()
+            writer.writerows(self.records)
+        return json_path, csv_path
+
+    def slowest(self, top=10):
+        return sorted(self.records, key=lambda r: r['total'], reverse=True)[:top]
+
+
+class ResourceSampler(threading.Thread):
+    """Sample the kytosd process every interval seconds from /proc.
+
+    Each sample has the RSS, CPU% since the previous sample, thread count,
+    open fds and established connections to the Mongo ports, tagged with
+    the running test. pid_source() is called on every sample, so the
+    sampler follows controller restarts. Samples of a kytosd younger than
+    warmup seconds (from its first sample) are left out of growth(), so
+    the memory a fresh controller takes while loading is not a leak.
+    """
+
+    FIELDS = ('time', 'test', 'pid', 'rss_mb', 'cpu_percent', 'threads',
+              'fds', 'mongo_connections')
+
+    def __init__(self, pid_source, interval=1.0, mongo_ports=None, warmup=30.0):
+        super().__init__(daemon=True)
+        self.pid_source = pid_source
+        self.interval = interval
+        self.warmup = warmup
+        if mongo_ports is None:
+            seeds = os.environ.get('MONGO_HOST_SEEDS') or 'localhost:27017'
+            mongo_ports = {int(seed.rpartition(':')[2]) for seed in seeds.split(',')}
+        self.mongo_ports = mongo_ports
+        self.test = None
+        self.samples = []
+        self._cpu = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._ticks = os.sysconf('SC_CLK_TCK')
+
+    def _mongo_connections(self, pid, fds):
+        inodes = set()
+        for fd in fds:
+            try:
+                target = os.readlink(f'/proc/{pid}/fd/{fd}')
+            except OSError:
+                continue
+            if target.startswith('socket:['):
+                inodes.add(target[8:-1])
+        count = 0
+        for table in ('tcp', 'tcp6'):
+            try:
+                with open(f'/proc/{pid}/net/{table}') as f:
+                    next(f)
+                    for line in f:
+                        fields = line.split()
+                        # remote address, state 01 (ESTABLISHED), inode
+                        port = int(fields[2].rpartition(':')[2], 16)
+                        if fields[3] == '01' and port in self.mongo_ports \
+                                and fields[9] in inodes:
+                            count += 1
+            except OSError:
+                continue
+        return count
+
+    def sample(self):
+        """Take one sample now; None if kytosd is not running."""
+        pid = self.pid_source()
+        if not pid:
+            return None
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                status = dict(line.split(':', 1) for line in f if ':' in line)
+            with open(f'/proc/{pid}/stat') as f:
+                stat = f.read().rpartition(')')[2].split()
+            fds = os.listdir(f'/proc/{pid}/fd')
+        except OSError:
+            return None
+        now = time.time()
+        cpu_time = (int(stat[11]) + int(stat[12])) / self._ticks
+        last = self._cpu.get(pid)
+        self._cpu[pid] = (now, cpu_time)
+        cpu_percent = (100 * (cpu_time - last[1]) / (now - last[0])
+                       if last and now > last[0] else 0.0)
+        sample = {
+            'time': now,
+            'test': self.test,
+            'pid': pid,
+            'rss_mb': int(status['VmRSS'].split()[0]) / 1024,
+            'cpu_percent': cpu_percent,
+            'threads': int(status['Threads']),
+            'fds': len(fds),
+            'mongo_connections': self._mongo_connections(pid, fds),
+        }
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+
+    def growth(self):
+        """{test: RSS growth in MB} over the samples of each test that share
+        the pid of its last sample (setup restarts change the pid) and come
+        after the warm-up of that kytosd. Tests with fewer than two such
+        samples are left out."""
+        first_seen = {}
+        by_test = defaultdict(list)
+        with self._lock:
+            for sample in self.samples:
+                first_seen.setdefault(sample['pid'], sample['time'])
+                if sample['test']:
+                    by_test[sample['test']].append(sample)
+        growth = {}
+        for test, samples in by_test.items():
+            pid = samples[-1]['pid']
+            samples = [s for s in samples if s['pid'] == pid
+                       and s['time'] - first_seen[pid] >= self.warmup]
+            if len(samples) > 1:
+                growth[test] = samples[-1]['rss_mb'] - samples[0]['rss_mb']
+        return growth
+
+    def leaks(self, threshold_mb):
+        return {test: mb for test, mb in self.growth().items() if mb > threshold_mb}
+
+    def write(self, prefix, threshold_mb):
+        """Write the time series to prefix.csv and per-test growth to
+        prefix.json, returning their paths."""
+        csv_path, json_path = f'{prefix}.csv', f'{prefix}.json'
+        with self._lock:
+            samples = list(self.samples)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(samples)
+        with open(json_path, 'w') as f:
+            json.dump({'threshold_mb': threshold_mb, 'growth_mb': self.growth(),
+                       'leaks': self.leaks(threshold_mb)}, f, indent=2)
+        return csv_path, json_path
+
+
+class LogWatcher(threading.Thread):
+    """Follow a log file like tail -F, from the moment it is created.
+
+    Only lines appended afterwards are read, in complete lines, and each is
+    numbered. Lines matching INDEX_PATTERN are indexed with the test that
+    was running, begin_test()/end_test() record which lines belong to a
+    test, and expect_log() waits for a line instead of re-reading the file.
+    Rotation and truncation are detected by inode and size.
+    """
+
+    INDEX_PATTERN = re.compile(r'error|traceback|exception', re.I)
+
+    def __init__(self, path, interval=0.2, max_lines=100000):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.seq = 0
+        self.test = None
+        self.recent = deque(maxlen=max_lines)
+        self.indexed = []
+        self.marks = {}
+        self._inode, self._offset = self._stat()
+        self._read_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._done = threading.Event()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def poll(self):
+        """Read the lines appended since the last poll."""
+        with self._read_lock:
+            inode, size = self._stat()
+            if inode is None:
+                return
+            if inode != self._inode or size < self._offset:
+                self._inode, self._offset = inode, 0
+            if size == self._offset:
+                return
+            lines = []
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break
+                    self._offset += len(raw)
+                    lines.append(raw.decode(errors='replace').rstrip('\n'))
+        if not lines:
+            return
+        with self._cond:
+            for line in lines:
+                self.seq += 1
+                self.recent.append((self.seq, line))
+                if self.INDEX_PATTERN.search(line):
+                    self.indexed.append((self.seq, self.test, line))
+            self._cond.notify_all()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._done.set()
+
+    def mark(self):
+        """Number of the last line read so far, to pass as since."""
+        self.poll()
+        return self.seq
+
+    def begin_test(self, test):
+        self.marks[test] = [self.mark(), None]
+        self.test = test
+
+    def end_test(self):
+        if self.test in self.marks:
+            self.marks[self.test][1] = self.mark()
+        self.test = None
+
+    def errors(self, since=0, until=None, pattern=None):
+        """Indexed lines after line since (up to until) matching pattern."""
+        self.poll()
+        regex = re.compile(pattern, re.I) if pattern else None
+        with self._cond:
+            return [line for seq, _, line in self.indexed
+                    if seq > since and (until is None or seq <= until)
+                    and (regex is None or regex.search(line))]
+
+    def lines(self, since=0, pattern=None):
+        """[(number, line)] read after line since matching pattern, from the
+        last max_lines lines."""
+        self.poll()
+        regex = re.compile(pattern) if pattern else None
+        with self._cond:
+            return [(seq, line) for seq, line in self.recent
+                    if seq > since and (regex is None or regex.search(line))]
+
+    def test_errors(self, test, pattern=None):
+        since, until = self.marks.get(test, (self.seq, None))
+        return self.errors(since, until, pattern)
+
+    def expect_log(self, regex, timeout=30, since=None):
+        """Wait for a line matching regex logged after line since (default:
+        the start of the running test) and return it."""
+        pattern = re.compile(regex)
+        if since is None:
+            since = self.marks.get(self.test, [self.seq])[0]
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self.is_alive():
+                self.poll()
+            with self._cond:
+                for seq, line in self.recent:
+                    if seq > since and pattern.search(line):
+                        return line
+                since = max(since, self.seq)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'{regex!r} not logged to {self.path} in {timeout}s')
+                self._cond.wait(min(remaining, self.interval))
+
+
+class MetricsExporter:
+    """Harness measurements in the OpenMetrics text format.
+
+    install() wraps HTTP requests (kytos_http_request_seconds by method and
+    endpoint, ids in the path replaced by {id}), KytosProcess start/stop
+    (kytosd_restart_seconds), the NetworkTest convergence waits
+    (e2e_convergence_wait_seconds) and unfiltered FlowTable dumps
+    (e2e_switch_flows). Collectors are called on every render to set
+    gauges, e.g. from the ResourceSampler. The text can be written to a
+    file for the node_exporter textfile collector or served over HTTP.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+    ID_SEGMENT = re.compile(r'^([0-9a-f]{2}(:[0-9a-f]{2})+|[0-9a-f]{8,}|[0-9]+)$', re.I)
+
+    HELP = {
+        'kytos_http_request_seconds': 'Latency of requests to the Kytos API.',
+        'kytosd_restart_seconds': 'Time to stop or start kytosd.',
+        'e2e_convergence_wait_seconds': 'Time waiting for the controller to converge.',
+        'e2e_switch_flows': 'Flows of a switch at its last full dump.',
+        'kytosd_resident_memory_bytes': 'kytosd resident set size.',
+        'kytosd_cpu_percent': 'kytosd CPU usage since the previous sample.',
+        'kytosd_threads': 'kytosd threads.',
+        'kytosd_open_fds': 'kytosd open file descriptors.',
+        'kytosd_mongo_connections': 'Established kytosd connections to MongoDB.',
+    }
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.gauges = {}
+        self.collectors = []
+        self.server = None
+        self._lock = threading.Lock()
+        self._patched = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        """Add value to histogram name."""
+        with self._lock:
+            histogram = self.histograms.setdefault(
+                self._key(name, labels), [[0] * len(self.buckets), 0, 0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += 1
+            histogram[2] += value
+
+    def set(self, name, value, **labels):
+        """Set gauge name."""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def endpoint(self, url):
+        """API path of url relative to API_URL, with ids as {id}; None for
+        other URLs."""
+        if not url.startswith(API_URL):
+            return None
+        path = url[len(API_URL):].split('?')[0].strip('/')
+        return '/'.join('{id}' if self.ID_SEGMENT.match(segment) else segment
+                        for segment in path.split('/'))
+
+    def _timed(self, func, name, **labels):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+
+    def _patch(self, owner, attr, wrapper):
+        original = owner.__dict__[attr]
+        self._patched.append((owner, attr, original))
+        setattr(owner, attr, wrapper)
+
+    def install(self):
+        request = requests.Session.request
+
+        @functools.wraps(request)
+        def timed_request(session, method, url, *args, **kwargs):
+            endpoint = self.endpoint(url)
+            if endpoint is None:
+                return request(session, method, url, *args, **kwargs)
+            return self._timed(request, 'kytos_http_request_seconds', method=method.upper(),
+                               endpoint=endpoint)(session, method, url, *args, **kwargs)
+
+        dump = FlowTable.__dict__['dump'].__func__
+
+        @functools.wraps(dump)
+        def counted_dump(cls, switch, *args):
+            table = dump(cls, switch, *args)
+            if not args:
+                self.set('e2e_switch_flows', len(table), switch=switch.name)
+            return table
+
+        self._patch(requests.Session, 'request', timed_request)
+        self._patch(FlowTable, 'dump', classmethod(counted_dump))
+        for action in ('start', 'stop'):
+            self._patch(KytosProcess, action, self._timed(
+                getattr(KytosProcess, action), 'kytosd_restart_seconds', action=action))
+        for wait in ('wait_switches_connect', 'wait_switches_active',
+                     'wait_topology_converged'):
+            self._patch(NetworkTest, wait, self._timed(
+                getattr(NetworkTest, wait), 'e2e_convergence_wait_seconds', wait=wait[5:]))
+
+    def uninstall(self):
+        while self._patched:
+            owner, attr, original = self._patched.pop()
+            setattr(owner, attr, original)
+
+    @staticmethod
+    def _labels(labels, **extra):
+        labels = (*labels, *extra.items())
+        if not labels:
+            return ''
+        escaped = ('{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                                    .replace('"', r'\"').replace('\n', r'\n'))
+                   for name, value in labels)
+        return '{' + ','.join(escaped) + '}'
+
+    def _family(self, lines, name, kind):
+        lines.append(f'# TYPE {name} {kind}')
+        if name in self.HELP:
+            lines.append(f'# HELP {name} {self.HELP[name]}')
+
+    def render(self):
+        for collect in self.collectors:
+            collect(self)
+        lines = []
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            gauges = sorted(self.gauges.items())
+        family = None
+        for (name, labels), (buckets, count, total) in histograms:
+            if name != family:
+                family = name
+                self._family(lines, name, 'histogram')
+            for bound, bucket in zip(self.buckets, buckets):
+                lines.append(f'{name}_bucket{self._labels(labels, le=float(bound))} {bucket}')
+            lines.append(f"{name}_bucket{self._labels(labels, le='+Inf')} {count}")
+            lines.append(f'{name}_count{self._labels(labels)} {count}')
+            lines.append(f'{name}_sum{self._labels(labels)} {total}')
+        for (name, labels), value in gauges:
+            if name != family:
+                family = name
+                self._family(lines, name, 'gauge')
+            lines.append(f'{name}{self._labels(labels)} {value}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the metrics to path, atomically for textfile collectors."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+            f.write(self.render())
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+        return path
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve the metrics on http://host:port/metrics from a thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/openmetrics-text; '
+                                                 'version=1.0.0; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
+
+    def shutdown(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# Session-wide watcher of the system log, started by conftest
+syslog = LogWatcher(os.environ.get('E2E_SYSLOG', '/var/log/syslog'))
+
+def syslog_time(line):
+    """Epoch of a syslog line, from an RFC 3339 or a traditional
+    'Mon DD HH:MM:SS' (current year) timestamp; None if it has neither."""
+    stamp = line.split(' ', 1)[0]
+    try:
+        return datetime.fromisoformat(stamp.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(f'{time.localtime().tm_year} {line[:15]}',
+                                 '%Y %b %d %H:%M:%S').timestamp()
+    except ValueError:
+        return None
+
+
+def parse_importtime(output):
+    """[(module, depth, self seconds, cumulative seconds)] from the output
+    of python -X importtime."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), depth, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return imports
+
+
+def import_profile(module, preload=(), python=None, top=10):
+    """Import time of module in a fresh interpreter, after preload.
+
+    Returns {'seconds': cumulative time of the new top-level imports,
+    'top': [(module, cumulative seconds)] of the slowest new imports}.
+    The NApps are importable as napps.<username>.<name>.main.
+    """
+    if python is None:
+        python = os.path.join(BASE_ENV, 'bin', 'python3')
+        python = python if os.path.exists(python) else sys.executable
+    marker = '-- e2e import profile --'
+    code = ''.join(f'import {name}\n' for name in preload)
+    code += f'import sys\nsys.stderr.write({marker!r} + "\\n")\nimport {module}\n'
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [os.path.join(BASE_ENV, 'var/lib/kytos'), env.get('PYTHONPATH')]))
+    result = subprocess.run([python, '-X', 'importtime', '-c', code], env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode:
+        raise RuntimeError(f'import {module} failed: {result.stderr[-2000:]}')
+    imports = parse_importtime(result.stderr.split(marker, 1)[-1])
+    return {
+        'seconds': sum(cumulative for _, depth, _, cumulative in imports if depth == 0),
+        'top': sorted(((name, cumulative) for name, _, _, cumulative in imports),
+                      key=lambda item: -item[1])[:top],
+    }
+
+
+# Session-wide OpenMetrics registry, installed by conftest when exporting
+metrics = MetricsExporter()
@@ -1,11 +1,10 @@
 import json
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import NetworkTest, KYTOS_API_PORT
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2ETopology:
@@ -18,15 +17,13 @@ class TestE2ETopology:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_switches_active()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -37,10 +34,9 @@ class TestE2ETopology:
         # Start the controller setting an environment in which the setting is
         # preserved (persistence) and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        # Wait for the switches to be active again with their persisted
+        # state; links may be disabled, so not for the whole topology
+        self.net.wait_switches_active()
 
     def test_005_list_topology(self):
         """
@@ -546,10 +542,9 @@ class TestE2ETopology:
 
         # restart kytos and check if the links are still enabled
         self.net.start_controller(clean_config=False)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        # Wait for the switches to be active again with their persisted
+        # state; links may be disabled, so not for the whole topology
+        self.net.wait_switches_active()
 
         # check if the links are still enabled and now with the links
         api_url = KYTOS_API + '/topology/v3/links'
@@ -564,10 +559,9 @@ class TestE2ETopology:
 
         # restart kytos and check if the links are still enabled
         self.net.start_controller(clean_config=False)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        # Wait for the switches to be active again with their persisted
+        # state; links may be disabled, so not for the whole topology
+        self.net.wait_switches_active()
 
         # check if the links are still enabled and now with the links
         api_url = KYTOS_API + '/topology/v3/links'
@@ -679,8 +673,7 @@ class TestE2ETopology:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Make sure the switch is disabled
         api_url = KYTOS_API + '/topology/v3/switches'
@@ -696,8 +689,7 @@ class TestE2ETopology:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Make sure the interfaces are disabled
         api_url = KYTOS_API + '/topology/v3/interfaces'
@@ -1,10 +1,12 @@
+import pytest
 import requests
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import NetworkTest, KYTOS_API_PORT, wait_until
 import json
 
+pytestmark = pytest.mark.topology('amlight')
+
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 class TestE2ETopology:
     net = None
@@ -16,15 +18,13 @@ class TestE2ETopology:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(20)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="amlight")
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name="amlight")
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -47,7 +47,8 @@ class TestE2ETopology:
 
         JAX2 = self.net.net.get('JAX2')
         JAX2.detach('JAX2-eth61')
-        time.sleep(5)
+        api_url = f'{KYTOS_API}/topology/v3/interfaces'
+        wait_until(lambda: intf_id not in requests.get(api_url).json()["interfaces"])
 
         api_url = f'{KYTOS_API}/topology/v3/interfaces'
         response = requests.get(api_url)
@@ -147,11 +148,10 @@ class TestE2ETopology:
             response = requests.delete(api_url)
             assert response.status_code == 200, response.text
 
-        # Delete switch, success
-        time.sleep(10)
+        # Delete switch, success once its links are gone
         api_url = f'{KYTOS_API}/topology/v3/switches/{switch}'
-        response = requests.delete(api_url)
-        assert response.status_code == 200, response.text
+        wait_until(lambda: requests.delete(api_url).status_code == 200,
+                   msg=f'delete switch {switch}')
 
     def test_025_delete_interface(self):
         """Test api/kytos/topology/v3/interfaces/{interface_id} on DELETE
@@ -7,10 +7,11 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import (NetworkTest, FlowTable, KYTOS_API_PORT, evc_active, evc_cookie,
+                           evc_state, flows_with_cookie, wait_until)
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -36,16 +37,14 @@ class TestE2EMefEline:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -55,10 +54,7 @@ class TestE2EMefEline:
         # Start the controller setting an environment in which the setting is
         # preserved (persistence) and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     def create_evc(self, vlan_id, store=False):
         payload = {
@@ -82,6 +78,28 @@ class TestE2EMefEline:
             self.evcs[vlan_id] = data['circuit_id']
         return data['circuit_id']
 
+    @staticmethod
+    def evc_path(evc_id, key='current_path'):
+        """The endpoints of an EVC path, in the format of the payloads."""
+        response = requests.get(KYTOS_API + '/mef_eline/v2/evc/' + evc_id)
+        return [{"endpoint_a": {"id": link['endpoint_a']['id']},
+                 "endpoint_b": {"id": link['endpoint_b']['id']}}
+                for link in response.json()[key]]
+
+    def wait_vlan_flows(self, *matches, timeout=30):
+        """Wait until flow_manager lists, for each (dpid, dl_vlan), a flow
+        matching dl_vlan on dpid."""
+        def predicate():
+            for dpid, dl_vlan in matches:
+                response = requests.get(KYTOS_API + '/flow_manager/v2/flows/' + dpid)
+                flows = response.json()[dpid]["flows"]
+                if not self.get_flow_by_vlan_match(flows, dl_vlan):
+                    return False
+            return True
+
+        predicate.__name__ = f'vlan flows {matches}'
+        wait_until(predicate, timeout)
+
     def test_010_list_evcs_should_be_empty(self):
         """Test if list circuits return 'no circuit stored.'."""
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -115,9 +133,9 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
 
         s1 = self.net.net.get('s1')
+        wait_until(flows_with_cookie(s1, evc_cookie(data['circuit_id']), 2))
         flow_s1 = s1.dpctl('dump-flows')
         #Make sure that the flows have EVPL default values
         assert 'priority=20000' in flow_s1
@@ -137,7 +155,7 @@ class TestE2EMefEline:
         flows_s1 = s1.dpctl('dump-flows')
 
         # Each switch must have BASIC_FLOWS + 02 for the EVC (ingress + egress)
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
 
         # TODO: make sure it should be dl_vlan instead of vlan_vid
         assert 'dl_vlan=101' in flows_s1
@@ -172,12 +190,14 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
 
         # search for the cookie, should have three flows:
         #  - 2 for the current path
         #  - 1 for the failover path
         s1, s2 = self.net.net.get('s1', 's2')
+        cookie = evc_cookie(data['circuit_id'])
+        wait_until(flows_with_cookie(s1, cookie, 3))
+        wait_until(flows_with_cookie(s2, cookie, 3))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
 
@@ -185,8 +205,8 @@ class TestE2EMefEline:
         assert 'priority=20000' in flows_s1
         assert 'priority=20000' in flows_s2
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 3, flows_s2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 3, flows_s2
 
         # make sure it should be dl_vlan instead of vlan_vid
         assert 'dl_vlan=15' in flows_s1
@@ -229,16 +249,18 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(15)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
         #  - 1 for failover path
         s1, s2 = self.net.net.get('s1', 's2')
+        cookie = evc_cookie(data['circuit_id'])
+        wait_until(flows_with_cookie(s1, cookie, 3))
+        wait_until(flows_with_cookie(s2, cookie, 3))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 3, flows_s2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 3, flows_s2
 
         #Make sure that both flow have EVPL default values
         assert 'priority=20000' in flows_s1
@@ -284,16 +306,18 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
         #  - 1 for failover path
         s1, s2 = self.net.net.get('s1', 's2')
+        cookie = evc_cookie(data['circuit_id'])
+        wait_until(flows_with_cookie(s1, cookie, 3))
+        wait_until(flows_with_cookie(s2, cookie, 3))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 3, flows_s2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 3, flows_s2
 
         #Make sure that both flow have EVPL and EPL default values
         assert 'priority=20000' in flows_s1
@@ -342,7 +366,7 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # Create circuit 2: same vlan id but in different UNIs
         payload = {
@@ -365,18 +389,20 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc2 = data['circuit_id']
         assert evc1 != evc2
-        time.sleep(10)
+        wait_until(evc_active(evc2), 60)
 
         # Switch s1 should have BASIC_FLOWS + 3 for evc1 + 3 for evc2
         # Switch s2 should have BASIC_FLOWS + 3 for evc1 + 2 for evc2/failover
         # Switch s2 should have BASIC_FLOWS + 3 for evc2 + 2 for evc1/failover
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS + 6, 's2': BASIC_FLOWS + 5,
+                                   's3': BASIC_FLOWS + 5})
         s1, s2, s3 = self.net.net.get('s1', 's2', 's3')
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 6, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 5, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 5, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 6, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 5, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == BASIC_FLOWS + 5, flows_s3
 
         #Make sure that both flow have EVPL default values
         assert 'priority=20000' in flows_s1
@@ -442,7 +468,7 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's status
         response = requests.get(api_url + evc1)
@@ -453,7 +479,7 @@ class TestE2EMefEline:
         payload = {"enabled": False}
         response = requests.patch(api_url + evc1, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        wait_until(evc_state(evc1, enabled=False, active=False))
 
         # It verifies EVC's status
         response = requests.get(api_url + evc1)
@@ -461,11 +487,12 @@ class TestE2EMefEline:
         assert data['enabled'] is False
 
         # Each switch must have BASIC_FLOWS
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS, 's2': BASIC_FLOWS})
         s1, s2 = self.net.net.get('s1', 's2')
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
 
         # Nodes should not be able to ping each other
         h11, h2 = self.net.net.get('h11', 'h2')
@@ -502,13 +529,13 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # Delete the circuit
         api_url += evc1
         response = requests.delete(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS, 's2': BASIC_FLOWS})
 
         # try to reuse the vlan id
         payload = {
@@ -531,16 +558,18 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc2 = data['circuit_id']
         assert evc1 != evc2
-        time.sleep(10)
+        wait_until(evc_active(evc2), 60)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
         #  - 1 for failover path
         s1, s2 = self.net.net.get('s1', 's2')
+        for switch in (s1, s2):
+            wait_until(flows_with_cookie(switch, evc_cookie(evc2), 3))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 3, flows_s2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 3, flows_s2
 
         # Nodes should be able to ping each other
         h11, h2 = self.net.net.get('h11', 'h2')
@@ -591,26 +620,30 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
-
-        time.sleep(10)
+        evc1 = response.json()['circuit_id']
+        wait_until(evc_active(evc1), 60)
 
         # Each switch must have BASIC_FLOWS + 02 for the EVC:
         #  - 2 for current path (ingress + egress)
         #  - (there will be no failover path)
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS + 2, 's2': BASIC_FLOWS + 2,
+                                   's3': BASIC_FLOWS + 2})
         s1, s2, s3 = self.net.net.get('s1', 's2', 's3')
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == BASIC_FLOWS + 2, flows_s3
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # Wait for the controller to process the linkDown event and move to the backup path
+        wait_until(lambda: self.evc_path(evc1) == payload['backup_path'])
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS + 2, 's2': BASIC_FLOWS,
+                                   's3': BASIC_FLOWS + 2})
 
         # # Check on the virtual switches directly for flows
         flows_s1 = s1.dpctl('dump-flows')
@@ -635,9 +668,9 @@ class TestE2EMefEline:
         self.net.net.configLinkStatus('s1', 's2', 'up')
 
         assert ', 0% packet loss,' in result
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS
+        assert len(FlowTable.parse(flows_s3)) == BASIC_FLOWS + 2
 
     def test_055_delete_evc_after_restart_kytos_and_no_switch_reconnected(self):
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -645,12 +678,12 @@ class TestE2EMefEline:
 
         # restart the controller and change the port on purpose to avoid switches to connect
         self.net.start_controller(clean_config=False, enable_all=True, port=9999)
-        time.sleep(10)
+        wait_until(evc_state(evc1))
 
         # Delete the circuit
         response = requests.delete(api_url + evc1)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        wait_until(lambda: evc1 in requests.get(api_url, params={'archived': True}).json())
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -707,9 +740,10 @@ class TestE2EMefEline:
                 assert 'circuit_id' in data
                 evcs[i] = data['circuit_id']
 
-            time.sleep(10)
-
             # make sure the evcs are active and the flows were created
+            for evc_id in evcs.values():
+                wait_until(evc_active(evc_id), 60)
+            self.net.wait_flow_counts({'s1': BASIC_FLOWS + 30, 's2': BASIC_FLOWS + 30})
             s1, s2 = self.net.net.get('s1', 's2')
             flows_s1 = s1.dpctl('dump-flows')
             flows_s2 = s2.dpctl('dump-flows')
@@ -739,7 +773,7 @@ class TestE2EMefEline:
                 response = requests.delete(api_url)
                 assert response.status_code == 200, response.text
 
-            time.sleep(10)
+            self.net.wait_flow_counts({'s1': BASIC_FLOWS, 's2': BASIC_FLOWS})
 
             # make sure the circuits were deleted
             api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -748,9 +782,9 @@ class TestE2EMefEline:
             assert response.json() == {}
             flows_s1 = s1.dpctl('dump-flows')
             flows_s2 = s2.dpctl('dump-flows')
-            assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, \
+            assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS, \
                 f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s1}"
-            assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, \
+            assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, \
                 f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s2}"
 
     def test_085_create_and_remove_ten_circuit_concurrently(self):
@@ -768,8 +802,10 @@ class TestE2EMefEline:
         for thread in threads:
             thread.join()
 
-        # give some time so Kytos can create the flows and everything
-        time.sleep(10)
+        # wait for Kytos to create the flows and everything
+        for evc_id in self.evcs.values():
+            wait_until(evc_active(evc_id), 60)
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS + 30, 's2': BASIC_FLOWS + 30})
 
         # make sure the evcs are active and the flows were created
         s1, s2 = self.net.net.get('s1', 's2')
@@ -802,7 +838,7 @@ class TestE2EMefEline:
             response = requests.delete(api_url)
             assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS, 's2': BASIC_FLOWS})
 
         # make sure the circuits were deleted
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -811,9 +847,9 @@ class TestE2EMefEline:
         assert response.json() == {}
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, \
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS, \
             f"should have only {BASIC_FLOWS} flow but had: \n{flows_s1}"
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, \
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, \
             f"should have only {BASIC_FLOWS} flow but had: \n{flows_s2}"
 
     def test_090_patch_evc_new_name(self):
@@ -834,7 +870,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, name='My EVC_100'))
 
         # It verifies EVC's new name
         response = requests.get(api_url + evc1)
@@ -856,7 +892,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -878,7 +914,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -903,7 +939,7 @@ class TestE2EMefEline:
         # It sets a new circuit's end_date
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
-        time.sleep(10)
+        wait_until(evc_state(evc1, end_date=end_date.strftime(TIME_FMT)))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -932,7 +968,7 @@ class TestE2EMefEline:
         # It sets a new circuit's bandwidth
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
-        time.sleep(10)
+        wait_until(evc_state(evc1, bandwidth=bandwidth))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -956,7 +992,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, sb_priority=sb_priority))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -964,6 +1000,7 @@ class TestE2EMefEline:
         assert data['sb_priority'] == sb_priority, data
 
         s1, s2 = self.net.net.get('s1', 's2')
+        wait_until(lambda: all('priority=100' in s.dpctl('dump-flows') for s in (s1, s2)))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         assert 'priority=100' in flows_s1
@@ -983,7 +1020,7 @@ class TestE2EMefEline:
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, queue_id=queue_id))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -991,6 +1028,7 @@ class TestE2EMefEline:
         assert data['queue_id'] == queue_id
 
         s1, s2 = self.net.net.get('s1', 's2')
+        wait_until(lambda: all('set_queue:3' in s.dpctl('dump-flows') for s in (s1, s2)))
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
 
@@ -1019,7 +1057,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, dynamic_backup_path=dynamic_backup_path))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1066,7 +1104,7 @@ class TestE2EMefEline:
                                  headers={'Content-type': 'application/json'})
         data = response.json()
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
         payload2 = {
             "primary_path": [
                 {"endpoint_a": {"id": "00:00:00:00:00:00:00:01:4"},
@@ -1080,7 +1118,8 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(lambda: self.evc_path(evc1) == payload2["primary_path"])
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1139,7 +1178,7 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         payload2 = {
             "backup_path": [
@@ -1152,7 +1191,8 @@ class TestE2EMefEline:
         requests.patch(api_url + evc1, data=json.dumps(payload2),
                        headers={'Content-type': 'application/json'})
 
-        time.sleep(10)
+        wait_until(lambda: self.evc_path(evc1, 'backup_path') == payload2["backup_path"])
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1192,19 +1232,19 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
-
         current_path = [{"endpoint_a": {"id": "00:00:00:00:00:00:00:01:4"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:3"}},
                         {"endpoint_a": {"id": "00:00:00:00:00:00:00:02:3"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:2"}}]
 
+        # Wait for the controller to receive and process the linkDown event
+        wait_until(lambda: self.evc_path(evc1) == current_path)
+
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -1239,7 +1279,7 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1258,14 +1298,14 @@ class TestE2EMefEline:
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
-
         current_path = [{"endpoint_a": {"id": "00:00:00:00:00:00:00:01:4"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:3"}},
                         {"endpoint_a": {"id": "00:00:00:00:00:00:00:02:3"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:2"}}]
 
+        # Wait for the controller to receive and process the linkDown event
+        wait_until(lambda: self.evc_path(evc1) == current_path)
+
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -1304,13 +1344,13 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # Wait for the controller to receive and process the linkDown event
+        wait_until(evc_state(evc1, active=False, current_path=[]))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1409,7 +1449,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', 0))
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.get(api_url)
@@ -1459,7 +1500,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"))
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.get(api_url)
@@ -1514,7 +1556,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"), ('00:00:00:00:00:00:00:02', 100))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1584,7 +1627,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', 100), ('00:00:00:00:00:00:00:02', 0))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": 100},
@@ -1655,7 +1699,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"), ('00:00:00:00:00:00:00:02', 0))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1710,7 +1755,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1760,7 +1806,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', 0))
 
         expected = {
             "match": {"in_port": 1, "dl_vlan": 0},
@@ -1805,7 +1852,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"), ('00:00:00:00:00:00:00:01', 100))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1864,7 +1912,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', 100), ('00:00:00:00:00:00:00:01', 0))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": 100},
@@ -1927,7 +1976,8 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']), 60)
+        self.wait_vlan_flows(('00:00:00:00:00:00:00:01', "4096/4096"), ('00:00:00:00:00:00:00:01', 0))
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1992,7 +2042,8 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc_2_id = data["circuit_id"]
 
-        time.sleep(10)
+        wait_until(evc_active(evc_1_id), 60)
+        wait_until(evc_active(evc_2_id), 60)
         
         payload = {
             "circuit_ids":[evc_1_id, evc_2_id],
@@ -2013,7 +2064,7 @@ class TestE2EMefEline:
         """Test UNI status for a dynamic inter EVC."""
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         evc1 = self.create_evc(100)
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -2025,7 +2076,7 @@ class TestE2EMefEline:
         self.net.net.configLinkStatus("s3", "s1", "down")
         self.net.net.configLinkStatus("s1", "h11", "down")
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False, current_path=[]))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2033,6 +2084,7 @@ class TestE2EMefEline:
 
         # bring up only UNI, EVC should still remain not active
         self.net.net.configLinkStatus("s1", "h11", "up")
+        # nothing to wait for when the EVC must not change: give the event time
         time.sleep(10)
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -2043,7 +2095,7 @@ class TestE2EMefEline:
         # bring up the rest of NNIs, now it should be activated
         self.net.net.configLinkStatus("s1", "s2", "up")
         self.net.net.configLinkStatus("s3", "s1", "up")
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=True))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data["active"]
@@ -2051,7 +2103,7 @@ class TestE2EMefEline:
 
         # shutdown UNI a, now it should deactivate again
         self.net.net.configLinkStatus("s1", "h11", "down")
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2059,7 +2111,7 @@ class TestE2EMefEline:
 
         # bring up UNI a, now it should activate
         self.net.net.configLinkStatus("s1", "h11", "up")
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=True))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data["active"]
@@ -2070,7 +2122,7 @@ class TestE2EMefEline:
         self.net.net.configLinkStatus("s3", "s1", "down")
         self.net.net.configLinkStatus("s1", "h11", "down")
 
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False, current_path=[]))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2078,6 +2130,7 @@ class TestE2EMefEline:
 
         # bring up a NNI, it shouldn't activate yet since UNI is still down
         self.net.net.configLinkStatus("s1", "s2", "up")
+        # nothing to wait for when the EVC must not change: give the event time
         time.sleep(10)
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -2086,7 +2139,7 @@ class TestE2EMefEline:
 
         # bring up UNI a, now it should activate, and result in new deployment
         self.net.net.configLinkStatus("s1", "h11", "up")
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=True))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data["active"]
@@ -2122,7 +2175,7 @@ class TestE2EMefEline:
         data = r.json()
         evc1 = data["circuit_id"]
 
-        time.sleep(10)
+        wait_until(evc_active(evc1), 60)
 
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -2131,7 +2184,7 @@ class TestE2EMefEline:
 
         # shutdown UNI a, it should deactivate
         self.net.net.configLinkStatus('s1', 'h11', 'down')
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2139,7 +2192,7 @@ class TestE2EMefEline:
 
         # shutdown NNI too, current_path should be gone too
         self.net.net.configLinkStatus('s3', 's1', 'down')
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False, current_path=[]))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2147,6 +2200,7 @@ class TestE2EMefEline:
 
         # bring up UNI a, it shouldn't activate yet, since NNI is down
         self.net.net.configLinkStatus('s1', 'h11', 'up')
+        # nothing to wait for when the EVC must not change: give the event time
         time.sleep(10)
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -2155,7 +2209,7 @@ class TestE2EMefEline:
 
         # bring up NNI, it should activate
         self.net.net.configLinkStatus('s3', 's1', 'up')
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=True))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data["active"]
@@ -2164,7 +2218,7 @@ class TestE2EMefEline:
         # shutdown again both
         self.net.net.configLinkStatus('s1', 'h11', 'down')
         self.net.net.configLinkStatus('s3', 's1', 'down')
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=False, current_path=[]))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2172,7 +2226,7 @@ class TestE2EMefEline:
 
         # bring up NNI, it shouldn't activate since UNI is still down
         self.net.net.configLinkStatus('s3', 's1', 'up')
-        time.sleep(10)
+        wait_until(lambda: self.evc_path(evc1))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert not data["active"]
@@ -2180,7 +2234,7 @@ class TestE2EMefEline:
 
         # bring up UNI a, it should activate
         self.net.net.configLinkStatus('s1', 'h11', 'up')
-        time.sleep(10)
+        wait_until(evc_state(evc1, active=True))
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data["active"]
@@ -1,13 +1,14 @@
 import json
-import time
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT, evc_active, links_count, wait_until
+
+pytestmark = pytest.mark.topology('ring4')
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % (CONTROLLER)
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring4':
@@ -28,21 +29,26 @@ class TestE2EMefEline:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.restart_kytos_clean()
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='ring4')
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name='ring4')
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
         cls.net.stop()
 
+    def wait_migrated(self, evc_id, counts):
+        """Wait until topology has the link down, the EVC is active again
+        and the switches have the flows of its new path."""
+        wait_until(links_count(len(self.net.switch_links())))
+        wait_until(evc_active(evc_id))
+        self.net.wait_flow_counts(counts)
+
     def test_005_on_primary_path_fail_should_migrate_to_backup(self):
 
         # TODO Check for false positives between uni_a switch 1 and uni_z switch 3 instead of switch 2
@@ -82,25 +88,22 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
-
-        time.sleep(10)
+        evc_id = response.json()['circuit_id']
+        wait_until(evc_active(evc_id))
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # Wait for the controller to process the linkDown event
+        self.wait_migrated(evc_id, {'s1': BASIC_FLOWS + 2, 's2': BASIC_FLOWS + 2,
+                                       's3': BASIC_FLOWS + 2, 's4': BASIC_FLOWS + 2})
 
         # Check on the virtual switches directly for flows
-        s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
-        flows_s3 = s3.dpctl('dump-flows')
-        flows_s4 = s4.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
-        assert len(flows_s4.split('\r\n ')) == BASIC_FLOWS + 2, flows_s4
+        flows = self.net.snapshot_flows(['s1', 's2', 's3', 's4'])
+        assert len(flows['s1']) == BASIC_FLOWS + 2, flows['s1'].output
+        assert len(flows['s2']) == BASIC_FLOWS + 2, flows['s2'].output
+        assert len(flows['s3']) == BASIC_FLOWS + 2, flows['s3'].output
+        assert len(flows['s4']) == BASIC_FLOWS + 2, flows['s4'].output
 
         # Nodes should be able to ping each other
         h1, h3 = self.net.net.get('h1', 'h3')
@@ -147,23 +150,20 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         r = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert r.status_code == 201, r.text
-
-        time.sleep(10)
+        evc_id = r.json()['circuit_id']
+        wait_until(evc_active(evc_id))
 
         # Command to disable links to test if back-up path is taken with the following command:
         self.net.net.configLinkStatus('s1', 's2', 'down')
-        time.sleep(10)
+        self.wait_migrated(evc_id, {'s1': BASIC_FLOWS + 2, 's2': BASIC_FLOWS + 2,
+                                       's3': BASIC_FLOWS + 2, 's4': BASIC_FLOWS + 2})
 
         # Check on the virtual switches directly for flows
-        s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
-        flows_s3 = s3.dpctl('dump-flows')
-        flows_s4 = s4.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
-        assert len(flows_s4.split('\r\n ')) == BASIC_FLOWS + 2, flows_s4
+        flows = self.net.snapshot_flows(['s1', 's2', 's3', 's4'])
+        assert len(flows['s1']) == BASIC_FLOWS + 2, flows['s1'].output
+        assert len(flows['s2']) == BASIC_FLOWS + 2, flows['s2'].output
+        assert len(flows['s3']) == BASIC_FLOWS + 2, flows['s3'].output
+        assert len(flows['s4']) == BASIC_FLOWS + 2, flows['s4'].output
 
         # Nodes should be able to ping each other
         h1, h3 = self.net.net.get('h1', 'h3')
@@ -208,24 +208,21 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         r = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert r.status_code == 201, r.text
-
-        time.sleep(10)
+        evc_id = r.json()['circuit_id']
+        wait_until(evc_active(evc_id))
 
         # Command to disable links to test if back-up path is taken with the following command:
         self.net.net.configLinkStatus('s1', 's2', 'down')
-        time.sleep(10)
+        self.wait_migrated(evc_id, {'s1': BASIC_FLOWS + 2, 's2': BASIC_FLOWS + 2,
+                                       's3': BASIC_FLOWS + 2, 's4': BASIC_FLOWS + 2})
 
         # Check on the virtual switches directly for flows
-        s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
-        flows_s3 = s3.dpctl('dump-flows')
-        flows_s4 = s4.dpctl('dump-flows')
+        flows = self.net.snapshot_flows(['s1', 's2', 's3', 's4'])
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
-        assert len(flows_s4.split('\r\n ')) == BASIC_FLOWS + 2, flows_s4
+        assert len(flows['s1']) == BASIC_FLOWS + 2, flows['s1'].output
+        assert len(flows['s2']) == BASIC_FLOWS + 2, flows['s2'].output
+        assert len(flows['s3']) == BASIC_FLOWS + 2, flows['s3'].output
+        assert len(flows['s4']) == BASIC_FLOWS + 2, flows['s4'].output
 
         # Nodes should be able to ping each other
         h1, h3 = self.net.net.get('h1', 'h3')
@@ -259,19 +256,16 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
-
-        time.sleep(10)
+        evc_id = response.json()['circuit_id']
+        wait_until(evc_active(evc_id))
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS + 2})
 
         # Check on the virtual switches directly for flows.
-        s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
-        flows_s3 = s3.dpctl('dump-flows')
-        flows_s4 = s4.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS, flows_s3
-        assert len(flows_s4.split('\r\n ')) == BASIC_FLOWS, flows_s4
+        flows = self.net.snapshot_flows(['s1', 's2', 's3', 's4'])
+        assert len(flows['s1']) == BASIC_FLOWS + 2, flows['s1'].output
+        assert len(flows['s2']) == BASIC_FLOWS, flows['s2'].output
+        assert len(flows['s3']) == BASIC_FLOWS, flows['s3'].output
+        assert len(flows['s4']) == BASIC_FLOWS, flows['s4'].output
 
         # Nodes should be able to ping each other
         h1, h2 = self.net.net.get('h1', 'h2')
@@ -1,13 +1,12 @@
-import time
 from datetime import datetime, timedelta
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, FlowTable, KYTOS_API_PORT, evc_state, wait_until
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -22,10 +21,9 @@ class TestE2EMefEline:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -34,8 +32,7 @@ class TestE2EMefEline:
     @pytest.fixture()
     def kytos_clean(self):
         self.net.restart_kytos_clean()
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @pytest.fixture()
     def circuit_id(self, kytos_clean):
@@ -45,7 +42,7 @@ class TestE2EMefEline:
     @pytest.fixture()
     def disabled_circuit_id(self, circuit_id):
         self._disable_circuit(circuit_id)
-        time.sleep(2)
+        wait_until(evc_state(circuit_id, enabled=False))
         return circuit_id
 
     def _circuit_exists(self, circuit_id):
@@ -71,8 +68,7 @@ class TestE2EMefEline:
         data = response.json()
 
         # wait circuit to be created
-        while not self._circuit_exists(data.get('circuit_id')):
-            time.sleep(1)
+        wait_until(lambda: self._circuit_exists(data.get('circuit_id')))
 
         return data.get('circuit_id')
 
@@ -111,9 +107,8 @@ class TestE2EMefEline:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # waiting some time to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        # wait for the scheduler to enable the circuit within its next minute
+        wait_until(evc_state(disabled_circuit_id, enabled=True), timeout=90, interval=1)
 
         # Verify if the circuit is enabled 
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -154,9 +149,8 @@ class TestE2EMefEline:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # waiting some time to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        # wait for the scheduler to enable the circuit within its next minute
+        wait_until(evc_state(disabled_circuit_id, enabled=True), timeout=90, interval=1)
 
         # Verify if the circuit is enabled 
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -251,9 +245,8 @@ class TestE2EMefEline:
         response = requests.patch(api_url, json=payload)
         assert response.status_code == 200, response.text
 
-        # waiting to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        # wait for the scheduler to enable the circuit within its next minute
+        wait_until(evc_state(disabled_circuit_id, enabled=True), timeout=90, interval=1)
 
         # Verify if the circuit is enabled
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -282,7 +275,7 @@ class TestE2EMefEline:
         s1 = self.net.net.get('s1')
         flows_s1 = s1.dpctl('dump-flows')
         # Each switch had BASIC_FLOWS flows + 02 for the EVC (ingress + egress)
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
 
     """Error, start_date should be patched only if the Evc
     has been created under the scheduler action
@@ -307,8 +300,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + circuit_id, json=payload)
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         # It gets EVC's data
         response = requests.get(api_url + circuit_id)
         data = response.json()
@@ -350,8 +341,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + schedule_id, json=payload2)
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
-
         # It verifies EVC's data
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         response = requests.get(api_url + disabled_circuit_id)
@@ -366,11 +355,11 @@ class TestE2EMefEline:
         response = requests.delete(api_url)
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
-
         # Verify circuit removal by
         # listing all the circuits stored
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
+        wait_until(lambda: requests.get(api_url).json() == {})
+        self.net.wait_flow_counts({'s1': BASIC_FLOWS})
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -381,4 +370,4 @@ class TestE2EMefEline:
         flows_s1 = s1.dpctl('dump-flows')
         # Each switch had BASIC_FLOWS flows + 02 for the EVC (ingress + egress)
         # at this point the flow number should be reduced to BASIC_FLOWS
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS, flows_s1
@@ -1,14 +1,13 @@
 import json
-import time
 from datetime import datetime
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT, evc_active, wait_until
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -27,16 +26,14 @@ class TestE2EMefEline:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -66,8 +63,7 @@ class TestE2EMefEline:
     def test_005_patch_unknown_circuit(self):
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         evc1 = self.create_evc(100)
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -440,7 +436,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -488,7 +484,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -533,8 +529,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -582,7 +577,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -634,7 +629,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -682,7 +677,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -730,7 +725,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -784,7 +779,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -838,8 +833,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -872,8 +866,6 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data['creation_time'] == creation_time
@@ -935,8 +927,7 @@ class TestE2EMefEline:
                                  headers={'Content-type': 'application/json'})
         data = response.json()
         evc1 = data['circuit_id']
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         payload2 = {
             "current_path": [
@@ -962,8 +953,7 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's current_path
         response = requests.get(api_url + evc1)
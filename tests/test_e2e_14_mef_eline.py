@@ -3,10 +3,13 @@ import time
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import (NetworkTest, KYTOS_API_PORT, OF_PORT, evc_active, evc_cookie,
+                           flows_reinstalled, links_count, switch_connected, wait_until)
+
+pytestmark = pytest.mark.topology('amlight')
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 class TestE2EMefEline:
     net = None
@@ -21,16 +24,14 @@ class TestE2EMefEline:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='amlight')
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name='amlight')
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -40,10 +41,7 @@ class TestE2EMefEline:
         # Start the controller setting an environment in which the setting is
         # preserved (persistence) and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     def create_evc(
         self,
@@ -88,9 +86,21 @@ class TestE2EMefEline:
         if try_avoid_same_s_vlan:
             str_avoid_vlan = "true"
         api_url = f"{KYTOS_API}/mef_eline/v2/evc/{evc_id}/redeploy?try_avoid_same_s_vlan={str_avoid_vlan}"
+        dpid = self.get_evc_data(evc_id)['uni_a']['interface_id'].rsplit(':', 1)[0]
+        redeployed = time.time()
         response = requests.patch(api_url)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        # the EVC stays active through a redeploy: wait for its flows on the
+        # UNI A switch to be replaced
+        switch = self.net.switch_by_dpid(dpid)
+        wait_until(flows_reinstalled(switch, evc_cookie(evc_id), redeployed))
+        wait_until(evc_active(evc_id))
+
+    def wait_reconnected_with_links_down(self, switch):
+        """Wait until switch is back on the controller and topology has the
+        links taken down meanwhile as inactive."""
+        wait_until(switch_connected(switch))
+        wait_until(links_count(len(self.net.switch_links())))
 
     def get_link_vlan_dict_from_path(self, path: dict) -> dict[str, int]:
         link_vlan_dict = {}
@@ -109,8 +119,7 @@ class TestE2EMefEline:
         evc1 = self.create_evc(uni_a='00:00:00:00:00:00:00:16:5',
                                uni_z='00:00:00:00:00:00:00:11:1',
                                vlan_id=100)
-
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -139,8 +148,7 @@ class TestE2EMefEline:
         evc1 = self.create_evc(uni_a='00:00:00:00:00:00:00:20:59',
                                uni_z='00:00:00:00:00:00:00:17:56',
                                vlan_id=100)
-        
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         evc_data = self.get_evc_data(evc1)
         old_path_dict = self.get_link_vlan_dict_from_path(evc_data["current_path"])
@@ -177,8 +185,7 @@ class TestE2EMefEline:
                                uni_z='00:00:00:00:00:00:00:17:56',
                                vlan_id=100,
                                primary_path=primary_path)
-        
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         evc_data = self.get_evc_data(evc1)
         old_path_dict = self.get_link_vlan_dict_from_path(evc_data["current_path"])
@@ -230,8 +237,7 @@ class TestE2EMefEline:
                                vlan_id=100,
                                primary_path=primary_path,
                                backup_path=backup_path)
-        
-        time.sleep(10)
+        wait_until(evc_active(evc1))
 
         evc_data = self.get_evc_data(evc1)
         old_path_dict = self.get_link_vlan_dict_from_path(evc_data["current_path"])
@@ -293,17 +299,17 @@ class TestE2EMefEline:
                 break
 
         # Deployment to primary_path
-        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:6654")
+        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:{OF_PORT + 1}")
         api_url = f"{KYTOS_API}/mef_eline/v2/evc/{evc}/redeploy"
         response = requests.patch(api_url)
         assert response.status_code == 409, response.text
         evc_content = self.get_evc_data(evc)
         assert not evc_content["current_path"]
         self.net.net.configLinkStatus('Ampath1', 'Ampath3', 'down')
-        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:6653")
-        time.sleep(5)
+        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:{OF_PORT}")
+        self.wait_reconnected_with_links_down(Ampath1)
         self.net.net.configLinkStatus('Ampath1', 'Ampath3', 'up')
-        time.sleep(5)
+        wait_until(evc_active(evc))
         evc_content = self.get_evc_data(evc)
         current_path = evc_content['current_path' ]
         primary_path = evc_content['primary_path']
@@ -314,7 +320,7 @@ class TestE2EMefEline:
             assert current["endpoint_b"]["id"] == primary["endpoint_b"]["id"]
 
         # Deployment to backup_path
-        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:6654")
+        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:{OF_PORT + 1}")
         api_url = f"{KYTOS_API}/mef_eline/v2/evc/{evc}/redeploy"
         response = requests.patch(api_url)
         assert response.status_code == 409, response.text
@@ -323,10 +329,10 @@ class TestE2EMefEline:
         # Disable primary_path middle switch
         self.net.net.configLinkStatus('Ampath1', 'Ampath4', 'down')
         self.net.net.configLinkStatus('Ampath1', 'Ampath3', 'down')
-        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:6653")
-        time.sleep(5)
+        Ampath1.vsctl(f"set-controller {Ampath1.name} tcp:127.0.0.1:{OF_PORT}")
+        self.wait_reconnected_with_links_down(Ampath1)
         self.net.net.configLinkStatus('Ampath1', 'Ampath3', 'up')
-        time.sleep(5)
+        wait_until(evc_active(evc))
         evc_content = self.get_evc_data(evc)
         current_path = evc_content['current_path' ]
         backup_path = evc_content['backup_path']
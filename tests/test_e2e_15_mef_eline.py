@@ -4,10 +4,11 @@ import random
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import (NetworkTest, FlowTable, KYTOS_API_PORT, evc_active, evc_cookie,
+                           evc_matches, flows_dump_matches, flows_reinstalled, wait_until)
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = "http://%s:8181/api/kytos" % CONTROLLER
+KYTOS_API = "http://%s:%s/api/kytos" % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EMefEline:
@@ -18,16 +19,14 @@ class TestE2EMefEline:
         It is called at the beginning of every class method execution
         """
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -35,9 +34,7 @@ class TestE2EMefEline:
 
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     def add_topology_metadata(self):
         """Add topology metadata."""
@@ -99,6 +96,17 @@ class TestE2EMefEline:
         data = response.json()
         return data
 
+    @staticmethod
+    def wait_evc_paths(evc_id, current_path_ids, failover_path_ids):
+        """Wait until the EVC is active on current_path_ids with a failover
+        path on failover_path_ids (sets of link ids)."""
+        def on_paths(evc):
+            return (evc['active']
+                    and {link['id'] for link in evc['current_path']} == current_path_ids
+                    and {link['id'] for link in evc['failover_path']} == failover_path_ids)
+
+        return wait_until(evc_matches(evc_id, on_paths))
+
     def delete_evc(self, circuit_id) -> dict:
         """Delete an EVC."""
         api_url = f"{KYTOS_API}/mef_eline/v2/evc/{circuit_id}"
@@ -115,13 +123,14 @@ class TestE2EMefEline:
             uni_z="00:00:00:00:00:00:00:03:1",
             vlan_id=100,
         )
-        time.sleep(10)
+        wait_until(evc_active(evc_id))
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
         assert data["active"]
 
         # Update the EVC switching the uni_z to switch 2
+        updated = time.time()
         self.update_evc(
             evc_id,
             uni_z={
@@ -129,7 +138,11 @@ class TestE2EMefEline:
                 "tag": {"tag_type": 1, "value": 100}
             },
         )
-        time.sleep(10)
+        # the EVC is redeployed with the new UNI: wait for its flows on s1
+        # to be replaced
+        s1 = self.net.net.get('s1')
+        wait_until(flows_reinstalled(s1, evc_cookie(evc_id), updated))
+        wait_until(evc_active(evc_id))
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["uni_z"]["interface_id"] == "00:00:00:00:00:00:00:02:1"
@@ -169,7 +182,7 @@ class TestE2EMefEline:
             },
         )
 
-        time.sleep(10)
+        self.wait_evc_paths(evc_id, red_link_ids, blue_link_ids)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -202,7 +215,7 @@ class TestE2EMefEline:
                 "spf_attribute": "hop",
             },
         )
-        time.sleep(10)
+        self.wait_evc_paths(evc_id, blue_link_ids, red_link_ids)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -495,51 +508,22 @@ class TestE2EMefEline:
         assert response.status_code == 200, response.text
         assert expected == data[intf_id]["available_tags"]["vlan"]
 
-        time.sleep(10)
-
         # Flows created with masks, 12/4092, 16/4092, 20/4094
         s1, s2 = self.net.net.get('s1', 's2')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == 8, flows_s1
+        masks = ['vlan_tci=0x100c/0x1ffc', 'vlan_tci=0x1010/0x1ffc', 'vlan_tci=0x1014/0x1ffe']
+        flows_s1 = wait_until(flows_dump_matches(s1, 8, present=masks))
+        flows_s2 = wait_until(flows_dump_matches(s2, 8, present=masks))
+        assert len(FlowTable.parse(flows_s1)) == 8, flows_s1
         assert 'in_port="s1-eth1",vlan_tci=0x100c/0x1ffc' in flows_s1
         assert 'in_port="s1-eth1",vlan_tci=0x1010/0x1ffc' in flows_s1
         assert 'in_port="s1-eth1",vlan_tci=0x1014/0x1ffe' in flows_s1
-        assert len(flows_s2.split('\r\n ')) == 8, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == 8, flows_s2
         assert 'in_port="s2-eth1",vlan_tci=0x100c/0x1ffc' in flows_s2
         assert 'in_port="s2-eth1",vlan_tci=0x1010/0x1ffc' in flows_s2
         assert 'in_port="s2-eth1",vlan_tci=0x1014/0x1ffe' in flows_s2
 
-        h11, h2 = self.net.net.get('h11', 'h2')
-        # Ping mask 12/4092
-        vlan = random.randrange(12, 16)
-        h11.cmd(f'ip link add link {h11.intfNames()[0]} name vlan12 type vlan id {vlan}')
-        h11.cmd(f'ip link set up vlan12')
-        h11.cmd(f'ip addr add {vlan}.0.0.11/24 dev vlan12')
-        h2.cmd(f'ip link add link {h2.intfNames()[0]} name vlan12 type vlan id {vlan}')
-        h2.cmd(f'ip link set up vlan12')
-        h2.cmd(f'ip addr add {vlan}.0.0.2/24 dev vlan12')
-        result = h11.cmd(f'ping -c1 {vlan}.0.0.2')
-        assert ', 0% packet loss,' in result
-
-        # Ping mask 16/4092
-        vlan = random.randrange(16, 20)
-        h11.cmd(f'ip link add link {h11.intfNames()[0]} name vlan16 type vlan id {vlan}')
-        h11.cmd(f'ip link set up vlan16')
-        h11.cmd(f'ip addr add {vlan}.0.0.11/24 dev vlan16')
-        h2.cmd(f'ip link add link {h2.intfNames()[0]} name vlan16 type vlan id {vlan}')
-        h2.cmd(f'ip link set up vlan16')
-        h2.cmd(f'ip addr add {vlan}.0.0.2/24 dev vlan16')
-        result = h11.cmd(f'ping -c1 {vlan}.0.0.2')
-        assert ', 0% packet loss,' in result
-
-        # Ping mask 20/4094
-        vlan = random.randrange(20, 22)
-        h11.cmd(f'ip link add link {h11.intfNames()[0]} name vlan20 type vlan id {vlan}')
-        h11.cmd(f'ip link set up vlan20')
-        h11.cmd(f'ip addr add {vlan}.0.0.11/24 dev vlan20')
-        h2.cmd(f'ip link add link {h2.intfNames()[0]} name vlan20 type vlan id {vlan}')
-        h2.cmd(f'ip link set up vlan20')
-        h2.cmd(f'ip addr add {vlan}.0.0.2/24 dev vlan20')
-        result = h11.cmd(f'ping -c1 {vlan}.0.0.2')
-        assert ', 0% packet loss,' in result
+        # Ping masks 12/4092, 16/4092 and 20/4094
+        for low, high in ((12, 16), (16, 20), (20, 22)):
+            vlan = random.randrange(low, high)
+            matrix = self.net.connectivity_matrix([('h11', 'h2')], vlan=vlan)
+            assert matrix[('h11', 'h2')]['loss'] == 0, matrix
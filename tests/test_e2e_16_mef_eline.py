@@ -1,13 +1,12 @@
 import json
-import time
 import random
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, FlowTable, KYTOS_API_PORT, evc_matches, wait_until
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = "http://%s:8181/api/kytos" % CONTROLLER
+KYTOS_API = "http://%s:%s/api/kytos" % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EMefEline:
@@ -18,16 +17,14 @@ class TestE2EMefEline:
         It is called at the beginning of every class method execution
         """
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -35,9 +32,7 @@ class TestE2EMefEline:
 
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     def add_topology_metadata(self):
         """Add topology metadata."""
@@ -99,6 +94,18 @@ class TestE2EMefEline:
         data = response.json()
         return data
 
+    @staticmethod
+    def wait_evc_paths(evc_id, avoid_current, avoid_failover):
+        """Wait until the EVC is active with a current path off the
+        avoid_current links and a failover path off the avoid_failover ones."""
+        def off_links(evc):
+            current = {link['id'] for link in evc['current_path']}
+            failover = {link['id'] for link in evc['failover_path']}
+            return (evc['active'] and current and failover
+                    and not current & avoid_current and not failover & avoid_failover)
+
+        return wait_until(evc_matches(evc_id, off_links))
+
     def delete_evc(self, circuit_id) -> dict:
         """Delete an EVC."""
         api_url = f"{KYTOS_API}/mef_eline/v2/evc/{circuit_id}"
@@ -132,7 +139,7 @@ class TestE2EMefEline:
             },
         )
 
-        time.sleep(10)
+        self.wait_evc_paths(evc_id, avoid_current=red_link_ids, avoid_failover=blue_link_ids)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -165,7 +172,7 @@ class TestE2EMefEline:
                 "spf_attribute": "hop",
             },
         )
-        time.sleep(10)
+        self.wait_evc_paths(evc_id, avoid_current=blue_link_ids, avoid_failover=red_link_ids)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -193,8 +200,9 @@ class TestE2EMefEline:
             uni_z="00:00:00:00:00:00:00:02:1",
             vlan_id=100
         )
-        time.sleep(10)
-        
+        wait_until(evc_matches(evc_id, has_failover_path))
+        self.net.wait_flow_counts({'s1': 6, 's2': 6, 's3': 5})
+
         api_url = KYTOS_API + "/mef_eline/v2/evc/"
         response = requests.get(api_url + evc_id)
         data = response.json()
@@ -214,14 +222,15 @@ class TestE2EMefEline:
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
 
-        assert len(flows_s1.split('\r\n ')) == 6, flows_s1
-        assert len(flows_s2.split('\r\n ')) == 6, flows_s2
-        assert len(flows_s3.split('\r\n ')) == 5, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == 6, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == 6, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == 5, flows_s3
 
         url = f"{KYTOS_API}/topology/v3/interfaces/00:00:00:00:00:00:00:03:3/disable"
         response = requests.post(url, headers={"Content-type": "application/json"})
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        wait_until(evc_matches(evc_id, lambda evc: not has_failover_path(evc)))
+        self.net.wait_flow_counts({'s1': 4, 's2': 5, 's3': 2})
 
         api_url = KYTOS_API + "/mef_eline/v2/evc/"
         response = requests.get(api_url + evc_id)
@@ -231,9 +240,9 @@ class TestE2EMefEline:
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == 4, flows_s1
-        assert len(flows_s2.split('\r\n ')) == 5, flows_s2
-        assert len(flows_s3.split('\r\n ')) == 2, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == 4, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == 5, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == 2, flows_s3
 
 
         url = f"{KYTOS_API}/topology/v3/interfaces/00:00:00:00:00:00:00:03:3/enable"
@@ -244,7 +253,8 @@ class TestE2EMefEline:
         url = f"{KYTOS_API}/topology/v3/links/{link_id}/enable"
         response = requests.post(url, headers={"Content-type": "application/json"})
         assert response.status_code == 201, response.text
-        time.sleep(10)
+        wait_until(evc_matches(evc_id, has_failover_path))
+        self.net.wait_flow_counts({'s1': 6, 's2': 6, 's3': 5})
 
         api_url = KYTOS_API + "/mef_eline/v2/evc/"
         response = requests.get(api_url + evc_id)
@@ -262,6 +272,11 @@ class TestE2EMefEline:
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == 6, flows_s1
-        assert len(flows_s2.split('\r\n ')) == 6, flows_s2
-        assert len(flows_s3.split('\r\n ')) == 5, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == 6, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == 6, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == 5, flows_s3
+
+
+def has_failover_path(evc):
+    """EVC check: the EVC has a failover path."""
+    return bool(evc['failover_path'])
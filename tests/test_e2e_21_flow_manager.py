@@ -4,10 +4,11 @@ import time
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import (NetworkTest, FlowTable, KYTOS_API_PORT, flows_dump_matches,
+                           flows_installed, wait_until)
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring':
@@ -26,15 +27,13 @@ class TestE2EFlowManager:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -70,28 +69,26 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be installed
-        wait_time = 20
-        time.sleep(wait_time)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload['flows']))
+        installed = time.time()
 
         # restart controller keeping configuration
-        t1 = time.time()
         self.net.start_controller()
         self.net.wait_switches_connect()
-        delta = time.time() - t1
-
-        # wait for the flow to be installed
-        time.sleep(wait_time)
-        wait_time += wait_time
 
+        # wait for flow_manager to load the stored flow and of_lldp to
+        # reinstall its flow on the reconnected switch
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload['flows']))
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1, present=['dl_vlan=999']))
+        elapsed = time.time() - installed
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         for flow in flows_s1.split('\r\n '):
             # Check all flows but the of_lldp, which is reinstalled
             if 'dl_vlan=999' not in flow: continue
             match = re.search("duration=([0-9.]+)", flow)
             duration = float(match.group(1))
-            assert duration + 1 >= wait_time + delta
+            assert duration + 1 >= elapsed
 
     def test_031_on_switch_restart_kytos_should_recreate_flows(self):
         """Test if, after kytos restart, the flows are preserved on the switch 
@@ -123,7 +120,7 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be installed
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload['flows']))
 
         # OVS does not have a way to actually restart the switch
         # so to simulate that, we just delete all flows
@@ -133,10 +130,8 @@ class TestE2EFlowManager:
         self.net.reconnect_switches()
 
         # wait for the flow to be installed
-        time.sleep(10)
-
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1, present=['dl_vlan=999']))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'dl_vlan=999' in flows_s1
 
     def test_032_on_switch_reconnection_should_recreate_untagged_any_flows(self):
@@ -180,21 +175,21 @@ class TestE2EFlowManager:
         data = response.json()
         assert 'FlowMod Messages Sent' in data['response']
 
-        # wait for the flow to be installed
-        time.sleep(10)
+        # wait for the flows to be installed
+        s1 = self.net.net.get('s1')
+        wait_until(flows_dump_matches(
+            s1, BASIC_FLOWS + 2, present=['vlan_tci=0x1000/0x1000', 'vlan_tci=0x0000/0x1fff']))
 
         # OVS does not have a way to actually restart the switch
         # so to simulate that, we just delete all flows
-        s1 = self.net.net.get('s1')
         s1.dpctl('del-flows')
         # reconnect to trigger and speed up consistency check after the handshake
         self.net.reconnect_switches()
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        # wait for the flows to be installed
+        flows_s1 = wait_until(flows_dump_matches(
+            s1, BASIC_FLOWS + 2, present=['vlan_tci=0x1000/0x1000', 'vlan_tci=0x0000/0x1fff']))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         # 4096/4096
         assert 'vlan_tci=0x1000/0x1000' in flows_s1
         # 0
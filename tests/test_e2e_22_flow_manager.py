@@ -1,11 +1,10 @@
 import json
 import pytest
 import requests
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import NetworkTest, KYTOS_API_PORT
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EFlowManager:
@@ -18,15 +17,13 @@ class TestE2EFlowManager:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -1,14 +1,14 @@
 import json
-import time
 
 import pytest
 import requests
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from tests.helpers import NetworkTest
+from tests.helpers import (NetworkTest, FlowTable, KYTOS_API_PORT, KytosClient,
+                           flows_dump_matches, wait_until)
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring':
@@ -18,6 +18,7 @@ BASIC_FLOWS = 3
 
 class TestE2EFlowManager:
     net = None
+    client = None
 
     def setup_method(self, method):
         """
@@ -26,18 +27,19 @@ class TestE2EFlowManager:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
+        # pooled connections for the concurrent flow requests
+        cls.client = KytosClient(pool_size=100)
 
     @classmethod
     def teardown_class(cls):
+        cls.client.close()
         cls.net.stop()
 
     def test_005_install_flow(self):
@@ -98,13 +100,11 @@ class TestE2EFlowManager:
         data = response.json()
         assert 'FlowMod Messages Sent' in data['response']
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         payload2 = {
@@ -123,10 +123,9 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload2), headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
-
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3,
+                                                 absent=['actions=output:"s1-eth2"']))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
 
         assert 'actions=output:"s1-eth3"' in flows_s1
         assert 'actions=output:"s1-eth4"' in flows_s1
@@ -190,13 +189,11 @@ class TestE2EFlowManager:
         data = response.json()
         assert 'FlowMod Messages Sent' in data['response']
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         payload2 = {
@@ -214,10 +211,8 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload2), headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
-
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 4, flows_s1
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 4))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 4, flows_s1
 
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
@@ -281,13 +276,11 @@ class TestE2EFlowManager:
         data = response.json()
         assert 'FlowMod Messages Sent' in data['response']
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         payload2 = {
@@ -308,10 +301,8 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload2), headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
-
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 4, flows_s1
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 4))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 4, flows_s1
 
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
@@ -360,13 +351,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 2))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         payload2 = {
@@ -410,11 +399,9 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload2), headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 4))
 
-        flows_s1 = s1.dpctl('dump-flows')
-
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 4, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 4, flows_s1
 
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
@@ -464,13 +451,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 2))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
 
@@ -502,11 +487,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3))
 
-        flows_s1 = s1.dpctl('dump-flows')
-
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
         assert 'in_port="s1-eth3"' in flows_s1
@@ -535,11 +518,9 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload3), headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
-
-        flows_s1 = s1.dpctl('dump-flows')
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 4))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 4, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 4, flows_s1
 
         assert 'in_port="s1-eth4"' in flows_s1
         assert 'actions=output:"s1-eth1"' in flows_s1
@@ -611,13 +592,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_035_install_flow(self):
@@ -648,13 +627,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
@@ -662,11 +639,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        flows_s1 = s1.dpctl('dump-flows')
-
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
@@ -674,11 +649,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
-
-        flows_s1 = s1.dpctl('dump-flows')
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_040_install_flow(self):
@@ -752,13 +725,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_045_install_flow(self):
@@ -790,13 +761,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
@@ -804,11 +773,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
-
-        flows_s1 = s1.dpctl('dump-flows')
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
@@ -816,11 +783,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        flows_s1 = s1.dpctl('dump-flows')
-
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_050_install_flow(self):
@@ -866,13 +831,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 2))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_055_install_flow(self):
@@ -904,13 +867,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 1))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 1, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
         payload1 = {
@@ -937,11 +898,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
-
-        flows_s1 = s1.dpctl('dump-flows')
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 2))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
 
     def test_060_install_flow(self):
@@ -988,13 +947,11 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(15)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 2))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
         assert 'actions=output:"s1-eth2"' in flows_s1
         assert 'actions=output:"s1-eth3"' in flows_s1
 
@@ -1011,11 +968,9 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(15)
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 3))
 
-        flows_s1 = s1.dpctl('dump-flows')
-
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 3, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 3, flows_s1
         assert 'actions=drop' in flows_s1
 
     def test_065_install_flow(self):
@@ -1023,8 +978,6 @@ class TestE2EFlowManager:
         Tests the performance and race condition
         with the creation of multiple flows
         """
-        api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
-
         def flow_request(dl_vlan):
             payload = {
               "flows": [{
@@ -1040,8 +993,7 @@ class TestE2EFlowManager:
                 }]
               }]
             }
-            return requests.post(api_url, data=json.dumps(payload),
-                                 headers={'Content-type': 'application/json'})
+            return self.client.install_flows(payload, "00:00:00:00:00:00:00:01")
 
         with ThreadPoolExecutor(max_workers=100) as executor:
             futures = [
@@ -1051,13 +1003,11 @@ class TestE2EFlowManager:
                 response = future.result()
                 assert response.status_code == 202, response.text
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 100))
 
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 100, flows_s1
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 100, flows_s1
 
     def create_flow(self, vlan_id):
         payload = {
@@ -1073,9 +1023,7 @@ class TestE2EFlowManager:
                 }]
             }]
         }
-        api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
-        response = requests.post(api_url, data=json.dumps(payload),
-                                 headers = {'Content-type': 'application/json'})
+        response = self.client.install_flows(payload, '00:00:00:00:00:00:00:01')
 
         assert response.status_code == 202, response.text
         data = response.json()
@@ -1096,9 +1044,7 @@ class TestE2EFlowManager:
         for thread in threads:
             thread.join()
 
-        # wait for the flow to be installed
-        time.sleep(10)
-
         s1 = self.net.net.get('s1')
-        flows_s1 = s1.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 100, flows_s1
+        # wait for the flow to be installed
+        flows_s1 = wait_until(flows_dump_matches(s1, BASIC_FLOWS + 100))
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 100, flows_s1
@@ -1,9 +1,9 @@
 import requests
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT
 import time
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EOfLLDP:
@@ -11,11 +11,10 @@ class TestE2EOfLLDP:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -86,8 +85,7 @@ class TestE2EOfLLDP:
     def test_010_disable_of_lldp(self):
         """ Test if the disabling OF LLDP in an interface worked properly. """
         self.net.start_controller(clean_config=True, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(5)
+        self.net.wait_switches_active()
         self.enable_all_interfaces()
 
         # disabling all the UNI interfaces
@@ -131,8 +129,7 @@ class TestE2EOfLLDP:
 
         # restart kytos and check if lldp remains disabled
         self.net.start_controller(clean_config=False, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_switches_active()
 
         api_url = KYTOS_API + '/of_lldp/v1/interfaces/'
         response = requests.get(api_url)
@@ -142,8 +139,7 @@ class TestE2EOfLLDP:
     def test_020_enable_of_lldp(self):
         """ Test if enabling OF LLDP in an interface works properly. """
         self.net.start_controller(clean_config=True, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(5)
+        self.net.wait_switches_active()
         self.enable_all_interfaces()
         TestE2EOfLLDP.disable_all_of_lldp()
 
@@ -174,8 +170,7 @@ class TestE2EOfLLDP:
 
         # restart kytos and check if lldp remains disabled
         self.net.start_controller(clean_config=False, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_switches_active()
 
         api_url = KYTOS_API + '/of_lldp/v1/interfaces/'
         response = requests.get(api_url)
@@ -185,7 +180,7 @@ class TestE2EOfLLDP:
     def test_030_change_polling_interval(self):
         """ Test if changing the polling interval works works properly. """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         default_polling_time = 3
         api_url = KYTOS_API + '/of_lldp/v1/polling_time'
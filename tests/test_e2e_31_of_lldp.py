@@ -1,10 +1,9 @@
 import json
 import requests
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import NetworkTest, FlowTable, KYTOS_API_PORT, liveness_status, wait_until
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = f"http://{CONTROLLER}:8181/api/kytos"
+KYTOS_API = f"http://{CONTROLLER}:{KYTOS_API_PORT}/api/kytos"
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring4':
@@ -18,10 +17,9 @@ class TestE2EOfLLDP:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -32,14 +30,12 @@ class TestE2EOfLLDP:
         It is called at the beginning of every class method execution
         """
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
-    def restart(self, clean_config=False, enable_all=True, wait_for=10):
+    def restart(self, clean_config=False, enable_all=True):
         self.net.start_controller(clean_config=clean_config, enable_all=enable_all)
-        self.net.wait_switches_connect()
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(wait_for)
+        # Wait for kytos to discover the links again with LLDP
+        self.net.wait_topology_converged()
 
     def enable_link_liveness(self, interface_ids):
         response = requests.post(
@@ -85,8 +81,7 @@ class TestE2EOfLLDP:
 
         self.enable_link_liveness(interface_ids)
 
-        # Wait just so liveness can go up
-        time.sleep(polling_interval * 5)
+        wait_until(liveness_status(interface_ids, 'up'))
 
         # Assert GET liveness/ is all set
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/"
@@ -123,7 +118,8 @@ class TestE2EOfLLDP:
                 assert link["metadata"]["liveness_status"] == "up"
 
         # Restart the controller maintaining config
-        self.restart(wait_for=15)
+        self.restart()
+        wait_until(liveness_status(interface_ids, 'up'))
 
         # Assert GET liveness/ is still all set
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/"
@@ -147,8 +143,7 @@ class TestE2EOfLLDP:
         ]
         self.enable_link_liveness(interface_ids)
 
-        # Wait just so liveness can go up
-        time.sleep(polling_interval * 5)
+        wait_until(liveness_status(interface_ids, 'up'))
 
         # Assert GET liveness/ is enabled
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/"
@@ -167,7 +162,7 @@ class TestE2EOfLLDP:
         assert data["interfaces"] == []
 
         # Restart the controller maintaining config
-        self.restart(wait_for=10)
+        self.restart()
 
         # Assert GET liveness/ is still disabled
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/"
@@ -186,8 +181,7 @@ class TestE2EOfLLDP:
         link_id = "78282c4d5b579265f04ebadc4405ca1b49628eb1d684bb45e5d0607fa8b713d0"
         self.enable_link_liveness(interface_ids)
 
-        # Wait just so liveness can go up
-        time.sleep(polling_interval * 5)
+        wait_until(liveness_status(interface_ids, 'up'))
 
         # Assert GET liveness/ is enabled
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/"
@@ -205,12 +199,11 @@ class TestE2EOfLLDP:
         flow_entry = "cookie=0xdd00000000000000,priority=60000,dl_type=0x088cc,dl_vlan=3799,actions=drop"
         s2.dpctl("add-flow", flow_entry)
 
-        # Wait just so hellos are missed
-        time.sleep(15)
+        wait_until(liveness_status(interface_ids[1:], 'down'))
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl("dump-flows")
         # Expects 2x LLDP flow entries
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 1, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 1, flows_s2
 
         # Assert GET liveness/ is enabled and down
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/?interface_id={interface_ids[1]}"
@@ -234,12 +227,11 @@ class TestE2EOfLLDP:
         s2 = self.net.net.get("s2")
         flow_entry = "cookie=0xdd00000000000000/-1"
         s2.dpctl("del-flows", flow_entry)
-        # Wait just so hellos are received again
-        time.sleep(10)
+        wait_until(liveness_status(interface_ids[1:], 'up'))
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl("dump-flows")
         # Expects 1x LLDP flow entry
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
 
         # Assert GET liveness/ is enabled and up
         api_url = f"{KYTOS_API}/of_lldp/v1/liveness/?interface_id={interface_ids[1]}"
@@ -1,9 +1,12 @@
+import pytest
 import requests
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT, interface_matches, wait_until
 import time
 
+pytestmark = pytest.mark.topology('looped')
+
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EOfLLDPLoopDetection:
@@ -11,11 +14,10 @@ class TestE2EOfLLDPLoopDetection:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='looped')
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name='looped')
         cls.net.start()
         cls.net.start_controller(clean_config=True, enable_all=True)
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_switches_active()
 
     @classmethod
     def teardown_class(cls):
@@ -26,17 +28,14 @@ class TestE2EOfLLDPLoopDetection:
         # Start the controller setting an environment in which the setting is
         # preserved and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds 
-        time.sleep(10)
+        self.net.wait_switches_active()
 
     def test_001_loop_detection_disable_action(self):
         """ This will test that given a looped topology, assuming that there is a loop
         it's going to shutdown the interface. """
 
         interface_id = "00:00:00:00:00:00:00:01:1"
-        time.sleep(10)
+        wait_until(interface_matches(interface_id, lambda intf: not intf['enabled']))
 
         # GET topology with the interface ensuring that it's disabled
         api_url = KYTOS_API + '/topology/v3/interfaces' 
@@ -58,7 +57,8 @@ class TestE2EOfLLDPLoopDetection:
         data = response.json()
         assert data['interfaces'][interface_id4]['enabled']
 
-        # WAIT for some time, until the feature kicks
+        # WAIT for some time, until the feature kicks: the interfaces must
+        # stay enabled, so this is a fixed wait on the LLDP interval
         time.sleep(10)
 
         # GET topology with the interface ensuring that they are enabled
@@ -84,7 +84,8 @@ class TestE2EOfLLDPLoopDetection:
         data = response.json()
         assert data['interfaces'][interface_id4]['enabled']
 
-        # WAIT for some time, until the feature kicks
+        # WAIT for some time, until the feature kicks: the interfaces must
+        # stay enabled, so this is a fixed wait on the LLDP interval
         time.sleep(10)
 
         # Reconfigure the ignored loops
@@ -93,6 +94,7 @@ class TestE2EOfLLDPLoopDetection:
         assert response.status_code == 201, response.text
 
         self.restart()
+        wait_until(interface_matches(interface_id4, lambda intf: not intf['enabled']))
 
         # GET topology with the interface ensuring that they are enabled
         api_url = KYTOS_API + '/topology/v3/interfaces'
@@ -1,10 +1,13 @@
+import pytest
 import requests
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import (NetworkTest, FlowTable, KYTOS_API_PORT, evc_active, evc_cookie,
+                           flows_installed, flows_with_cookie, wait_until)
 import random
 
+pytestmark = pytest.mark.topology('linear10')
+
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2ESDNTrace:
@@ -13,7 +16,7 @@ class TestE2ESDNTrace:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='linear10')
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name='linear10')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
@@ -26,12 +29,23 @@ class TestE2ESDNTrace:
         """
         It is called at the beginning of each method execution
         """
+        circuit_id = self.net.restore_snapshot("evc_400", self.setup_evc)
+        # traces follow the links, so wait for LLDP to rediscover all of
+        # them, then for EVC 400 and its flows on every switch of the path
+        self.net.wait_topology_converged()
+        self.circuit = self.wait_until_evc_is_active(circuit_id)
+        cookie = evc_cookie(circuit_id)
+        for dpid in self.path_dpids(self.circuit):
+            # linear topology: no failover path, one flow per direction
+            wait_until(flows_with_cookie(self.net.switch_by_dpid(dpid), cookie, 2))
+
+    def setup_evc(self):
+        """Clean controller with EVC 400 active, captured once per topology."""
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
         circuit_id = self.create_evc(400)
-        time.sleep(10)
-        self.circuit = self.wait_until_evc_is_active(circuit_id)
+        self.wait_until_evc_is_active(circuit_id)
+        return circuit_id
 
 
     @staticmethod
@@ -63,19 +77,18 @@ class TestE2ESDNTrace:
         data = response.json()
         return data
 
-    @classmethod
-    def wait_until_evc_is_active(
-        cls, evc_id: str, wait_secs=6, i=0, max_i=20
-    ) -> dict:
+    @staticmethod
+    def path_dpids(evc):
+        """Dpids of the switches on the EVC current path, UNIs included."""
+        interfaces = [evc['uni_a']['interface_id'], evc['uni_z']['interface_id']]
+        for link in evc['current_path']:
+            interfaces += [link['endpoint_a']['id'], link['endpoint_b']['id']]
+        return sorted({interface.rsplit(':', 1)[0] for interface in interfaces})
+
+    @staticmethod
+    def wait_until_evc_is_active(evc_id: str, timeout=120) -> dict:
         """Wait until evc is active."""
-        evc = cls.get_evc(evc_id)
-        if evc["active"]:
-            return evc
-        time.sleep(wait_secs)
-        if i < max_i:
-            return cls.wait_until_evc_is_active(evc_id, wait_secs, i + 1, max_i)
-        else:
-            raise ValueError(f"TimeoutError: {evc_id} didn't get active. {evc}")
+        return wait_until(evc_active(evc_id), timeout=timeout, interval=1)
 
     def test_001_run_sdntrace_cp(self):
         """Run SDNTrace-CP (Control Plane)."""
@@ -143,21 +156,17 @@ class TestE2ESDNTrace:
 
     def wait_sdntrace_result(self, trace_id, timeout=10):
         """Wait until sdntrace finishes."""
-        wait_count = 0
-        while wait_count < timeout:
+        api_url = KYTOS_API + '/amlight/sdntrace/v1/trace'
+
+        def done():
             try:
-                api_url = KYTOS_API + '/amlight/sdntrace/v1/trace'
-                response = requests.get(f"{api_url}/{trace_id}")
-                data = response.json()
-                assert data["result"][-1]["reason"] == "done"
-                break
-            except:
-                time.sleep(1)
-                wait_count += 1
-        else:
-            msg = 'Timeout while waiting from sdntrace result.'
-            raise Exception(msg)
-        return data["result"]
+                data = requests.get(f"{api_url}/{trace_id}").json()
+                return data["result"] if data["result"][-1]["reason"] == "done" else None
+            except (requests.RequestException, ValueError, KeyError, IndexError, TypeError):
+                return None
+
+        return wait_until(done, timeout, interval=1,
+                          msg='Timeout while waiting from sdntrace result.')
 
     def test_010_run_sdntrace(self):
         """Run SDNTrace (Data Plane trace)."""
@@ -275,7 +284,8 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:05'
         response = requests.delete(api_url, json=delete_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        s5 = self.net.net.get('s5')
+        wait_until(flows_with_cookie(s5, evc_cookie(self.circuit['id']), 0))
 
         # 2. sdntrace control plane - Trace from UNI_A
         payload_1 = {
@@ -358,7 +368,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/mef_eline/v2/evc'
         response = requests.patch(f"{api_url}/{circuit_id}/redeploy")
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(lambda: FlowTable.dump(s5).count(cookie=evc_cookie(circuit_id)))
         self.circuit = self.wait_until_evc_is_active(circuit_id)
 
         api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/trace'
@@ -490,7 +500,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
        # Add a flow in S2: in_port = 2, out_port = 3
         payload_stored_flow = {
             "flows": [
@@ -511,7 +521,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:02', payload_stored_flow['flows']))
         # Add a flow in S3: in_port = 2, "no action"
         payload_stored_flow = {
                 "flows": [
@@ -526,7 +536,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:03'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:03', payload_stored_flow['flows']))
 
         payload = [
                     {
@@ -572,12 +582,12 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
         # Add a flow in S2: 
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:02', payload_stored_flow['flows']))
 
         payload = [
                     {
@@ -603,7 +613,8 @@ class TestE2ESDNTrace:
 
     def test_055_run_sdntrace_loop(cls):
         """Run SDNTrace to verify loop type"""
-        cls.create_evc(5, "00:00:00:00:00:00:00:01:1", "00:00:00:00:00:00:00:03:1")
+        circuit_id = cls.create_evc(5, "00:00:00:00:00:00:00:01:1", "00:00:00:00:00:00:00:03:1")
+        cls.wait_until_evc_is_active(circuit_id)
 
         # len(trace_result) -> 1
         payload_stored_flow = {
@@ -626,7 +637,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
         payload = [
                     {
                         "trace": {
@@ -684,7 +695,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
 
         # Add a flow in S2: 
         payload_stored_flow = {
@@ -720,7 +731,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:02', payload_stored_flow['flows']))
 
         api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
@@ -768,7 +779,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
 
         payload = [
                     {
@@ -794,8 +805,8 @@ class TestE2ESDNTrace:
     def test_070_run_sdntrace_untagged_vlan(cls):
         """Run sdntrace_cp and sdntrace when vlan is untagged in evc"""
 
-        cls.create_evc("untagged", interface_a="00:00:00:00:00:00:00:02:1", interface_z="00:00:00:00:00:00:00:03:1")        
-        time.sleep(10)
+        circuit_id = cls.create_evc("untagged", interface_a="00:00:00:00:00:00:00:02:1", interface_z="00:00:00:00:00:00:00:03:1")
+        cls.wait_until_evc_is_active(circuit_id)
 
         payload = [
                     {
@@ -836,8 +847,8 @@ class TestE2ESDNTrace:
     def test_075_run_sdntrace_any_vlan(cls):
         """Run sdntrace_cp and sdntrace when vlan is any in evc"""
 
-        cls.create_evc("any", interface_a="00:00:00:00:00:00:00:02:1", interface_z="00:00:00:00:00:00:00:03:1")
-        time.sleep(10)
+        circuit_id = cls.create_evc("any", interface_a="00:00:00:00:00:00:00:02:1", interface_z="00:00:00:00:00:00:00:03:1")
+        cls.wait_until_evc_is_active(circuit_id)
 
         payload = [
                     {
@@ -1016,7 +1027,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', payload_stored_flow['flows']))
        
         payload = [
                     {
@@ -1111,6 +1122,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json=flow_payload)
         assert response.status_code == 202, response.text
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', flow_payload['flows']))
 
         flow_payload = {"flows": [{
             "priority": 38000,
@@ -1127,7 +1139,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json=flow_payload)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:02', flow_payload['flows']))
 
         api_url = KYTOS_API + '/amlight/sdntrace/v1/trace'
         response = requests.put(api_url, json=trace_payload)
@@ -1172,6 +1184,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json=flow_payload)
         assert response.status_code == 202, response.text
+        wait_until(flows_installed('00:00:00:00:00:00:00:01', flow_payload['flows']))
 
         flow_payload = {"flows": [{
             "priority": 38000,
@@ -1188,7 +1201,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json=flow_payload)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:02', flow_payload['flows']))
 
         api_url = KYTOS_API + '/amlight/sdntrace/v1/trace'
         response = requests.put(api_url, json=trace_payload)
@@ -1,12 +1,11 @@
 import os
-import time
 import shutil
 import requests
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT
 from kytos.core.auth import UserController
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2EKytosAuth:
@@ -28,11 +27,10 @@ class TestE2EKytosAuth:
         })
         self.token = self.get_token()
         self.auth_header = {"Authorization": f"Bearer {self.token}"}
-        time.sleep(5)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
 
     @classmethod
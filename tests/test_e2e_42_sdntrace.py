@@ -1,9 +1,11 @@
+import pytest
 import requests
-from tests.helpers import NetworkTest
-import time
+from tests.helpers import NetworkTest, KYTOS_API_PORT, flows_installed, wait_until
+
+pytestmark = pytest.mark.topology('amlight_looped')
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api' % (CONTROLLER, KYTOS_API_PORT)
 
 
 class TestE2ESDNTrace:
@@ -12,7 +14,7 @@ class TestE2ESDNTrace:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='amlight_looped')
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name='amlight_looped')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
@@ -26,8 +28,7 @@ class TestE2ESDNTrace:
         It is called at the beginning of each method execution
         """
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     def test_001_run_sdntrace_with_goto_table_intra(cls):
         """Run SDNTrace-CP for instruction type goto_table for the intra case:
@@ -172,7 +173,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:11', payload_stored_flow['flows']))
 
         payload = [
             {"trace": {
@@ -323,7 +324,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:11', payload_stored_flow['flows']))
 
         # Add flows in S4
         payload_stored_flow = {
@@ -421,7 +422,7 @@ class TestE2ESDNTrace:
         api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:18'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
-        time.sleep(10)
+        wait_until(flows_installed('00:00:00:00:00:00:00:18', payload_stored_flow['flows']))
 
         payload = [
             {"trace": {
@@ -4,10 +4,10 @@ from datetime import datetime, timedelta
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, FlowTable, KYTOS_API_PORT, evc_active, wait_until
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api/kytos' % (CONTROLLER, KYTOS_API_PORT)
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -23,11 +23,10 @@ class TestE2EMaintenance:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(10)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -76,9 +75,9 @@ class TestE2EMaintenance:
 
     def restart_and_create_circuit(self):
         self.net.restart_kytos_clean()
-        time.sleep(10)
+        self.net.wait_topology_converged()
         evc_id = self.create_circuit(100)
-        time.sleep(10)
+        wait_until(evc_active(evc_id))
         return evc_id
 
     def test_005_list_mw_should_be_empty(self):
@@ -137,9 +136,9 @@ class TestE2EMaintenance:
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == BASIC_FLOWS + 2, flows_s3
 
         # Sets up the maintenance window information
         mw_start_delay = 10
@@ -202,9 +201,9 @@ class TestE2EMaintenance:
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
         flows_s3 = s3.dpctl('dump-flows')
-        assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 2, flows_s1
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
-        assert len(flows_s3.split('\r\n ')) == BASIC_FLOWS + 2, flows_s3
+        assert len(FlowTable.parse(flows_s1)) == BASIC_FLOWS + 2, flows_s1
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s3)) == BASIC_FLOWS + 2, flows_s3
 
         # Cleans up
         h11.cmd('ip link del vlan100')
@@ -217,7 +216,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up the maintenance window information
         mw_start_delay = 60
@@ -247,7 +246,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up the maintenance window information
         mw_start_delay = 60
@@ -275,7 +274,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up the maintenance window information
         mw_start_delay = 60
@@ -302,7 +301,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up a wrong maintenance window data
         payload = {}
@@ -386,7 +385,7 @@ class TestE2EMaintenance:
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl('dump-flows')
         assert 'dl_vlan=100' not in flows_s2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
 
         # Checks connectivity during maintenance
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -404,7 +403,7 @@ class TestE2EMaintenance:
 
         # Verifies the flows behavior after the maintenance
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -418,7 +417,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
@@ -549,7 +548,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up the maintenance window information
         mw_start_delay = 60
@@ -595,7 +594,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         # Sets up maintenance window information
         mw_start_delay = 60
@@ -731,7 +730,7 @@ class TestE2EMaintenance:
         # Verifies the flow at the initial MW time
         # (no maintenance at that time, it has been delayed)
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -741,7 +740,7 @@ class TestE2EMaintenance:
         # Verifies the flow during maintenance time
         flows_s2 = s2.dpctl('dump-flows')
         assert 'dl_vlan=100' not in flows_s2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -750,7 +749,7 @@ class TestE2EMaintenance:
 
         # Verifies the flow behavior after the maintenance window
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -854,7 +853,7 @@ class TestE2EMaintenance:
         # Verifies the flow behavior
         # (no maintenance at that time, it has been deleted)
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -868,7 +867,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on DELETE
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
@@ -918,7 +917,7 @@ class TestE2EMaintenance:
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl('dump-flows')
         assert 'dl_vlan=100' not in flows_s2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS
 
         # Checks connectivity during maintenance
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -936,12 +935,12 @@ class TestE2EMaintenance:
         end_response = requests.patch(api_url)
         assert end_response.status_code == 200
 
-        # Waits just a couple of seconds to give kytos enough time to restore the flows
-        time.sleep(5)
+        # Waits for kytos to restore the flows
+        self.net.wait_flow_counts({'s2': BASIC_FLOWS + 2})
 
         # Verifies the flow behavior and connectivity after ending the maintenance
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -955,7 +954,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id}/end on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        self.net.wait_topology_converged()
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
@@ -1047,7 +1046,7 @@ class TestE2EMaintenance:
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl('dump-flows')
         assert 'dl_vlan=100' not in flows_s2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
 
         # Checks connectivity during maintenance
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -1074,7 +1073,7 @@ class TestE2EMaintenance:
         s2 = self.net.net.get('s2')
         flows_s2 = s2.dpctl('dump-flows')
         assert 'dl_vlan=100' not in flows_s2
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS, flows_s2
 
         # Checks connectivity during maintenance
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -1092,7 +1091,7 @@ class TestE2EMaintenance:
 
         # Verifies the flows behavior after the maintenance
         flows_s2 = s2.dpctl('dump-flows')
-        assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS + 2, flows_s2
+        assert len(FlowTable.parse(flows_s2)) == BASIC_FLOWS + 2, flows_s2
         result = h11.cmd('ping -c1 100.0.0.2')
         assert ', 0% packet loss,' in result
 
@@ -1226,8 +1225,7 @@ class TestE2EMaintenance:
 
     def test_125_multiple_payload_item_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
         start = datetime.utcnow() + timedelta(days=1)
         end = start + timedelta(hours=2)
@@ -1264,8 +1262,7 @@ class TestE2EMaintenance:
 
     def test_130_switch_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
         start = datetime.utcnow() + timedelta(days=1)
         end = start + timedelta(hours=2)
@@ -1293,8 +1290,7 @@ class TestE2EMaintenance:
 
     def test_135_interface_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
         start = datetime.utcnow() + timedelta(days=1)
         end = start + timedelta(hours=2)
@@ -1322,8 +1318,7 @@ class TestE2EMaintenance:
 
     def test_140_link_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
         api_url = KYTOS_API + '/topology/v3/switches'
         response = requests.get(api_url, headers={'Content-type': 'application/json'})
@@ -1,10 +1,10 @@
 import time
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT, evc_active, flows_dump_matches, wait_until
 import requests
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = f'http://{CONTROLLER}:8181/api/kytos'
+KYTOS_API = f'http://{CONTROLLER}:{KYTOS_API_PORT}/api/kytos'
 OF_MULTI_TABLE_API = '/of_multi_table/v1/pipeline'
 
 BASIC_FLOWS = 3
@@ -14,20 +14,29 @@ class TestE2EOfMultiTable:
     def setup_method(self, method):
         """Called at the beginning of each class method"""
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        time.sleep(10)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
         cls.net.stop()
 
+    @staticmethod
+    def wait_pipeline(pipeline_id, status):
+        """Wait until the pipeline has status ('enabled' or 'disabled')."""
+        def predicate():
+            response = requests.get(f"{KYTOS_API}{OF_MULTI_TABLE_API}/{pipeline_id}")
+            return response.status_code == 200 and response.json()["status"] == status
+
+        predicate.__name__ = f'pipeline {pipeline_id} {status}'
+        return wait_until(predicate)
+
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
         self.net.wait_switches_connect()
@@ -117,7 +126,7 @@ class TestE2EOfMultiTable:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']))
 
         # Add pipeline
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}"
@@ -130,7 +139,8 @@ class TestE2EOfMultiTable:
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data['id']}/enable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        self.wait_pipeline(data['id'], 'enabled')
+        wait_until(flows_dump_matches(self.net.net.get('s1'), 9, present=['table=4']))
 
         # Get pipeline dictionary
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data['id']}"
@@ -167,8 +177,8 @@ class TestE2EOfMultiTable:
         assert 'actions=mod_vlan_vid:100,output:"s1-eth1"' in flows_s1[8]
 
         self.net.start_controller(clean_config=False)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
+        wait_until(flows_dump_matches(self.net.net.get('s1'), 9, present=['table=4']))
 
         # Assert installed flows
         s1 = self.net.net.get('s1')
@@ -202,7 +212,8 @@ class TestE2EOfMultiTable:
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data['id']}/disable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        self.wait_pipeline(data['id'], 'disabled')
+        wait_until(flows_dump_matches(self.net.net.get('s1'), 5, absent=['table=1']))
 
         # of_lldp and coloring have same priority and
         # order is not deterministic
@@ -261,9 +272,10 @@ class TestE2EOfMultiTable:
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data['id']}/enable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        self.wait_pipeline(data['id'], 'enabled')
 
         s1 = self.net.net.get('s1')
+        wait_until(lambda: 'actions=resubmit(,1)' in s1.dpctl('dump-flows'))
         flows_s1 = s1.dpctl('dump-flows')
         assert 'actions=resubmit(,1)' in flows_s1
 
@@ -271,7 +283,8 @@ class TestE2EOfMultiTable:
         s1.dpctl('del-flows')
         self.net.reconnect_switches()
 
-        time.sleep(10)
+        # the consistency check recreates the miss flow
+        wait_until(lambda: 'actions=resubmit(,1)' in s1.dpctl('dump-flows'))
 
         flows_s1 = s1.dpctl('dump-flows')
         assert 'actions=resubmit(,1)' in flows_s1
@@ -322,7 +335,7 @@ class TestE2EOfMultiTable:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_until(evc_active(data['circuit_id']))
 
         h11, h2 = self.net.net.get('h11', 'h2')
         h11.cmd(f'ip link add link {h11.intfNames()[0]} name vlan_ra type vlan id 100')
@@ -351,7 +364,8 @@ class TestE2EOfMultiTable:
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data['id']}/enable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        self.wait_pipeline(data['id'], 'enabled')
+        wait_until(flows_dump_matches(self.net.net.get('s1'), 7, present=['table=1']))
 
         h11, h2 = self.net.net.get('h11', 'h2')
         h11.cmd(f'ip link add link {h11.intfNames()[0]} name vlan_ra type vlan id 100')
@@ -433,13 +447,13 @@ class TestE2EOfMultiTable:
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data1['id']}/enable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        test.wait_pipeline(data1['id'], 'enabled')
 
         # Try to enable another pipeline
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data2['id']}/enable"
         response = requests.post(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        test.wait_pipeline(data2['id'], 'enabled')
 
         # Try to delete an enabled pipeline
         api_url = f"{KYTOS_API}{OF_MULTI_TABLE_API}/{data2['id']}"
@@ -1,11 +1,11 @@
 import time
 import json
 
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT, flows_installed, wait_until
 import requests
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
+KYTOS_API = 'http://%s:%s/api' % (CONTROLLER, KYTOS_API_PORT)
 KYTOS_STATS = KYTOS_API + '/amlight/kytos_stats/v1'
 
 class TestE2EKytosStats:
@@ -13,15 +13,14 @@ class TestE2EKytosStats:
     def setup_method(self, method):
         """Called at the beginning of each class method"""
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = NetworkTest.shared(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        time.sleep(10)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -133,7 +132,7 @@ class TestE2EKytosStats:
         assert 'FlowMod Messages Sent' in data_flow['response']
 
         # wait the flow to be installed
-        time.sleep(5)
+        wait_until(flows_installed(sw, payload['flows']))
 
         # send N packets, each one containing 1500 bytes
         # (14 ether hdr + 40 ipv6 + 8 icmp + 1438 payload)
@@ -185,7 +184,7 @@ class TestE2EKytosStats:
         assert 'FlowMod Messages Sent' in data_flow['response']
 
         # wait the flow to be installed
-        time.sleep(5)
+        wait_until(flows_installed(sw, payload['flows']))
 
         # send N packets, each one containing 1500 bytes
         # (14 ether hdr + 40 ipv6 + 8 icmp + 1438 payload)
@@ -277,6 +276,7 @@ class TestE2EKytosStats:
         data_flow = response.json()
         assert 'FlowMod Messages Sent' in data_flow['response']
 
+        # give enough time for stats gathering (of_core.STATS_INTERVAL)
         time.sleep(10)
 
         response = requests.get(api_url)
@@ -316,6 +316,7 @@ class TestE2EKytosStats:
         data_flow = response.json()
         assert 'FlowMod Messages Sent' in data_flow['response']
 
+        # give enough time for stats gathering (of_core.STATS_INTERVAL)
         time.sleep(10)
 
         response = requests.get(api_url)
@@ -1,12 +1,13 @@
 import json
 import requests
-from tests.helpers import NetworkTest
+from tests.helpers import NetworkTest, KYTOS_API_PORT
 import tests.helpers
-import time
 import pytest
 
+pytestmark = pytest.mark.topology("multi")
+
 CONTROLLER = "127.0.0.1"
-KYTOS_API = "http://%s:8181/api/kytos" % CONTROLLER
+KYTOS_API = "http://%s:%s/api/kytos" % (CONTROLLER, KYTOS_API_PORT)
 
 class TestE2EPathfinder:
     net = None
@@ -20,16 +21,14 @@ class TestE2EPathfinder:
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.wait_topology_converged()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="multi")
+        cls.net = NetworkTest.shared(CONTROLLER, topo_name="multi")
         cls.net.start()
         cls.net.restart_kytos_clean()
-        cls.net.wait_switches_connect()
-        time.sleep(5)
+        cls.net.wait_topology_converged()
 
     @classmethod
     def teardown_class(cls):
@@ -39,10 +38,8 @@ class TestE2EPathfinder:
         # Start the controller setting an environment in which the setting is
         # preserved (persistence) and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
-        self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        # Wait for kytos to discover the links again with LLDP
+        self.net.wait_topology_converged()
 
     def add_topology_metadata(self):
         """Add topology metadata."""
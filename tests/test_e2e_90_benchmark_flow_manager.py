@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from tests.helpers import (NetworkTest, FlowTable, KytosClient, BENCHMARK,
+                           env_ints, kytos_dpid, latency_stats,
+                           record_benchmark)
+
+CONTROLLER = '127.0.0.1'
+
+# E2E_FLOW_BENCH_VOLUMES: total flows per run, spread over all switches
+VOLUMES = env_ints('E2E_FLOW_BENCH_VOLUMES', '1000,10000,100000')
+BATCH_SIZE = int(os.environ.get('E2E_FLOW_BENCH_BATCH', 500))
+CONCURRENCY = int(os.environ.get('E2E_FLOW_BENCH_CONCURRENCY', 8))
+TOPO = os.environ.get('E2E_FLOW_BENCH_TOPO', 'linear10')
+
+pytestmark = pytest.mark.topology(TOPO)
+
+# every benchmark flow has cookie BENCH_COOKIE | index
+BENCH_COOKIE = 0xbe00000000000000
+BENCH_COOKIE_MASK = 0xff00000000000000
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def bench_flow(index):
+    """Flow number index, unique by cookie and match."""
+    return {
+        "priority": 100,
+        "cookie": BENCH_COOKIE | index,
+        "match": {
+            "in_port": 1,
+            "dl_type": 2048,
+            "nw_dst": f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+        },
+        "actions": [{"action_type": "output", "port": 2}]
+    }
+
+
+class FlowWatcher(threading.Thread):
+    """Poll a switch and record when each benchmark cookie shows up in OVS."""
+
+    def __init__(self, switch, cookies, interval=0.2):
+        super().__init__(daemon=True)
+        self.switch = switch
+        self.pending = set(cookies)
+        self.visible = {}
+        self.interval = interval
+        self.done = threading.Event()
+
+    def run(self):
+        while self.pending and not self.done.is_set():
+            flows = FlowTable.dump(
+                self.switch, '--no-stats',
+                f'cookie={BENCH_COOKIE:#x}/{BENCH_COOKIE_MASK:#x}')
+            now = time.monotonic()
+            for cookie in self.pending.intersection(flow.cookie for flow in flows):
+                self.visible[cookie] = now
+            self.pending.difference_update(self.visible)
+            self.done.wait(self.interval)
+
+
+class TestE2EFlowManagerBenchmark:
+    net = None
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER, TOPO)
+        cls.net.start()
+        cls.net.wait_switches_active()
+        cls.client = KytosClient(pool_size=CONCURRENCY)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.net.stop()
+
+    def setup_method(self, method):
+        self.net.start_controller(clean_config=True, enable_all=True)
+        self.net.wait_topology_converged()
+
+    def post_batch(self, dpid, flows):
+        """POST one batch, returning (posted, accepted, status)."""
+        posted = time.monotonic()
+        response = self.client.install_flows({"flows": flows}, dpid)
+        return posted, time.monotonic(), response.status_code
+
+    @pytest.mark.parametrize('volume', VOLUMES)
+    def test_010_flow_install_throughput(self, volume):
+        """Install volume flows in batches across all switches and measure
+        API acceptance rate and the latency until each flow is in OVS."""
+        switches = self.net.net.switches
+        assignments = {switch.name: [] for switch in switches}
+        for index in range(volume):
+            assignments[switches[index % len(switches)].name].append(index)
+
+        watchers = {
+            switch.name: FlowWatcher(
+                switch, [BENCH_COOKIE | i for i in assignments[switch.name]])
+            for switch in switches
+        }
+        for watcher in watchers.values():
+            watcher.start()
+
+        batches = []
+        for switch in switches:
+            indexes = assignments[switch.name]
+            for start in range(0, len(indexes), BATCH_SIZE):
+                batch = indexes[start:start + BATCH_SIZE]
+                batches.append((kytos_dpid(switch.dpid), switch.name, batch))
+
+        posted_at = {}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            futures = [
+                (executor.submit(self.post_batch, dpid,
+                                 [bench_flow(i) for i in batch]), name, batch)
+                for dpid, name, batch in batches
+            ]
+            results = []
+            for future, name, batch in futures:
+                posted, accepted, status = future.result()
+                assert status == 202, f'{name}: HTTP {status}'
+                results.append((posted, accepted, len(batch)))
+                for index in batch:
+                    posted_at[BENCH_COOKIE | index] = posted
+        accepted_all = max(accepted for _, accepted, _ in results)
+
+        timeout = max(60, volume / 100)
+        for watcher in watchers.values():
+            watcher.join(max(started + timeout - time.monotonic(), 0))
+            watcher.done.set()
+
+        visible = {}
+        for watcher in watchers.values():
+            visible.update(watcher.visible)
+        missing = volume - len(visible)
+        latencies = [visible[cookie] - posted_at[cookie] for cookie in visible]
+        installed_all = max(visible.values(), default=started)
+
+        report = {
+            'config': {'topology': TOPO, 'switches': len(switches), 'volume': volume,
+                       'batch_size': BATCH_SIZE, 'concurrency': CONCURRENCY},
+            'accept_seconds': accepted_all - started,
+            'accept_flows_per_second': volume / (accepted_all - started),
+            'install_seconds': installed_all - started,
+            'install_flows_per_second': (len(visible) / (installed_all - started)
+                                         if visible else 0.0),
+            'install_latency': latency_stats(latencies),
+            'batch_latency': latency_stats(a - p for p, a, _ in results),
+            'missing': missing,
+        }
+        record_benchmark(f'flow_install_{volume}', report)
+        latency = report['install_latency']
+        print(f"flow install {volume} flows ({len(switches)} switches, "
+              f"batch {BATCH_SIZE}): accepted {report['accept_flows_per_second']:.0f} flows/s, "
+              f"installed {report['install_flows_per_second']:.0f} flows/s, "
+              f"latency p50 {latency.get('p50', 0):.3f}s p95 {latency.get('p95', 0):.3f}s "
+              f"p99 {latency.get('p99', 0):.3f}s")
+
+        assert missing == 0, f'{missing} of {volume} flows not installed after {timeout}s'
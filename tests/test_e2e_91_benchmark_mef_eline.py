@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from tests.helpers import (NetworkTest, FlowTable, KytosClient, BENCHMARK, INFO_KEY,
+                           UNI_PAIRS, env_ints, evc_cookie, latency_stats,
+                           record_benchmark)
+
+pytestmark = pytest.mark.topology('amlight')
+
+CONTROLLER = '127.0.0.1'
+
+# E2E_EVC_BENCH_COUNTS: EVCs created, activated and deleted per run
+COUNTS = env_ints('E2E_EVC_BENCH_COUNTS', '100,500,1000')
+CONCURRENCY = int(os.environ.get('E2E_EVC_BENCH_CONCURRENCY', 10))
+VLAN_START = int(os.environ.get('E2E_EVC_BENCH_VLAN_START', 100))
+
+# phases timed by the EVC list poll (evc_interval, 1s): too coarse to gate
+EVC_POLL_PHASES = ('path', 'active')
+
+# mef_eline cookies are 0xaa followed by the first 14 digits of the EVC id
+EVC_COOKIE_FILTER = 'cookie=0xaa00000000000000/0xff00000000000000'
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def evc_payload(index):
+    """EVC number index, spread over UNI_PAIRS with one VLAN per pair."""
+    (_, uni_a), (_, uni_z) = UNI_PAIRS[index % len(UNI_PAIRS)]
+    vlan = VLAN_START + index // len(UNI_PAIRS)
+    return {
+        "name": f"bench_{index}",
+        "enabled": True,
+        "dynamic_backup_path": True,
+        "uni_a": {"interface_id": uni_a, "tag": {"tag_type": "vlan", "value": vlan}},
+        "uni_z": {"interface_id": uni_z, "tag": {"tag_type": "vlan", "value": vlan}},
+    }
+
+
+class ProvisioningMonitor(threading.Thread):
+    """Poll mef_eline and the UNI switches, recording when each EVC first
+    has a current_path, is active, has its flows on both UNIs and when its
+    flows are gone again.
+
+    The UNI switch flows are dumped every interval seconds. Listing every
+    EVC costs the controller much more, so it only happens every
+    evc_interval seconds and stops once the EVCs are being removed; path
+    and active times are that coarse, so they are reported under INFO_KEY."""
+
+    def __init__(self, client, switches, interval=0.2, evc_interval=1.0):
+        super().__init__(daemon=True)
+        self.client = client
+        self.switches = switches
+        self.interval = interval
+        self.evc_interval = evc_interval
+        self.path_at = {}
+        self.active_at = {}
+        self.flows_at = {}
+        self.gone_at = {}
+        self.removing = set()
+        self.done = threading.Event()
+
+    def poll_flows(self):
+        tables = [FlowTable.dump(switch, '--no-stats', EVC_COOKIE_FILTER)
+                  for switch in self.switches]
+        now = time.monotonic()
+        cookies = [{flow.cookie for flow in flows} for flows in tables]
+        # flows_at keeps per switch first-seen times, the EVC is complete
+        # once its UNI switches (checked later) all have it
+        for switch, seen in zip(self.switches, cookies):
+            for cookie in seen:
+                self.flows_at.setdefault(cookie, {}).setdefault(switch.name, now)
+        present = set().union(*cookies)
+        for cookie in list(self.removing):
+            if cookie not in present:
+                self.gone_at.setdefault(cookie, now)
+
+    def poll_evcs(self):
+        try:
+            evcs = self.client.list_evcs().json()
+        except Exception:
+            return
+        now = time.monotonic()
+        for evc_id, evc in evcs.items():
+            if evc.get('current_path'):
+                self.path_at.setdefault(evc_id, now)
+            if evc.get('active'):
+                self.active_at.setdefault(evc_id, now)
+
+    def run(self):
+        next_evcs = 0.0
+        while not self.done.is_set():
+            if not self.removing and time.monotonic() >= next_evcs:
+                next_evcs = time.monotonic() + self.evc_interval
+                self.poll_evcs()
+            self.poll_flows()
+            self.done.wait(self.interval)
+
+
+class TestE2EMefElineBenchmark:
+    net = None
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER, 'amlight')
+        cls.net.start()
+        cls.net.wait_switches_active()
+        cls.client = KytosClient(pool_size=CONCURRENCY + 1)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.net.stop()
+
+    def setup_method(self, method):
+        self.net.start_controller(clean_config=True, enable_all=True)
+        self.net.wait_topology_converged()
+
+    def create(self, index):
+        """POST EVC index, returning (index, posted, accepted, response)."""
+        posted = time.monotonic()
+        response = self.client.create_evc(evc_payload(index))
+        return index, posted, time.monotonic(), response
+
+    def delete(self, evc_id):
+        posted = time.monotonic()
+        response = self.client.delete_evc(evc_id)
+        return evc_id, posted, time.monotonic(), response
+
+    @staticmethod
+    def wait_for(records, keys, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not keys <= records.keys():
+            time.sleep(0.2)
+
+    @pytest.mark.parametrize('count', COUNTS)
+    def test_010_evc_provisioning(self, count):
+        """Create, activate and delete count EVCs, timing POST acceptance,
+        path computation, flow installation and activation separately."""
+        assert count <= len(UNI_PAIRS) * (4095 - VLAN_START), 'not enough VLANs'
+        uni_switches = {}
+        for index in range(min(count, len(UNI_PAIRS))):
+            (name_a, _), (name_z, _) = UNI_PAIRS[index]
+            uni_switches[index] = (name_a, name_z)
+        switches = [self.net.net.get(name)
+                    for name in sorted({n for pair in uni_switches.values() for n in pair})]
+        monitor = ProvisioningMonitor(self.client, switches)
+        monitor.start()
+        timeout = max(120, count / 2)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            created = list(executor.map(self.create, range(count)))
+        evcs = {}
+        for index, posted, accepted, response in created:
+            assert response.status_code == 201, response.text
+            evc_id = response.json()['circuit_id']
+            evcs[evc_id] = {'index': index, 'posted': posted, 'accepted': accepted,
+                            'cookie': evc_cookie(evc_id),
+                            'switches': uni_switches[index % len(UNI_PAIRS)]}
+        accepted_all = max(evc['accepted'] for evc in evcs.values())
+        self.wait_for(monitor.active_at, set(evcs), timeout - (time.monotonic() - started))
+        # let the monitor take one more flow sample
+        time.sleep(2 * monitor.interval)
+
+        phases = {'accept': [], 'path': [], 'flows': [], 'active': []}
+        inactive = []
+        for evc_id, evc in evcs.items():
+            posted = evc['posted']
+            phases['accept'].append(evc['accepted'] - posted)
+            if evc_id in monitor.path_at:
+                phases['path'].append(monitor.path_at[evc_id] - posted)
+            seen = monitor.flows_at.get(evc['cookie'], {})
+            if all(name in seen for name in evc['switches']):
+                phases['flows'].append(max(seen[name] for name in evc['switches']) - posted)
+            if evc_id in monitor.active_at:
+                phases['active'].append(monitor.active_at[evc_id] - posted)
+            else:
+                inactive.append(evc_id)
+        active_all = max(monitor.active_at.get(evc_id, started) for evc_id in evcs)
+
+        cookies = {evc['cookie'] for evc in evcs.values()}
+        monitor.removing.update(cookies)
+        delete_started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            deleted = list(executor.map(self.delete, list(evcs)))
+        for evc_id, posted, accepted, response in deleted:
+            assert response.status_code == 200, response.text
+            evcs[evc_id]['deleted'] = posted
+        phases['delete'] = [accepted - posted for _, posted, accepted, _ in deleted]
+        delete_accepted_all = max(accepted for _, _, accepted, _ in deleted)
+        self.wait_for(monitor.gone_at, cookies, timeout)
+        monitor.done.set()
+        monitor.join()
+        phases['flows_removed'] = [
+            monitor.gone_at[evc['cookie']] - evc['deleted']
+            for evc in evcs.values() if evc['cookie'] in monitor.gone_at
+        ]
+        lingering = len(cookies - monitor.gone_at.keys())
+
+        report = {
+            'config': {'topology': 'amlight', 'count': count, 'concurrency': CONCURRENCY},
+            'accept_seconds': accepted_all - started,
+            'accept_evcs_per_second': count / (accepted_all - started),
+            'provision_seconds': active_all - started,
+            'provision_evcs_per_second': ((len(evcs) - len(inactive)) / (active_all - started)
+                                          if active_all > started else 0.0),
+            'delete_accept_seconds': delete_accepted_all - delete_started,
+            'flows_removed_seconds': (max(monitor.gone_at[cookie] for cookie in cookies)
+                                      - delete_started if not lingering else None),
+            'inactive': len(inactive),
+            'lingering_flows': lingering,
+            'phases': {phase: latency_stats(values) for phase, values in phases.items()
+                       if phase not in EVC_POLL_PHASES},
+            INFO_KEY: {'phases': {phase: latency_stats(phases[phase])
+                                  for phase in EVC_POLL_PHASES}},
+        }
+        record_benchmark(f'evc_provisioning_{count}', report)
+        print(f"evc provisioning {count} EVCs: accepted {report['accept_evcs_per_second']:.1f}/s, "
+              f"active {report['provision_evcs_per_second']:.1f}/s")
+        for phase, stats in {**report['phases'], **report[INFO_KEY]['phases']}.items():
+            if stats['count']:
+                print(f"  {phase:14} n={stats['count']:5} p50 {stats['p50']:.3f}s "
+                      f"p95 {stats['p95']:.3f}s p99 {stats['p99']:.3f}s max {stats['max']:.3f}s")
+
+        assert not inactive, f'{len(inactive)} of {count} EVCs not active after {timeout}s'
+        assert not lingering, f'flows of {lingering} deleted EVCs still installed'
@@ -0,0 +1,142 @@
+import os
+import time
+
+import pytest
+import requests
+
+from tests.helpers import (NetworkTest, KytosClient, PingProbe, BENCHMARK,
+                           evc_active, latency_stats, record_benchmark,
+                           wait_until)
+
+pytestmark = pytest.mark.topology('amlight')
+
+CONTROLLER = '127.0.0.1'
+
+ITERATIONS = int(os.environ.get('E2E_FAILOVER_ITERATIONS', 20))
+PROBE_INTERVAL = float(os.environ.get('E2E_FAILOVER_PROBE_INTERVAL', 0.001))
+VLAN = 101
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def path_ids(path):
+    return [link['id'] for link in path or []]
+
+
+class TestE2EFailoverBenchmark:
+    """Failover convergence on AmlightTopo between h1 (Ampath1) and h4
+    (SanJuan): data-plane loss from a high-rate ping and the time the
+    controller takes to publish a new current_path."""
+    net = None
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER, 'amlight')
+        cls.net.start()
+        cls.net.wait_switches_active()
+        cls.client = KytosClient()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.net.stop()
+
+    def setup_method(self, method):
+        self.net.config_all_links_up()
+        self.net.start_controller(clean_config=True, enable_all=True)
+        self.net.wait_topology_converged()
+        h1, h4 = self.net.net.get('h1', 'h4')
+        for host, address in ((h1, '101.0.0.1/24'), (h4, '101.0.0.4/24')):
+            intf = host.intfNames()[0]
+            host.cmd(f'ip link add link {intf} name vlan{VLAN} type vlan id {VLAN}')
+            host.cmd(f'ip link set up vlan{VLAN}')
+            host.cmd(f'ip addr add {address} dev vlan{VLAN}')
+
+    def teardown_method(self, method):
+        for host in self.net.net.get('h1', 'h4'):
+            host.cmd(f'ip link del vlan{VLAN}')
+        self.net.config_all_links_up()
+
+    def create_evc(self):
+        payload = {
+            "name": "failover",
+            "enabled": True,
+            "dynamic_backup_path": True,
+            "uni_a": {"interface_id": "00:00:00:00:00:00:00:11:50",
+                      "tag": {"tag_type": "vlan", "value": VLAN}},
+            "uni_z": {"interface_id": "00:00:00:00:00:00:00:14:53",
+                      "tag": {"tag_type": "vlan", "value": VLAN}},
+        }
+        response = self.client.create_evc(payload)
+        assert response.status_code == 201, response.text
+        return response.json()['circuit_id']
+
+    def wait_new_path(self, evc_id, old_path, timeout=60):
+        """Poll the EVC until it is active on a path other than old_path."""
+        def new_path():
+            try:
+                evc = self.client.get_evc(evc_id).json()
+            except (requests.RequestException, ValueError):
+                return None
+            path = path_ids(evc.get('current_path'))
+            return evc if evc.get('active') and path and path != old_path else None
+        return wait_until(new_path, timeout, interval=0.01,
+                          msg=f'EVC {evc_id} did not leave path {old_path}')
+
+    def test_010_failover_convergence(self):
+        """Take down, one at a time, links of the EVC's current path and
+        record traffic loss and controller convergence for each."""
+        h1 = self.net.net.get('h1')
+        evc_id = self.create_evc()
+        evc = wait_until(evc_active(evc_id), 60)
+        assert ', 0% packet loss,' in h1.cmd('ping -c3 101.0.0.4')
+
+        samples = []
+        for iteration in range(ITERATIONS):
+            path = evc['current_path']
+            link = path[iteration % len(path)]
+            interface_id = link['endpoint_a']['id']
+            probe = PingProbe(h1, '101.0.0.4', interval=PROBE_INTERVAL).start()
+            time.sleep(1)
+
+            link_down = time.time()
+            self.net.config_link_status(interface_id, 'down')
+            evc = self.wait_new_path(evc_id, path_ids(path))
+            controller_ms = (time.time() - link_down) * 1000
+            time.sleep(1)
+            result = probe.stop()
+
+            outages = [o for o in result['outages'] if o['end'] >= link_down]
+            sample = {
+                'link': link['id'],
+                'interface': interface_id,
+                'hops_before': len(path),
+                'hops_after': len(evc['current_path']),
+                'controller_ms': controller_ms,
+                'loss_ms': sum(o['ms'] for o in outages),
+                'max_outage_ms': max((o['ms'] for o in outages), default=0.0),
+                'lost_packets': result['lost'],
+            }
+            samples.append(sample)
+            print(f"failover {iteration}: {interface_id} down, loss {sample['loss_ms']:.1f}ms, "
+                  f"new current_path after {controller_ms:.1f}ms")
+
+            self.net.config_link_status(interface_id, 'up')
+            self.net.wait_topology_converged()
+            evc = wait_until(evc_active(evc_id), 60)
+
+        report = {
+            'config': {'topology': 'amlight', 'iterations': ITERATIONS,
+                       'probe_interval': PROBE_INTERVAL},
+            'loss_ms': latency_stats(s['loss_ms'] for s in samples),
+            'controller_ms': latency_stats(s['controller_ms'] for s in samples),
+            'samples': samples,
+        }
+        record_benchmark('failover_convergence', report)
+        for metric in ('loss_ms', 'controller_ms'):
+            stats = report[metric]
+            print(f"{metric}: p50 {stats['p50']:.1f} p95 {stats['p95']:.1f} "
+                  f"p99 {stats['p99']:.1f} max {stats['max']:.1f}")
+
+        assert ', 0% packet loss,' in h1.cmd('ping -c3 101.0.0.4')
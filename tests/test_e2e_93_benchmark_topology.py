@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+import requests
+
+from tests.helpers import KytosClient, BENCHMARK, record_benchmark
+
+# E2E_DISCOVERY_TOPOS: ';' separated topologies, in growing size
+TOPOLOGIES = os.environ.get(
+    'E2E_DISCOVERY_TOPOS',
+    'linear,10;grid,5,5;fattree,6;waxman,100;grid,10,20;fattree,12').split(';')
+POLL_INTERVAL = float(os.environ.get('E2E_DISCOVERY_POLL', 0.05))
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+class TestE2ETopologyDiscoveryBenchmark:
+    """Time from a clean kytosd start to the first switch, to all switches
+    and to all links discovered, for topologies of growing size."""
+    client = None
+    results = []
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = KytosClient()
+        cls.results = []
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        if cls.results:
+            record_benchmark('topology_discovery', cls.results)
+            print('\nswitches  links   api_up first_sw   all_sw all_links  topology')
+            for result in cls.results:
+                times = [result[key] for key in ('api_up', 'first_switch',
+                                                 'all_switches', 'all_links')]
+                times = ''.join(f'{t:9.2f}' if t is not None else f"{'-':>9}" for t in times)
+                print(f"{result['switches']:8} {result['links']:6}{times}  {result['topology']}")
+
+    def poll(self):
+        """(active switches, active links) or None if the API is not ready."""
+        try:
+            switches = self.client.get_switches().json()['switches']
+            links = self.client.get_links().json()['links']
+        except (requests.RequestException, ValueError, KeyError):
+            return None
+        return (sum(1 for s in switches.values() if s.get('active')),
+                sum(1 for link in links.values() if link.get('active')))
+
+    @pytest.mark.parametrize('topology', TOPOLOGIES)
+    def test_010_topology_discovery(self, topology, topology_network):
+        net = topology_network
+        expected_switches = len(net.net.switches)
+        expected_links = len(net.switch_links())
+        timeout = max(120, 2 * expected_switches)
+
+        net.start_controller(clean_config=True, enable_all=True)
+        # timed from the kytosd launch, after the stop and database cleanup
+        started = net.kytos.launched_at
+        api_up = time.time()
+        first_switch = all_switches = all_links = None
+        samples = []
+        while time.time() - started < timeout:
+            counts = self.poll()
+            now = time.time() - started
+            if counts:
+                switches, links = counts
+                samples.append((now, switches, links))
+                if switches and first_switch is None:
+                    first_switch = now
+                if switches == expected_switches and all_switches is None:
+                    all_switches = now
+                if links == expected_links and all_switches is not None:
+                    all_links = now
+                    break
+            time.sleep(POLL_INTERVAL)
+
+        result = {
+            'topology': topology,
+            'switches': expected_switches,
+            'links': expected_links,
+            'api_up': api_up - started,
+            'first_switch': first_switch,
+            'all_switches': all_switches,
+            'all_links': all_links,
+        }
+        self.results.append(result)
+        record_benchmark(f"topology_discovery_{topology.replace(',', '_')}",
+                         dict(result, samples=samples))
+
+        assert all_switches is not None, \
+            f'{topology}: only {samples[-1][1] if samples else 0} of {expected_switches} switches active'
+        assert all_links is not None, \
+            f'{topology}: only {samples[-1][2]} of {expected_links} links discovered'
@@ -0,0 +1,140 @@
+import os
+import random
+import time
+
+import pytest
+import requests
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from tests.helpers import (KytosClient, BENCHMARK, kytos_dpid,
+                           latency_stats, record_benchmark, wait_until)
+
+# E2E_PATHFINDER_TOPOS: ';' separated topologies, in growing size
+TOPOLOGIES = os.environ.get('E2E_PATHFINDER_TOPOS',
+                            'grid,5,5;waxman,100;fattree,8;grid,15,15').split(';')
+QUERIES = int(os.environ.get('E2E_PATHFINDER_QUERIES', 2000))
+CONCURRENCY = int(os.environ.get('E2E_PATHFINDER_CONCURRENCY', 8))
+LOADERS = int(os.environ.get('E2E_PATHFINDER_LOADERS', 16))
+SEED = int(os.environ.get('E2E_PATHFINDER_SEED', 1))
+
+OWNERS = ('red', 'blue', 'green')
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def link_metadata(rng):
+    return {
+        'bandwidth': rng.choice((1, 10, 40, 100)),
+        'delay': rng.randint(1, 100),
+        'ownership': rng.choice(OWNERS),
+        'utilization': round(rng.random(), 2),
+    }
+
+
+def query(rng, kind, switches, link_ids):
+    """A pathfinder v3 body of the given kind between two random switches."""
+    source, destination = rng.sample(switches, 2)
+    body = {'source': source, 'destination': destination, 'spf_max_paths': 2}
+    if kind == 'spf_attribute':
+        body['spf_attribute'] = rng.choice(('hop', 'delay'))
+    elif kind == 'undesired_links':
+        body['undesired_links'] = rng.sample(link_ids, min(2, len(link_ids)))
+    elif kind == 'mandatory_metrics':
+        body['mandatory_metrics'] = rng.choice((
+            {'ownership': rng.choice(OWNERS)},
+            {'bandwidth': 10, 'utilization': 0.8},
+        ))
+    elif kind == 'flexible_metrics':
+        body['flexible_metrics'] = {'delay': 50, 'bandwidth': 10,
+                                    'ownership': rng.choice(OWNERS)}
+        body['minimum_flexible_hits'] = 2
+    elif kind == 'spf_max_path_cost':
+        body['spf_attribute'] = 'hop'
+        body['spf_max_path_cost'] = rng.randint(2, 10)
+    return body
+
+
+QUERY_KINDS = ('spf_attribute', 'undesired_links', 'mandatory_metrics',
+               'flexible_metrics', 'spf_max_path_cost')
+
+
+class TestE2EPathfinderBenchmark:
+    """Latency of mixed pathfinder queries on generated topologies loaded
+    with link metadata."""
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = KytosClient(pool_size=max(CONCURRENCY, LOADERS))
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+
+    def load_metadata(self, link_ids, rng):
+        """POST metadata of every link concurrently, returning the seconds taken."""
+        metadata = {link_id: link_metadata(rng) for link_id in link_ids}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=LOADERS) as executor:
+            responses = list(executor.map(
+                lambda item: self.client.add_metadata('links', *item), metadata.items()))
+        elapsed = time.monotonic() - started
+        for response in responses:
+            assert response.status_code == 201, response.text
+
+        def loaded():
+            try:
+                links = self.client.get_links().json()['links']
+            except (requests.RequestException, ValueError, KeyError):
+                return False
+            return all(links[link_id]['metadata'].get('ownership') == value['ownership']
+                       for link_id, value in metadata.items())
+        wait_until(loaded, 60, msg='link metadata not stored')
+        return elapsed
+
+    def timed_query(self, kind, body):
+        started = time.monotonic()
+        response = self.client.find_paths(body)
+        return kind, time.monotonic() - started, response.status_code
+
+    @pytest.mark.parametrize('topology', TOPOLOGIES)
+    def test_010_pathfinder_query_latency(self, topology, converged_topology):
+        net = converged_topology
+
+        rng = random.Random(SEED)
+        switches = [kytos_dpid(switch.dpid) for switch in net.net.switches]
+        link_ids = sorted(self.client.get_links().json()['links'])
+        load_seconds = self.load_metadata(link_ids, rng)
+
+        bodies = [(kind, query(rng, kind, switches, link_ids))
+                  for kind in (rng.choice(QUERY_KINDS) for _ in range(QUERIES))]
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            results = list(executor.map(lambda item: self.timed_query(*item), bodies))
+        elapsed = time.monotonic() - started
+
+        latencies, errors = defaultdict(list), defaultdict(int)
+        for kind, latency, status in results:
+            latencies[kind].append(latency)
+            if status != 200:
+                errors[kind] += 1
+
+        report = {
+            'config': {'topology': topology, 'switches': len(switches), 'links': len(link_ids),
+                       'queries': QUERIES, 'concurrency': CONCURRENCY},
+            'metadata_load_seconds': load_seconds,
+            'metadata_links_per_second': len(link_ids) / load_seconds,
+            'queries_per_second': QUERIES / elapsed,
+            'latency': {kind: latency_stats(values) for kind, values in latencies.items()},
+            'errors': dict(errors),
+        }
+        record_benchmark(f"pathfinder_{topology.replace(',', '_')}", report)
+        print(f"pathfinder {topology} ({len(switches)} switches, {len(link_ids)} links): "
+              f"metadata {report['metadata_links_per_second']:.0f} links/s, "
+              f"{report['queries_per_second']:.1f} queries/s")
+        for kind, stats in sorted(report['latency'].items()):
+            print(f"  {kind:18} n={stats['count']:5} p50 {stats['p50'] * 1000:8.1f}ms "
+                  f"p95 {stats['p95'] * 1000:8.1f}ms p99 {stats['p99'] * 1000:8.1f}ms")
+
+        assert not errors, f'{topology}: failed queries {dict(errors)}'
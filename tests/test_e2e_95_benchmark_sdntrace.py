@@ -0,0 +1,167 @@
+import os
+import time
+
+import pytest
+import requests
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from mininet.node import Host
+from tests.helpers import (KytosClient, BENCHMARK, env_ints,
+                           evc_active, kytos_dpid, latency_stats,
+                           record_benchmark, wait_until)
+
+# E2E_TRACE_TOPOS: ';' separated linear chains built by the harness
+TOPOLOGIES = os.environ.get('E2E_TRACE_TOPOS', 'linear,50;linear,200').split(';')
+# E2E_TRACE_LENGTHS: EVC path lengths in switches, capped at the chain size
+LENGTHS = env_ints('E2E_TRACE_LENGTHS', '2,10,25,50,100,200')
+REPEAT = int(os.environ.get('E2E_TRACE_REPEAT', 20))
+BULK = int(os.environ.get('E2E_TRACE_BULK', 200))
+CONCURRENCY = int(os.environ.get('E2E_TRACE_CONCURRENCY', 8))
+VLAN_START = 1000
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def uni_port(switch):
+    """Port of switch facing a host."""
+    for intf in switch.intfList():
+        link = intf.link
+        if link and isinstance((link.intf2 if link.intf1 is intf else link.intf1).node, Host):
+            return switch.ports[intf]
+    raise LookupError(f'{switch.name} has no host attached')
+
+
+def trace_cp_payload(dpid, port, vlan):
+    return {"trace": {"switch": {"dpid": dpid, "in_port": port},
+                      "eth": {"dl_type": 33024, "dl_vlan": vlan}}}
+
+
+def trace_payload(dpid, port, vlan):
+    return {"trace": {"switch": {"dpid": dpid, "in_port": port},
+                      "eth": {"dl_vlan": vlan, "dl_type": 2048},
+                      "ip": {"nw_src": "0.0.0.1", "nw_dst": "0.0.0.2", "nw_proto": 17},
+                      "tp": {"tp_src": 33948, "tp_dst": 53}}}
+
+
+class TestE2ESDNTraceBenchmark:
+    """sdntrace_cp and sdntrace latency by path length and under
+    concurrent load on long linear topologies."""
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = KytosClient(pool_size=CONCURRENCY)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+
+    def create_evcs(self, net):
+        """One EVC from the first switch to switch number length for each
+        of LENGTHS, returning {length: (dpid, port, vlan)} of UNI A."""
+        switches = sorted(net.net.switches, key=lambda switch: int(switch.dpid, 16))
+        first = switches[0]
+        uni_a = (kytos_dpid(first.dpid), uni_port(first))
+        evcs = {}
+        for offset, length in enumerate(n for n in LENGTHS if n <= len(switches)):
+            last = switches[length - 1]
+            vlan = VLAN_START + offset
+            payload = {
+                "name": f"trace_{length}",
+                "enabled": True,
+                "uni_a": {"interface_id": f"{uni_a[0]}:{uni_a[1]}",
+                          "tag": {"tag_type": "vlan", "value": vlan}},
+                "uni_z": {"interface_id": f"{kytos_dpid(last.dpid)}:{uni_port(last)}",
+                          "tag": {"tag_type": "vlan", "value": vlan}},
+            }
+            response = self.client.create_evc(payload)
+            assert response.status_code == 201, response.text
+            evcs[length] = (response.json()['circuit_id'], (*uni_a, vlan))
+        for evc_id, _ in evcs.values():
+            wait_until(evc_active(evc_id), 300)
+        return {length: uni for length, (_, uni) in evcs.items()}
+
+    def timed_trace_cp(self, payload):
+        started = time.monotonic()
+        response = self.client.trace_cp(payload)
+        assert response.status_code == 200, response.text
+        return time.monotonic() - started, len(response.json()['result'])
+
+    def timed_trace(self, payload, timeout=60):
+        """Data-plane trace: (request latency, completion time, steps)."""
+        started = time.monotonic()
+        response = self.client.trace(payload)
+        assert response.status_code == 200, response.text
+        accepted = time.monotonic() - started
+        trace_id = response.json()['result']['trace_id']
+
+        def done():
+            try:
+                result = self.client.get_trace(trace_id).json()['result']
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                return None
+            return result if result and result[-1].get('reason') == 'done' else None
+        result = wait_until(done, timeout, interval=0.05,
+                            msg=f'sdntrace {trace_id} did not finish')
+        return accepted, time.monotonic() - started, len(result)
+
+    @pytest.mark.parametrize('topology', TOPOLOGIES)
+    def test_010_trace_latency_and_throughput(self, topology, converged_topology):
+        net = converged_topology
+        unis = self.create_evcs(net)
+
+        cp_latency, dp_latency, dp_completion = {}, {}, {}
+        for length, uni in unis.items():
+            samples = [self.timed_trace_cp(trace_cp_payload(*uni)) for _ in range(REPEAT)]
+            assert all(steps == length for _, steps in samples), samples
+            cp_latency[length] = latency_stats(latency for latency, _ in samples)
+
+            samples = [self.timed_trace(trace_payload(*uni))
+                       for _ in range(max(REPEAT // 4, 1))]
+            dp_latency[length] = latency_stats(accepted for accepted, _, _ in samples)
+            dp_completion[length] = latency_stats(done for _, done, _ in samples)
+
+        # concurrent single traces and bulk /traces over all the EVCs
+        longest = unis[max(unis)]
+        payloads = [trace_cp_payload(*unis[length])
+                    for length in list(unis) * (BULK // len(unis) + 1)][:BULK]
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            concurrent = list(executor.map(self.timed_trace_cp, payloads))
+        concurrent_rate = BULK / (time.monotonic() - started)
+
+        started = time.monotonic()
+        response = self.client.traces_cp(payloads)
+        bulk_seconds = time.monotonic() - started
+        assert response.status_code == 200, response.text
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            data_plane = list(executor.map(
+                self.timed_trace, [trace_payload(*longest)] * CONCURRENCY))
+        data_plane_seconds = time.monotonic() - started
+
+        report = {
+            'config': {'topology': topology, 'switches': len(net.net.switches)},
+            'trace_cp_latency': cp_latency,
+            'trace_latency': dp_latency,
+            'trace_completion': dp_completion,
+            'trace_cp_concurrent': dict(latency_stats(l for l, _ in concurrent),
+                                        traces_per_second=concurrent_rate),
+            'trace_cp_bulk': {'traces': BULK, 'seconds': bulk_seconds,
+                              'traces_per_second': BULK / bulk_seconds},
+            'trace_concurrent': dict(latency_stats(done for _, done, _ in data_plane),
+                                     traces_per_second=CONCURRENCY / data_plane_seconds),
+        }
+        record_benchmark(f"sdntrace_{topology.replace(',', '_')}", report)
+        print(f"sdntrace {topology}: trace_cp {concurrent_rate:.1f} traces/s concurrent, "
+              f"{BULK / bulk_seconds:.1f} traces/s bulk")
+        table = defaultdict(dict)
+        for name, stats in (('cp', cp_latency), ('dp', dp_latency), ('done', dp_completion)):
+            for length, values in stats.items():
+                table[length][name] = values['p50'] * 1000
+        print('  hops   trace_cp p50   sdntrace p50   sdntrace done p50')
+        for length, values in sorted(table.items()):
+            print(f"  {length:4} {values['cp']:12.1f}ms {values['dp']:12.1f}ms "
+                  f"{values['done']:15.1f}ms")
@@ -0,0 +1,189 @@
+import os
+import time
+
+import pytest
+import requests
+
+from tests.helpers import (NetworkTest, FlowTable, KytosClient, UNI_PAIRS,
+                           evc_active, evc_cookie, flows_reinstalled, flows_with_cookie,
+                           linear_trend, record_benchmark, wait_until)
+
+pytestmark = pytest.mark.topology('amlight')
+
+CONTROLLER = '127.0.0.1'
+
+# E2E_SOAK_SECONDS: how long to keep cycling (the module is skipped when 0)
+SOAK_SECONDS = int(os.environ.get('E2E_SOAK_SECONDS', 0))
+EVCS = int(os.environ.get('E2E_SOAK_EVCS', 10))
+FLOWS = int(os.environ.get('E2E_SOAK_FLOWS', 100))
+VLAN_START = 100
+
+FLOW_DPID = '00:00:00:00:00:00:00:11'
+FLOW_COOKIE = 0xbe00000000000000
+FLOW_COOKIE_MASK = 0xff00000000000000
+
+pytestmark = pytest.mark.skipif(not SOAK_SECONDS, reason='E2E_SOAK_SECONDS not set')
+
+
+class TestE2ESoak:
+    """Create, modify, fail over and delete EVCs and flows in a loop for
+    E2E_SOAK_SECONDS, tracking API latency and kytosd resources per cycle.
+
+    Resources come from the session sampler (kytosd_sampler), whose time
+    series is already written to the resource report, so the soak only
+    records one sample per cycle."""
+    net = None
+    client = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER, 'amlight')
+        cls.net.start()
+        cls.net.start_controller(clean_config=True, enable_all=True)
+        cls.net.wait_topology_converged()
+        cls.client = KytosClient()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.net.config_all_links_up()
+        cls.net.stop()
+
+    def create_evcs(self):
+        evc_ids = []
+        for index in range(EVCS):
+            (_, uni_a), (_, uni_z) = UNI_PAIRS[index % len(UNI_PAIRS)]
+            vlan = VLAN_START + index // len(UNI_PAIRS)
+            payload = {
+                "name": f"soak_{index}",
+                "enabled": True,
+                "dynamic_backup_path": True,
+                "uni_a": {"interface_id": uni_a, "tag": {"tag_type": "vlan", "value": vlan}},
+                "uni_z": {"interface_id": uni_z, "tag": {"tag_type": "vlan", "value": vlan}},
+            }
+            response = self.client.create_evc(payload)
+            assert response.status_code == 201, response.text
+            evc_ids.append(response.json()['circuit_id'])
+        for evc_id in evc_ids:
+            wait_until(evc_active(evc_id), 120)
+        return evc_ids
+
+    def modify_evcs(self, evc_ids, cycle):
+        for index, evc_id in enumerate(evc_ids):
+            response = self.client.update_evc(evc_id, {"name": f"soak_{index}_{cycle}"})
+            assert response.status_code == 200, response.text
+        # the EVC stays active through a redeploy: wait for its flows on
+        # the UNI A switch to be replaced instead
+        redeployed = time.time()
+        response = self.client.redeploy_evc(evc_ids[0])
+        assert response.status_code == 202, response.text
+        switch = self.net.net.get(UNI_PAIRS[0][0][0])
+        wait_until(flows_reinstalled(switch, evc_cookie(evc_ids[0]), redeployed), 120,
+                   msg=f'flows of EVC {evc_ids[0]} not redeployed')
+        wait_until(evc_active(evc_ids[0]), 120)
+
+    def fail_over(self, evc_id, cycle):
+        """Take down a link of the EVC's current path until it moves."""
+        evc = wait_until(evc_active(evc_id), 120)
+        path = evc['current_path']
+        old_path = [link['id'] for link in path]
+        interface_id = path[cycle % len(path)]['endpoint_a']['id']
+
+        def moved():
+            try:
+                evc = self.client.get_evc(evc_id).json()
+            except (requests.RequestException, ValueError):
+                return None
+            new_path = [link['id'] for link in evc.get('current_path') or []]
+            return evc['active'] and new_path and new_path != old_path
+
+        self.net.config_link_status(interface_id, 'down')
+        try:
+            wait_until(moved, 60, msg=f'EVC {evc_id} did not fail over')
+        finally:
+            self.net.config_link_status(interface_id, 'up')
+        self.net.wait_topology_converged()
+
+    def churn_flows(self):
+        switch = self.net.net.get('Ampath1')
+        flows = [{
+            "priority": 10,
+            "cookie": FLOW_COOKIE | index,
+            "match": {"in_port": 1, "dl_type": 2048,
+                      "nw_dst": f"10.0.{index >> 8 & 255}.{index & 255}"},
+            "actions": [{"action_type": "output", "port": 2}],
+        } for index in range(FLOWS)]
+        response = self.client.install_flows({"flows": flows}, FLOW_DPID)
+        assert response.status_code == 202, response.text
+        cookie_filter = f'cookie={FLOW_COOKIE:#x}/{FLOW_COOKIE_MASK:#x}'
+        wait_until(lambda: len(FlowTable.dump(switch, cookie_filter)) == FLOWS, 60,
+                   msg='soak flows not installed')
+        response = self.client.delete_flows(
+            {"flows": [{"cookie": FLOW_COOKIE, "cookie_mask": FLOW_COOKIE_MASK}]},
+            FLOW_DPID)
+        assert response.status_code == 202, response.text
+        wait_until(lambda: len(FlowTable.dump(switch, cookie_filter)) == 0, 60,
+                   msg='soak flows not removed')
+
+    def delete_evcs(self, evc_ids):
+        for evc_id in evc_ids:
+            response = self.client.delete_evc(evc_id)
+            assert response.status_code == 200, response.text
+        for index, evc_id in enumerate(evc_ids):
+            (name_a, _), (name_z, _) = UNI_PAIRS[index % len(UNI_PAIRS)]
+            for switch in self.net.net.get(name_a, name_z):
+                wait_until(flows_with_cookie(switch, evc_cookie(evc_id), 0), 60)
+
+    def test_010_evc_churn(self, kytosd_sampler):
+        started = time.monotonic()
+        deadline = started + SOAK_SECONDS
+        cycles = []
+        cycle = 0
+        while time.monotonic() < deadline:
+            cycle_started = time.monotonic()
+            evc_ids = self.create_evcs()
+            self.modify_evcs(evc_ids, cycle)
+            self.fail_over(evc_ids[0], cycle)
+            self.churn_flows()
+            self.delete_evcs(evc_ids)
+
+            sample = kytosd_sampler.sample() or {}
+            latency = self.client.latency_summary(reset=True)
+            cycles.append({
+                'cycle': cycle,
+                'elapsed': time.monotonic() - started,
+                'seconds': time.monotonic() - cycle_started,
+                'rss_mb': sample.get('rss_mb'),
+                'threads': sample.get('threads'),
+                'fds': sample.get('fds'),
+                'mongo_connections': sample.get('mongo_connections'),
+                'latency_p95': {key: stats['p95'] for key, stats in latency.items()},
+            })
+            cycle += 1
+
+        def per_hour(key):
+            return linear_trend((c['elapsed'] / 3600, c[key]) for c in cycles
+                                if c[key] is not None)
+
+        endpoints = {key for c in cycles for key in c['latency_p95']}
+        trends = {
+            'cycle_seconds_per_hour': per_hour('seconds'),
+            'rss_mb_per_hour': per_hour('rss_mb'),
+            'threads_per_hour': per_hour('threads'),
+            'fds_per_hour': per_hour('fds'),
+            'latency_p95_ms_per_hour': {
+                endpoint: 1000 * linear_trend(
+                    (c['elapsed'] / 3600, c['latency_p95'][endpoint])
+                    for c in cycles if endpoint in c['latency_p95'])
+                for endpoint in sorted(endpoints)
+            },
+        }
+        record_benchmark('soak', {'config': {'seconds': SOAK_SECONDS, 'evcs': EVCS,
+                                             'flows': FLOWS},
+                                  'trends': trends, 'cycles': cycles})
+        print(f"soak trends over {len(cycles)} cycles: "
+              f"rss {trends['rss_mb_per_hour']:+.2f}MB/h, "
+              f"cycle time {trends['cycle_seconds_per_hour']:+.2f}s/h, "
+              f"threads {trends['threads_per_hour']:+.2f}/h, fds {trends['fds_per_hour']:+.2f}/h")
+        for endpoint, slope in trends['latency_p95_ms_per_hour'].items():
+            print(f"  {endpoint}: p95 {slope:+.2f}ms/h")
@@ -0,0 +1,163 @@
+import os
+import shutil
+import statistics
+import time
+
+import pytest
+import requests
+
+from tests.helpers import (NetworkTest, KytosClient, IperfProbe, BENCHMARK,
+                           evc_active, record_benchmark, wait_until)
+
+pytestmark = pytest.mark.topology('amlight')
+
+CONTROLLER = '127.0.0.1'
+
+# E2E_THROUGHPUT_BANDWIDTH: iperf3 -b target, per stream
+BANDWIDTH = os.environ.get('E2E_THROUGHPUT_BANDWIDTH', '1G')
+DURATION = int(os.environ.get('E2E_THROUGHPUT_DURATION', 10))
+UDP = os.environ.get('E2E_THROUGHPUT_PROTOCOL', 'udp') == 'udp'
+VLAN = 300
+
+# (case, host a, uni a, host z, uni z) on AmlightTopo
+CASES = [
+    ('intra_switch', 'h1', '00:00:00:00:00:00:00:11:50', 'h13', '00:00:00:00:00:00:00:11:62'),
+    ('multi_hop', 'h1', '00:00:00:00:00:00:00:11:50', 'h4', '00:00:00:00:00:00:00:14:53'),
+]
+
+pytestmark = [
+    pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set'),
+    pytest.mark.skipif(not shutil.which('iperf3'), reason='iperf3 not installed'),
+]
+
+
+def path_ids(path):
+    return [link['id'] for link in path or []]
+
+
+class TestE2EThroughputBenchmark:
+    """iperf3 between the UNI hosts of mef_eline EVCs: received Gbps, loss
+    and jitter for intra-switch and multi-hop EVCs and across a path
+    migration."""
+    net = None
+    client = None
+    results = []
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER, 'amlight')
+        cls.net.start()
+        cls.net.wait_switches_active()
+        cls.client = KytosClient()
+        cls.results = []
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.net.config_all_links_up()
+        cls.net.stop()
+        if cls.results:
+            record_benchmark('evc_throughput', cls.results)
+            print('\ncase                       Gbps  sent Gbps   loss %  jitter ms')
+            for result in cls.results:
+                jitter = result['jitter_ms']
+                print(f"{result['case']:24} {result['gbps']:6.2f} {result['sent_gbps']:10.2f} "
+                      f"{result['loss_percent']:8.3f} "
+                      f"{jitter if jitter is not None else '-':>10}")
+
+    def setup_method(self, method):
+        self.net.config_all_links_up()
+        self.net.start_controller(clean_config=True, enable_all=True)
+        self.net.wait_topology_converged()
+
+    def create_evc(self, name, uni_a, uni_z):
+        payload = {
+            "name": name,
+            "enabled": True,
+            "dynamic_backup_path": True,
+            "uni_a": {"interface_id": uni_a, "tag": {"tag_type": "vlan", "value": VLAN}},
+            "uni_z": {"interface_id": uni_z, "tag": {"tag_type": "vlan", "value": VLAN}},
+        }
+        response = self.client.create_evc(payload)
+        assert response.status_code == 201, response.text
+        evc_id = response.json()['circuit_id']
+        return wait_until(evc_active(evc_id), 60)
+
+    def run_iperf(self, host_a, host_z, during=None):
+        """iperf3 from host_a to host_z over the EVC VLAN; during, if given,
+        is called once the stream has run for a third of DURATION."""
+        pair = (host_a.name, host_z.name)
+        try:
+            matrix = self.net.connectivity_matrix([pair], vlan=VLAN, count=3, keep_vlan=True)
+            assert matrix[pair]['received'], matrix
+            probe = IperfProbe(host_z, host_a, self.net.vlan_ip(host_z, VLAN),
+                               bandwidth=BANDWIDTH, duration=DURATION, udp=UDP).start()
+            extra = {}
+            try:
+                if during:
+                    time.sleep(DURATION / 3)
+                    extra = during() or {}
+            finally:
+                result = probe.wait()
+            return dict(result, **extra)
+        finally:
+            self.net.remove_vlan([host_a, host_z], VLAN)
+
+    def record(self, case, result):
+        result = dict(result, case=case, config={'bandwidth': BANDWIDTH, 'duration': DURATION,
+                                                 'protocol': 'udp' if UDP else 'tcp'})
+        self.results.append(result)
+        print(f"{case}: {result['gbps']:.2f} Gbps received of {result['sent_gbps']:.2f} sent, "
+              f"loss {result['loss_percent']:.3f}%, jitter {result['jitter_ms']} ms")
+        return result
+
+    @pytest.mark.parametrize('case,host_a,uni_a,host_z,uni_z', CASES,
+                             ids=[case[0] for case in CASES])
+    def test_010_evc_throughput(self, case, host_a, uni_a, host_z, uni_z):
+        evc = self.create_evc(f'throughput_{case}', uni_a, uni_z)
+        result = self.run_iperf(*self.net.net.get(host_a, host_z))
+        self.record(case, dict(result, hops=len(evc['current_path'])))
+        assert result['gbps'] > 0
+
+    def test_020_evc_throughput_path_migration(self):
+        """Multi-hop EVC whose first current_path link goes down mid-stream."""
+        _, host_a, uni_a, host_z, uni_z = CASES[1]
+        evc = self.create_evc('throughput_migration', uni_a, uni_z)
+        evc_id = evc['id']
+        old_path = path_ids(evc['current_path'])
+        interface_id = evc['current_path'][0]['endpoint_a']['id']
+
+        def migrate():
+            def moved():
+                try:
+                    evc = self.client.get_evc(evc_id).json()
+                except (requests.RequestException, ValueError):
+                    return None
+                path = path_ids(evc.get('current_path'))
+                return evc if evc.get('active') and path and path != old_path else None
+
+            link_down = time.monotonic()
+            self.net.config_link_status(interface_id, 'down')
+            new_evc = wait_until(moved, DURATION, interval=0.01,
+                                 msg=f'EVC {evc_id} did not leave path {old_path}')
+            return {'link_down': interface_id,
+                    'migration_ms': (time.monotonic() - link_down) * 1000,
+                    'hops_before': len(old_path),
+                    'hops_after': len(new_evc['current_path'])}
+
+        try:
+            result = self.run_iperf(*self.net.net.get(host_a, host_z), during=migrate)
+        finally:
+            self.net.config_link_status(interface_id, 'up')
+        rates = [interval['gbps'] for interval in result['intervals']]
+        median = statistics.median(rates) if rates else 0.0
+        degraded = [interval for interval in result['intervals']
+                    if interval['gbps'] < median / 2]
+        result = self.record('path_migration', dict(
+            result,
+            min_interval_gbps=min(rates, default=0.0),
+            degraded_seconds=sum(i['end'] - i['start'] for i in degraded),
+        ))
+        print(f"  path migration after {result['migration_ms']:.1f}ms, "
+              f"{result['degraded_seconds']:.1f}s below half the median rate")
+        assert result['gbps'] > 0
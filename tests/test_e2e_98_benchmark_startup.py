@@ -0,0 +1,130 @@
+import os
+import re
+import time
+
+import pytest
+
+from tests.helpers import (NetworkTest, BENCHMARK, EXPECTED_NAPPS, INFO_KEY, import_profile,
+                           latency_stats, record_benchmark, syslog, syslog_time)
+
+CONTROLLER = '127.0.0.1'
+
+REPEAT = int(os.environ.get('E2E_STARTUP_REPEAT', 5))
+# E2E_STARTUP_MAX_SECONDS: fail when the median kytosd start exceeds it (0: off)
+MAX_SECONDS = float(os.environ.get('E2E_STARTUP_MAX_SECONDS', 0))
+# E2E_STARTUP_NAPP_PATTERN: kytosd log line marking that a NApp starts loading
+NAPP_PATTERN = os.environ.get('E2E_STARTUP_NAPP_PATTERN',
+                              r'(?:Loading|Running) NApp:? (?P<napp>[\w.-]+/[\w.-]+)')
+NAPPS = [f'{username}/{name}' for username, name in EXPECTED_NAPPS]
+
+pytestmark = pytest.mark.skipif(not BENCHMARK, reason='E2E_BENCHMARK=1 not set')
+
+
+def napp_load_times(lines, launched, api_up):
+    """{napp: seconds} from the log lines where each NApp starts loading;
+    a NApp is loaded when the next one starts, the last when the API is up.
+    Also returns the seconds from launch to the first NApp. syslog stamps
+    are truncated to the second, so these values are second-granular and
+    are reported under INFO_KEY, out of the regression gate."""
+    starts = {}
+    for _, line in lines:
+        match = re.search(NAPP_PATTERN, line)
+        stamp = syslog_time(line)
+        if match and stamp and match.group('napp') not in starts:
+            starts[match.group('napp')] = stamp
+    ordered = sorted(starts.items(), key=lambda item: item[1])
+    ends = [stamp for _, stamp in ordered[1:]] + [api_up]
+    loads = {napp: max(end - start, 0.0) for (napp, start), end in zip(ordered, ends)}
+    core = max(ordered[0][1] - launched, 0.0) if ordered else None
+    return loads, core
+
+
+class TestE2EStartupProfile:
+    """kytosd restart breakdown: stop, start until the API is up, core
+    before the first NApp, each NApp's load time from the log and the time
+    for the switches to be active again, plus the import time of kytos
+    core and of each NApp in a fresh interpreter."""
+    net = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = NetworkTest.shared(CONTROLLER)
+        cls.net.start()
+        cls.net.wait_switches_connect()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.net.stop()
+
+    def test_010_startup_breakdown(self):
+        runs = []
+        for iteration in range(REPEAT):
+            mark = syslog.mark()
+            self.net.start_controller(clean_config=iteration == 0, enable_all=True)
+            api_up = time.time()
+            # after the stop and the database cleanup, when kytosd is spawned
+            launched = self.net.kytos.launched_at
+            self.net.wait_switches_active()
+            # kytosd restart time is the maintenance window downtime
+            run = {
+                'stop_seconds': self.net.kytos.stop_duration,
+                'start_seconds': self.net.kytos.start_duration,
+                'switches_seconds': time.time() - launched,
+            }
+            if os.path.exists(syslog.path):
+                loads, core = napp_load_times(syslog.lines(mark, NAPP_PATTERN),
+                                              launched, api_up)
+                run.update(core_seconds=core, napps=loads)
+            runs.append(run)
+            print(f"kytosd start {iteration}: stop {run['stop_seconds']:.2f}s, "
+                  f"API up {run['start_seconds']:.2f}s, "
+                  f"switches active {run['switches_seconds']:.2f}s")
+
+        imports = {'kytos/core': import_profile('kytos.core.controller')}
+        for napp in NAPPS:
+            username, name = napp.split('/')
+            try:
+                imports[napp] = import_profile(f'napps.{username}.{name}.main',
+                                               preload=('kytos.core.controller',))
+            except RuntimeError as exc:
+                print(f'import profile of {napp} failed: {exc}')
+
+        def stats(values):
+            return latency_stats(value for value in values if value is not None)
+
+        report = {
+            'config': {'repeat': REPEAT},
+            'stop_seconds': stats(run['stop_seconds'] for run in runs),
+            'start_seconds': stats(run['start_seconds'] for run in runs),
+            'switches_seconds': stats(run['switches_seconds'] for run in runs),
+            'core': {INFO_KEY: {'load_seconds': stats(run.get('core_seconds') for run in runs)},
+                     'import_seconds': imports['kytos/core']['seconds'],
+                     'import_top': imports['kytos/core']['top']},
+            'napps': {napp: {INFO_KEY: {'load_seconds': stats(run.get('napps', {}).get(napp)
+                                                              for run in runs)},
+                             'import_seconds': imports.get(napp, {}).get('seconds'),
+                             'import_top': imports.get(napp, {}).get('top', [])}
+                      for napp in NAPPS},
+            'runs': runs,
+        }
+        record_benchmark('kytosd_startup', report)
+
+        start = report['start_seconds']
+        print(f"kytosd start p50 {start['p50']:.2f}s max {start['max']:.2f}s, "
+              f"stop p50 {report['stop_seconds']['p50']:.2f}s, switches active p50 "
+              f"{report['switches_seconds']['p50']:.2f}s")
+        print('  component                load p50   import')
+        for component, values in [('kytos/core', report['core']), *report['napps'].items()]:
+            load = values[INFO_KEY]['load_seconds'].get('p50')
+            load = f'{load:8.2f}s' if load is not None else f"{'-':>9}"
+            imported = values['import_seconds']
+            imported = f'{imported:7.2f}s' if imported is not None else f"{'-':>8}"
+            print(f'  {component:24} {load} {imported}')
+        missing = [napp for napp in NAPPS
+                   if not report['napps'][napp][INFO_KEY]['load_seconds']['count']]
+        if missing and os.path.exists(syslog.path):
+            print(f'  no load line matching {NAPP_PATTERN!r} for {", ".join(missing)}')
+
+        if MAX_SECONDS:
+            assert start['p50'] <= MAX_SECONDS, \
+                f"kytosd start p50 {start['p50']:.2f}s above {MAX_SECONDS}s"